@@ -6,9 +6,45 @@ export interface FrameData {
     timestamp: string; // "00:01:00" or "01:00"
     timestampSeconds: number; // 60
     filename: string; // "video_id_person_0000.jpg"
-    path: string; // Absolute path on disk
+    path: string; // Absolute path on disk (s3://bucket/key with FRAME_SINK=s3)
     url: string; // Public URL (local or S3)
     personIndex?: number; // Index of the detected person (unique per video)
+    encoding?: FrameEncoding;
+}
+
+/**
+ * How a saved frame was encoded (FRAME_OUTPUT_FORMAT / quality search)
+ */
+export interface FrameEncoding {
+    format: 'jpeg' | 'webp' | 'avif';
+    quality: number;
+    bytes: number;
+    width: number;
+    height: number;
+    ssim?: number; // Only when FRAME_MIN_SSIM / FRAME_TARGET_BYTES searched the quality
+}
+
+/**
+ * Per-job timings and counters reported by extract_frames.py (all modes)
+ */
+export interface ExtractionMetrics {
+    wallSeconds: number;
+    stageSeconds: {
+        download: number;
+        probe: number;
+        decode: number;
+        detection: number;
+        enhancement: number;
+        encoding: number;
+        write: number;
+    };
+    counts: {
+        seeks: number;
+        decodedFrames: number;
+        detectorCalls: number;
+        cacheHits: number; // Frames served from the detection cache (no decode / detection)
+    };
+    peakRssBytes: number | null;
 }
 
 export interface FrameExtractionResult {
@@ -17,6 +53,7 @@ export interface FrameExtractionResult {
     frameCount: number;
     frames: FrameData[];
     error?: string;
+    metrics?: ExtractionMetrics;
 }
 
 /**
@@ -28,10 +65,87 @@ function getPythonCommand(): string {
     return process.platform === 'win32' ? 'python' : 'python3';
 }
 
+/**
+ * Called once per finished frame (VALID or SKIP_FRAME) while extraction is
+ * still running. index is the frame's position in the request (timestamp /
+ * range order; person order in legacy mode).
+ */
+export type FrameCallback<F> = (frame: F, index: number) => void;
+
+/**
+ * stdout handler for --stream (NDJSON) output: reports each complete
+ * {"type": "frame"} line as it arrives. The last line is the summary,
+ * read with streamSummary() once the process exits.
+ */
+function streamFrameLines<F>(onFrame: FrameCallback<F>): (chunk: Buffer) => void {
+    let buffered = '';
+    return (chunk) => {
+        buffered += chunk.toString();
+        let newline: number;
+        while ((newline = buffered.indexOf('\n')) >= 0) {
+            const line = buffered.slice(0, newline).trim();
+            buffered = buffered.slice(newline + 1);
+            if (!line) continue;
+            try {
+                const message = JSON.parse(line);
+                if (message.type === 'frame') onFrame(message.frame as F, message.index);
+            } catch {
+                // Partial or non-JSON line: the summary parse reports real errors
+            }
+        }
+    };
+}
+
+function streamSummary(stdoutData: string): string {
+    const lines = stdoutData.trim().split('\n');
+    return lines[lines.length - 1] || '';
+}
+
+/**
+ * Run a job on the long-lived extraction worker (extract_frames.py --serve)
+ * when FRAME_WORKER_URL is set, e.g. http://127.0.0.1:8765.
+ * Returns null when no worker is configured or it cannot be reached, so
+ * callers fall back to spawning the script.
+ */
+async function runWorkerJob<T>(job: Record<string, unknown>): Promise<T | null> {
+    const workerUrl = process.env.FRAME_WORKER_URL;
+    if (!workerUrl) return null;
+
+    let response: Response;
+    try {
+        response = await fetch(`${workerUrl.replace(/\/$/, '')}/jobs`, {
+            method: 'POST',
+            headers: { 'Content-Type': 'application/json' },
+            body: JSON.stringify(job),
+        });
+    } catch (error) {
+        console.warn(`[FrameExtractor] Worker unreachable at ${workerUrl}, spawning script instead:`, error);
+        return null;
+    }
+
+    if (response.status === 503) {
+        console.warn('[FrameExtractor] Worker queue is full, spawning script instead');
+        return null;
+    }
+
+    const result = await response.json();
+    if (!result.success) {
+        throw new Error(result.error || `Worker job failed (${job.mode})`);
+    }
+    return result as T;
+}
+
 export async function extractVideoFrames(
     videoUrl: string,
-    videoId: string
+    videoId: string,
+    onFrame?: FrameCallback<FrameData>
 ): Promise<FrameExtractionResult> {
+    const workerResult = await runWorkerJob<FrameExtractionResult>({ mode: 'legacy', url: videoUrl, video_id: videoId });
+    if (workerResult) {
+        workerResult.frames.forEach((frame, i) => onFrame?.(frame, i));
+        return workerResult;
+    }
+
     return new Promise((resolve, reject) => {
         const scriptPath = path.join(process.cwd(), 'scripts', 'extract_frames.py');
         const pythonCmd = getPythonCommand();
@@ -46,13 +160,15 @@ export async function extractVideoFrames(
                 throw new Error(`Python script not found at: ${scriptPath}`);
             });
 
-        const pythonProcess = spawn(pythonCmd, [scriptPath, videoUrl, videoId]);
+        const pythonProcess = spawn(pythonCmd, [scriptPath, videoUrl, videoId, ...(onFrame ? ['--stream'] : [])]);
 
         let stdoutData = '';
         let stderrData = '';
+        const handleFrames = onFrame ? streamFrameLines(onFrame) : null;
 
         pythonProcess.stdout.on('data', (data) => {
             stdoutData += data.toString();
+            handleFrames?.(data);
         });
 
         pythonProcess.stderr.on('data', (data) => {
@@ -63,6 +179,8 @@ export async function extractVideoFrames(
         });
 
         pythonProcess.on('close', (code) => {
+            if (onFrame) stdoutData = streamSummary(stdoutData);
+
             if (code !== 0) {
                 console.error(`[FrameExtractor] Python process exited with code ${code}`);
                 console.error(`[FrameExtractor] stderr: ${stderrData}`);
@@ -189,6 +307,7 @@ export interface QuoteModeFrame {
     filename?: string;
     path?: string;
     url?: string;
+    encoding?: FrameEncoding;
     reason?: string;
     confidence?: number;
     faceBox?: number[];
@@ -208,6 +327,7 @@ export interface QuoteModeResult {
     skipCount: number;
     frames: QuoteModeFrame[];
     error?: string;
+    metrics?: ExtractionMetrics;
 }
 
 /**
@@ -220,13 +340,21 @@ export interface QuoteModeResult {
  * @param videoUrl - YouTube video URL
  * @param videoId - Unique video identifier
  * @param timestamps - Array of timestamps in seconds [45, 120, 185, ...]
+ * @param onFrame - Optional: called as each frame finishes (streams NDJSON from the script)
  * @returns Promise with extraction results including valid/skipped frames
  */
 export async function extractFramesAtTimestamps(
     videoUrl: string,
     videoId: string,
-    timestamps: number[]
+    timestamps: number[],
+    onFrame?: FrameCallback<QuoteModeFrame>
 ): Promise<QuoteModeResult> {
+    const workerResult = await runWorkerJob<QuoteModeResult>({ mode: 'quote', url: videoUrl, video_id: videoId, timestamps });
+    if (workerResult) {
+        workerResult.frames.forEach((frame, i) => onFrame?.(frame, i));
+        return workerResult;
+    }
+
     return new Promise((resolve, reject) => {
         const scriptPath = path.join(process.cwd(), 'scripts', 'extract_frames.py');
         const pythonCmd = getPythonCommand();
@@ -242,16 +370,19 @@ export async function extractFramesAtTimestamps(
             videoUrl,
             videoId,
             '--timestamps',
-            JSON.stringify(timestamps)
+            JSON.stringify(timestamps),
+            ...(onFrame ? ['--stream'] : [])
         ];
 
         const pythonProcess = spawn(pythonCmd, args);
 
         let stdoutData = '';
         let stderrData = '';
+        const handleFrames = onFrame ? streamFrameLines(onFrame) : null;
 
         pythonProcess.stdout.on('data', (data) => {
             stdoutData += data.toString();
+            handleFrames?.(data);
         });
 
         pythonProcess.stderr.on('data', (data) => {
@@ -262,6 +393,8 @@ export async function extractFramesAtTimestamps(
         });
 
         pythonProcess.on('close', (code) => {
+            if (onFrame) stdoutData = streamSummary(stdoutData);
+
             if (code !== 0) {
                 console.error(`[QuoteModeExtractor] Python process exited with code ${code}`);
                 console.error(`[QuoteModeExtractor] stderr: ${stderrData}`);
@@ -318,9 +451,11 @@ export interface RangeFrame {
     filename?: string;
     path?: string;
     url?: string;
+    encoding?: FrameEncoding;
     reason?: string;
     confidence?: number;
     blurScore?: number;
+    medianTime?: number;  // range midpoint; differs from timestamp when FRAME_RANGE_SAMPLES > 1
 }
 
 export interface RangeModeResult {
@@ -329,6 +464,7 @@ export interface RangeModeResult {
     videoId: string;
     frames: RangeFrame[];
     error?: string;
+    metrics?: ExtractionMetrics;
 }
 
 export interface SearchRange {
@@ -340,8 +476,21 @@ export interface SearchRange {
 export async function extractFramesFromRanges(
     videoUrl: string,
     videoId: string,
-    ranges: SearchRange[]
+    ranges: SearchRange[],
+    onFrame?: FrameCallback<RangeFrame>
 ): Promise<RangeModeResult> {
+    const workerResult = await runWorkerJob<RangeModeResult>({
+        mode: 'range',
+        video_path: videoUrl,
+        video_id: videoId,
+        ranges,
+        output_dir: path.join(process.cwd(), 'public', 'frames'),
+    });
+    if (workerResult) {
+        workerResult.frames.forEach((frame, i) => onFrame?.(frame, i));
+        return workerResult;
+    }
+
     return new Promise((resolve, reject) => {
         const scriptPath = path.join(process.cwd(), 'scripts', 'extract_frames.py');
         const pythonCmd = getPythonCommand();
@@ -352,15 +501,20 @@ export async function extractFramesFromRanges(
             '--ranges', JSON.stringify(ranges),
             '--video_path', videoUrl,
             '--output_dir', path.join(process.cwd(), 'public', 'frames'),
-            '--video_id', videoId
+            '--video_id', videoId,
+            ...(onFrame ? ['--stream'] : [])
         ];
 
         const pythonProcess = spawn(pythonCmd, args);
 
         let stdoutData = '';
         let stderrData = '';
+        const handleFrames = onFrame ? streamFrameLines(onFrame) : null;
 
-        pythonProcess.stdout.on('data', (data) => { stdoutData += data.toString(); });
+        pythonProcess.stdout.on('data', (data) => {
+            stdoutData += data.toString();
+            handleFrames?.(data);
+        });
         pythonProcess.stderr.on('data', (data) => {
             const msg = data.toString();
             stderrData += msg;
@@ -368,6 +522,8 @@ export async function extractFramesFromRanges(
         });
 
         pythonProcess.on('close', (code) => {
+            if (onFrame) stdoutData = streamSummary(stdoutData);
+
             if (code !== 0) {
                 console.error(`[RangeModeExtractor] Process exited with code ${code}`);
                 try {
@@ -0,0 +1,136 @@
+#!/usr/bin/env python3
+"""
+Batch Runner
+Runs a manifest of extraction jobs with separate limits for downloading and
+for CPU work.
+
+Backfilling dozens of videos with one extract_frames.py spawn each makes
+every process download and decode at the same time. Here each job goes
+through two stages:
+
+    download  a thread pool (I/O bound): fetches the video to a local path
+    process   a process pool (CPU bound): decode, detection, encoding
+
+A job enters the process pool as soon as its download finishes, so downloads
+for later jobs overlap CPU work for earlier ones. Downloads may only run
+ahead of processing by a bounded number of jobs, so a slow CPU stage does
+not fill the disk with videos waiting their turn. Each job's result is
+reported as soon as it finishes, in completion order.
+
+Manifest: a JSON array of job objects, {"jobs": [...]}, or NDJSON (one job
+per line), in the same shape as POST /jobs (see frame_worker).
+
+Usage:
+    python3 scripts/extract_frames.py --batch jobs.ndjson --download-workers 4 --cpu-workers 8
+"""
+
+import sys
+import json
+import time
+import queue
+import threading
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from contextlib import AbstractContextManager
+from typing import Callable, Dict, List, Optional
+
+
+def load_manifest(path: str) -> List[Dict]:
+    """Jobs from a JSON or NDJSON file ("-" reads stdin)."""
+    if path == "-":
+        text = sys.stdin.read()
+    else:
+        with open(path, encoding="utf-8") as f:
+            text = f.read()
+
+    try:
+        data = json.loads(text)
+    except ValueError:
+        data = []
+        for line_no, line in enumerate(text.splitlines(), 1):
+            if not line.strip():
+                continue
+            try:
+                data.append(json.loads(line))
+            except ValueError as e:
+                raise ValueError(f"{path}:{line_no}: {e}")
+
+    if isinstance(data, dict):
+        data = data.get("jobs", [data])
+    if not isinstance(data, list) or not all(isinstance(job, dict) for job in data):
+        raise ValueError(f"{path}: manifest must be job objects (a JSON array, {{\"jobs\": [...]}} or NDJSON)")
+    return data
+
+
+def run_batch(
+    jobs: List[Dict],
+    prepare: Callable[[Dict], AbstractContextManager],
+    runner: Callable[[Dict], Dict],
+    on_result: Callable[[int, Dict], None],
+    download_workers: int = 4,
+    cpu_workers: int = 1,
+    initializer: Optional[Callable[[], None]] = None
+) -> None:
+    """
+    Run every job; on_result(index, result) is called once per job, from this
+    thread, as jobs finish.
+
+    prepare(job) is entered on a download thread and yields the job to run
+    (e.g. with its URL replaced by a downloaded file); it is exited once the
+    job's result is in; the time spent entering it is added to the result's
+    "download" stage (see extraction_metrics). runner(job) runs in the
+    process pool and must be picklable (a module-level function).
+    """
+    download_workers = max(1, download_workers)
+    cpu_workers = max(1, cpu_workers)
+    done: "queue.Queue[tuple]" = queue.Queue()
+    # Downloaded-but-unprocessed jobs: enough to keep every CPU worker busy
+    ahead = threading.BoundedSemaphore(download_workers + cpu_workers)
+
+    ctx = multiprocessing.get_context("spawn")
+    with ThreadPoolExecutor(max_workers=download_workers, thread_name_prefix="batch-download") as downloads, \
+            ProcessPoolExecutor(max_workers=cpu_workers, mp_context=ctx, initializer=initializer) as pool:
+
+        def finish(index: int, prepared: Optional[AbstractContextManager], result: Dict, seconds: float) -> None:
+            metrics = result.get("metrics")
+            if isinstance(metrics, dict) and "stageSeconds" in metrics:
+                metrics["stageSeconds"]["download"] = round(metrics["stageSeconds"].get("download", 0.0) + seconds, 4)
+                metrics["wallSeconds"] = round(metrics["wallSeconds"] + seconds, 4)
+            try:
+                if prepared is not None:
+                    prepared.__exit__(None, None, None)
+            except Exception as e:
+                print(f"[Batch] ⚠ Job {index}: cleanup failed: {e}", file=sys.stderr)
+            finally:
+                ahead.release()
+                done.put((index, result))
+
+        def download(index: int, job: Dict) -> None:
+            ahead.acquire()
+            prepared = None
+            started = time.perf_counter()
+            try:
+                prepared = prepare(job)
+                local_job = prepared.__enter__()
+            except Exception as e:
+                finish(index, None, {"success": False, "error": str(e)}, 0.0)
+                return
+            seconds = time.perf_counter() - started
+
+            future = pool.submit(runner, local_job)
+
+            def collect(f) -> None:
+                try:
+                    result = f.result()
+                except Exception as e:
+                    result = {"success": False, "error": str(e)}
+                finish(index, prepared, result, seconds)
+
+            future.add_done_callback(collect)
+
+        for index, job in enumerate(jobs):
+            downloads.submit(download, index, job)
+
+        for _ in jobs:
+            index, result = done.get()
+            on_result(index, result)
@@ -0,0 +1,445 @@
+#!/usr/bin/env python3
+"""
+Extraction Benchmark Suite
+Times every extraction mode on locally synthesized videos (no download).
+
+Videos are written with cv2.VideoWriter from the face images under
+public/frames, at several resolutions, lengths and face-placement patterns,
+and cached under .cache/benchmark/ so repeated runs time the same input.
+
+Jobs timed per video:
+- range:    extract_frames_from_ranges, one 4s range after another
+- quote:    extract_frames_at_timestamps, one timestamp every 7s
+            (both start from an empty detection cache in a temp dir, so
+            they time extraction; range_warm / quote_warm repeat the job
+            against the results it just cached)
+- yolo:     process_frames_with_yolo over the sampled frames
+            (only when ultralytics and yolov8n.pt are available locally)
+- detector: SpeakerFaceDetector.detect_speaker_face on decoded frames
+- decode:   quote mode's smart-seek frames read with each decode backend
+            (cv2 seeking vs one ffmpeg process); frames must be identical
+- memory:   quote mode's decode + detect loop over the same frames, with
+            fresh arrays per frame vs reused buffers (FRAME_REUSE_BUFFERS),
+            each in a fresh process: bytes allocated per frame (tracemalloc,
+            which sees numpy / OpenCV result arrays) and peak RSS
+
+Output is JSON on stdout with latency and frames/sec per (video, job).
+With --baseline, each job is compared against a stored report and
+regressions beyond --tolerance are flagged (exit code 1).
+
+Usage:
+    python scripts/benchmark_extraction.py [--suite quick|full] [--jobs range,quote,yolo,detector,decode,memory]
+                                           [--save-baseline FILE] [--baseline FILE] [--tolerance 0.25]
+"""
+
+import sys
+import os
+import json
+import glob
+import time
+import shutil
+import hashlib
+import argparse
+import tempfile
+import platform
+import tracemalloc
+import importlib.util
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+import cv2
+import numpy as np
+from pathlib import Path
+from typing import Callable, Dict, List
+
+sys.path.insert(0, str(Path(__file__).parent))
+import extract_frames as ef
+import frame_encoder
+from detection_cache import DetectionCache
+from extraction_metrics import peak_rss_bytes
+
+ROOT = Path(__file__).parent.parent
+DEFAULT_IMAGES = str(ROOT / "public" / "frames" / "*.jpg")
+VIDEO_DIR = ROOT / ".cache" / "benchmark"
+VIDEO_FPS = 25
+SHOT_SECONDS = 4
+
+# name, width, height, seconds, placement pattern
+SUITES = {
+    "quick": [
+        ("single_720p_60s", 1280, 720, 60, "single"),
+        ("cuts_480p_60s", 854, 480, 60, "cuts"),
+    ],
+    "full": [
+        ("single_720p_60s", 1280, 720, 60, "single"),
+        ("single_1080p_60s", 1920, 1080, 60, "single"),
+        ("two_shot_1080p_60s", 1920, 1080, 60, "two_shot"),
+        ("wide_1080p_60s", 1920, 1080, 60, "wide"),
+        ("cuts_480p_180s", 854, 480, 180, "cuts"),
+    ],
+}
+
+JOBS = ["range", "quote", "yolo", "detector", "decode", "memory"]
+DETECTOR_SAMPLES = 20
+
+
+# ===============================
+# SYNTHETIC VIDEOS
+# ===============================
+def place(frame: np.ndarray, face: np.ndarray, cx: float, size: int) -> None:
+    """Paste a square face image centred at x = cx (fraction of width)."""
+    h, w = frame.shape[:2]
+    face = cv2.resize(face, (size, size), interpolation=cv2.INTER_AREA)
+    x = int(np.clip(w * cx - size / 2, 0, w - size))
+    y = (h - size) // 2
+    frame[y:y + size, x:x + size] = face
+
+
+def render_frame(faces: List[np.ndarray], pattern: str, width: int, height: int, t: float) -> np.ndarray:
+    shot = int(t // SHOT_SECONDS)
+    frame = np.full((height, width, 3), (40 + shot * 13) % 200, dtype=np.uint8)
+    sway = 0.004 * np.sin(t)  # Small head movement within a shot
+    face = faces[shot % len(faces)]
+
+    if pattern == "single":
+        place(frame, face, 0.5 + sway, int(height * 0.6))
+    elif pattern == "two_shot":
+        place(frame, face, 0.3 + sway, int(height * 0.4))
+        place(frame, faces[(shot + 1) % len(faces)], 0.7 - sway, int(height * 0.4))
+    elif pattern == "wide":
+        place(frame, face, 0.35 + 0.3 * (shot % 2) + sway, int(height * 0.25))
+    elif pattern == "cuts":
+        # Every third shot has no face (slides / b-roll)
+        if shot % 3 != 2:
+            place(frame, face, 0.5 + 0.1 * (shot % 2) + sway, int(height * 0.6))
+    else:
+        raise ValueError(f"Unknown pattern: {pattern}")
+    return frame
+
+
+def synthesize_video(name: str, width: int, height: int, seconds: int, pattern: str, images: str) -> str:
+    """Write the video once; later runs reuse the cached file."""
+    VIDEO_DIR.mkdir(parents=True, exist_ok=True)
+    path = VIDEO_DIR / f"{name}.mp4"
+    if path.exists():
+        return str(path)
+
+    faces = [img for img in (cv2.imread(p) for p in sorted(glob.glob(images))) if img is not None]
+    if not faces:
+        raise Exception(f"No images matched {images}")
+
+    print(f"[Benchmark] Writing {path.name}", file=sys.stderr)
+    tmp_path = VIDEO_DIR / f"{name}.part.mp4"
+    writer = cv2.VideoWriter(str(tmp_path), cv2.VideoWriter_fourcc(*"mp4v"), VIDEO_FPS, (width, height))
+    if not writer.isOpened():
+        raise Exception("cv2.VideoWriter could not open an mp4v writer")
+
+    rng = np.random.default_rng(0)
+    try:
+        for i in range(VIDEO_FPS * seconds):
+            frame = render_frame(faces, pattern, width, height, i / VIDEO_FPS)
+            # Sensor-like noise so consecutive frames are never identical
+            writer.write(cv2.add(frame, rng.integers(0, 8, frame.shape, dtype=np.uint8)))
+    finally:
+        writer.release()
+    os.replace(tmp_path, path)
+    return str(path)
+
+
+# ===============================
+# JOBS
+# ===============================
+def yolo_available() -> bool:
+    return importlib.util.find_spec("ultralytics") is not None and Path("yolov8n.pt").exists()
+
+
+def bench_range(video_path: str, seconds: int, output_dir: str) -> Dict:
+    ranges = [
+        {"start": s, "end": s + SHOT_SECONDS, "index": i}
+        for i, s in enumerate(range(0, seconds - SHOT_SECONDS + 1, SHOT_SECONDS))
+    ]
+    results = ef.extract_frames_from_ranges(video_path, ranges, output_dir, "bench")
+    return {"items": len(ranges), "valid": sum(1 for r in results if r.get("status") == "VALID")}
+
+
+def bench_quote(video_path: str, seconds: int, output_dir: str) -> Dict:
+    timestamps = list(range(1, seconds, 7))
+    results = ef.extract_frames_at_timestamps(video_path, timestamps, output_dir, "bench")
+    return {"items": len(timestamps), "valid": sum(1 for r in results if r.get("status") == "VALID")}
+
+
+def bench_yolo(video_path: str, seconds: int, output_dir: str) -> Dict:
+    # Count frames as they are consumed; the generator is lazy
+    count = [0]
+
+    def counted():
+        for item in ef.stream_sampled_frames(video_path):
+            count[0] += 1
+            yield item
+
+    results = ef.process_frames_with_yolo(counted(), output_dir, "bench")
+    return {"items": count[0], "valid": len(results)}
+
+
+def decode_samples(video_path: str, n: int) -> List[np.ndarray]:
+    cap = cv2.VideoCapture(video_path)
+    total = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
+    wanted = np.linspace(0, max(0, total - 1), n).astype(int)
+    frames = [frame for _, frame in ef.read_frames_sequential(cap, wanted, cap.get(cv2.CAP_PROP_FPS))
+              if frame is not None]
+    cap.release()
+    return frames
+
+
+def bench_detector(frames: List[np.ndarray]) -> Dict:
+    # The warm detector, so FRAME_DETECTION_* / FRAME_OUTPUT_SIZE apply as in extraction
+    detector = ef.get_speaker_detector()
+    detector.reset_tracking()
+    latencies = []
+    valid = 0
+    for frame in frames:
+        start = time.perf_counter()
+        result = detector.detect_speaker_face(frame)
+        latencies.append(time.perf_counter() - start)
+        valid += bool(result["detected"])
+    return {
+        "items": len(frames),
+        "valid": valid,
+        "item_latency_ms": {
+            "mean": round(float(np.mean(latencies)) * 1000, 2),
+            "p95": round(float(np.percentile(latencies, 95)) * 1000, 2)
+        } if latencies else None
+    }
+
+
+def smart_seek_targets(seconds: int, frame_at: Callable[[float], int]) -> List[int]:
+    """Every smart-seek candidate frame of bench_quote's timestamps."""
+    return sorted({
+        frame_at(ts + offset)
+        for ts in range(1, seconds, 7) for offset in ef.SEARCH_OFFSETS
+        if 0 <= ts + offset < seconds
+    })
+
+
+def bench_decode(video_path: str, seconds: int) -> Dict:
+    cap = cv2.VideoCapture(video_path)
+    fps = cap.get(cv2.CAP_PROP_FPS)
+    width = int(cap.get(cv2.CAP_PROP_FRAME_WIDTH))
+    height = int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
+    index = ef.load_frame_index(video_path, save=True)  # .cache/benchmark is ours
+    frame_at = index.frame_at if index is not None else (lambda t: int(t * fps))
+    frame_time = index.time_of if index is not None else (lambda n: n / fps)
+    targets = smart_seek_targets(seconds, frame_at)
+
+    latency = {}
+    digests = {}
+    for backend in ("opencv", "ffmpeg"):
+        start = time.perf_counter()
+        if backend == "opencv":
+            frames = ef.read_frames_sequential(cap, targets, fps, index=index)
+        else:
+            frames = ef.read_frames_ffmpeg(video_path, targets, frame_time, width, height)
+        digests[backend] = {n: hashlib.sha1(f).hexdigest() if f is not None else None for n, f in frames}
+        latency[backend] = round(time.perf_counter() - start, 3)
+    cap.release()
+
+    matching = sum(1 for n in targets if digests["opencv"].get(n) == digests["ffmpeg"].get(n))
+    return {
+        "items": len(targets),
+        "valid": matching,
+        "identical": matching == len(targets),
+        "backend_latency_s": latency,
+        "ffmpeg_speedup": round(latency["opencv"] / latency["ffmpeg"], 2) if latency["ffmpeg"] else None
+    }
+
+
+def _memory_run(video_path: str, seconds: int, reuse: bool) -> Dict:
+    """One decode + detect pass in this (fresh) process, allocations traced per frame."""
+    ef.REUSE_FRAME_BUFFERS = reuse
+    detector = ef.get_speaker_detector()
+    cap, fps, _, _, index = ef.open_video(video_path)
+    targets = smart_seek_targets(seconds, index.frame_at if index is not None else (lambda t: int(t * fps)))
+
+    tracemalloc.start()
+    allocated = []
+    traced_peak = 0
+    valid = 0
+    frames = ef.read_frames(cap, video_path, targets, fps, index=index)
+    while True:
+        # Peak above the live set while reading and analyzing one frame
+        tracemalloc.reset_peak()
+        live = tracemalloc.get_traced_memory()[0]
+        item = next(frames, None)
+        if item is None:
+            break
+        frame = item[1]
+        if frame is not None:
+            valid += bool(detector.detect_speaker_face(frame)["detected"])
+        peak = tracemalloc.get_traced_memory()[1]
+        allocated.append(peak - live)
+        traced_peak = max(traced_peak, peak)
+    tracemalloc.stop()
+    cap.release()
+
+    return {
+        "items": len(allocated),
+        "valid": valid,
+        "allocated_mb_per_frame": round(float(np.mean(allocated)) / 1024 ** 2, 2) if allocated else None,
+        "traced_peak_mb": round(traced_peak / 1024 ** 2, 1),
+        "peak_rss_mb": round(peak_rss_bytes() / 1024 ** 2, 1) if peak_rss_bytes() else None
+    }
+
+
+def bench_memory(video_path: str, seconds: int) -> Dict:
+    # Peak RSS is a lifetime high-water mark: one fresh process per setting
+    runs = {}
+    for name, reuse in (("fresh_arrays", False), ("reused_buffers", True)):
+        with ProcessPoolExecutor(max_workers=1, mp_context=multiprocessing.get_context("spawn")) as pool:
+            runs[name] = pool.submit(_memory_run, video_path, seconds, reuse).result()
+    return {
+        "items": runs["reused_buffers"]["items"],
+        "valid": runs["reused_buffers"]["valid"],
+        "same_valid": runs["fresh_arrays"]["valid"] == runs["reused_buffers"]["valid"],
+        **runs
+    }
+
+
+def fresh_detection_cache() -> str:
+    """Point extraction in this thread at an empty detection cache; returns its directory."""
+    cache_dir = tempfile.mkdtemp(prefix="bench_detections_")
+    config = ef.get_speaker_detector().config_fingerprint()
+    # get_detection_cache() keeps the thread's cache while the detector config matches
+    ef._warm.detection_cache = DetectionCache(config, root=cache_dir)
+    return cache_dir
+
+
+def timed(run: Callable[[], Dict]) -> Dict:
+    start = time.perf_counter()
+    result = run()
+    latency = time.perf_counter() - start
+    result["latency_s"] = round(latency, 3)
+    result["frames_per_sec"] = round(result["items"] / latency, 2) if latency > 0 else None
+    return result
+
+
+# ===============================
+# BASELINES
+# ===============================
+def compare(report: Dict, baseline: Dict, tolerance: float) -> List[Dict]:
+    """Jobs whose latency grew by more than `tolerance` (fraction) over the baseline."""
+    regressions = []
+    for video, jobs in report["videos"].items():
+        for job, result in jobs.items():
+            base = baseline.get("videos", {}).get(video, {}).get(job)
+            if not base or not base.get("latency_s") or "latency_s" not in result:
+                continue
+            ratio = result["latency_s"] / base["latency_s"]
+            result["baseline_latency_s"] = base["latency_s"]
+            result["vs_baseline"] = round(ratio, 3)
+            if ratio > 1 + tolerance:
+                regressions.append({
+                    "video": video,
+                    "job": job,
+                    "latency_s": result["latency_s"],
+                    "baseline_latency_s": base["latency_s"],
+                    "ratio": round(ratio, 3)
+                })
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark frame extraction on synthetic videos")
+    parser.add_argument("--suite", choices=sorted(SUITES), default="quick")
+    parser.add_argument("--jobs", default=",".join(JOBS), help="Comma-separated subset of " + ",".join(JOBS))
+    parser.add_argument("--images", default=DEFAULT_IMAGES, help="Glob of source face images")
+    parser.add_argument("--baseline", help="Stored report to compare against")
+    parser.add_argument("--save-baseline", help="Also write this report to FILE")
+    parser.add_argument("--tolerance", type=float, default=0.25,
+                        help="Allowed latency growth over the baseline (0.25 = +25%%)")
+    args = parser.parse_args()
+
+    jobs = [j.strip() for j in args.jobs.split(",") if j.strip()]
+    unknown = set(jobs) - set(JOBS)
+    if unknown:
+        parser.error(f"Unknown jobs: {', '.join(sorted(unknown))}")
+    if "yolo" in jobs and not yolo_available():
+        print("[Benchmark] ⚠ Skipping yolo: ultralytics or yolov8n.pt not available", file=sys.stderr)
+        jobs.remove("yolo")
+
+    # Model loading is not part of any job's latency
+    ef.get_speaker_detector()
+    if "yolo" in jobs:
+        ef.load_yolo_model()
+
+    report = {
+        "suite": args.suite,
+        "host": {
+            "python": platform.python_version(),
+            "opencv": cv2.__version__,
+            "cpus": ef.available_cpus()
+        },
+        "config": {
+            "detectionMaxSide": ef.DETECTION_MAX_SIDE,
+            "detectionTracking": ef.DETECTION_TRACKING,
+            "outputSize": ef.OUTPUT_SIZE,
+            "decodeBackend": ef.DECODE_BACKEND,
+            "legacySampling": ef.LEGACY_SAMPLING,
+            "outputFormat": frame_encoder.OUTPUT_FORMAT,
+            "faceBackend": ef.FACE_BACKEND,
+            "rangeSamples": ef.RANGE_SAMPLES,
+            "reuseFrameBuffers": ef.REUSE_FRAME_BUFFERS,
+            "detectionCache": ef.DETECTION_CACHE_ENABLED
+        },
+        "videos": {}
+    }
+
+    for name, width, height, seconds, pattern in SUITES[args.suite]:
+        video_path = synthesize_video(name, width, height, seconds, pattern, args.images)
+        results = {}
+        for job in jobs:
+            print(f"[Benchmark] {name}: {job}", file=sys.stderr)
+            output_dir = tempfile.mkdtemp(prefix="bench_frames_")
+            cache_dir = None
+            try:
+                if job in ("range", "quote"):
+                    run = bench_range if job == "range" else bench_quote
+                    if ef.DETECTION_CACHE_ENABLED:
+                        cache_dir = fresh_detection_cache()
+                    results[job] = timed(lambda: run(video_path, seconds, output_dir))
+                    if cache_dir is not None:
+                        results[f"{job}_warm"] = timed(lambda: run(video_path, seconds, output_dir))
+                elif job == "yolo":
+                    results[job] = timed(lambda: bench_yolo(video_path, seconds, output_dir))
+                elif job == "detector":
+                    frames = decode_samples(video_path, DETECTOR_SAMPLES)
+                    results[job] = timed(lambda: bench_detector(frames))
+                elif job == "decode":
+                    results[job] = timed(lambda: bench_decode(video_path, seconds))
+                elif job == "memory":
+                    # Allocation counts, not a latency: not compared against baselines
+                    results[job] = bench_memory(video_path, seconds)
+            finally:
+                shutil.rmtree(output_dir, ignore_errors=True)
+                if cache_dir is not None:
+                    shutil.rmtree(cache_dir, ignore_errors=True)
+        report["videos"][name] = results
+
+    exit_code = 0
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        report["regressions"] = compare(report, baseline, args.tolerance)
+        for r in report["regressions"]:
+            print(f"[Benchmark] ❌ Regression: {r['video']} {r['job']} "
+                  f"{r['latency_s']}s vs {r['baseline_latency_s']}s (x{r['ratio']})", file=sys.stderr)
+        exit_code = 1 if report["regressions"] else 0
+
+    if args.save_baseline:
+        with open(args.save_baseline, "w") as f:
+            json.dump(report, f, indent=2)
+
+    print(json.dumps(report, indent=2))
+    sys.exit(exit_code)
+
+
+if __name__ == "__main__":
+    main()
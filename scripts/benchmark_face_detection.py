@@ -0,0 +1,202 @@
+#!/usr/bin/env python3
+"""
+Face Detection Benchmark
+Compares SpeakerFaceDetector.detect_speaker_face at full resolution against
+downscaled working resolutions (detection_max_side), temporal reuse of
+detections between neighbouring frames (tracking) and other detection
+backends (see face_backends).
+
+Test frames are composed locally: each source image (face crops under
+public/frames by default) is placed on a flat background at several sizes and
+positions in a full-resolution frame, so no video download is needed. For
+tracking, each composed frame becomes a short "shot" of slightly shifted,
+noisy copies, like the smart-seek offsets around one quote.
+
+Reported per mode (JSON on stdout):
+- latency: mean / p50 / p95 ms per detect_speaker_face call
+- recall: share of frames detected at full resolution that are also detected
+- agreement: share of frames whose detected/not-detected outcome matches
+- box IoU: mean IoU against the full-resolution face box (frames both detect)
+- backends only: batch latency, ms per frame through detect_speaker_faces
+  in batches of --batch-size (one batched inference for yolo_person)
+
+Usage:
+    python scripts/benchmark_face_detection.py [--sides 480,640,960] [--frame-size 1920x1080] [--shot-length 7]
+    python scripts/benchmark_face_detection.py --sides "" --shot-length 0 --backends haar_alt2,lbp,yolo_person
+"""
+
+import sys
+import json
+import glob
+import time
+import argparse
+import cv2
+import numpy as np
+from pathlib import Path
+from typing import Dict, List, Optional
+
+sys.path.insert(0, str(Path(__file__).parent))
+from speaker_face_detector import SpeakerFaceDetector
+from face_backends import create_backend
+
+DEFAULT_IMAGES = str(Path(__file__).parent.parent / "public" / "frames" / "*.jpg")
+
+# Face image height as a share of frame height, and horizontal position
+PLACEMENTS = [(0.25, 0.5), (0.45, 0.3), (0.7, 0.5), (0.15, 0.75)]
+
+
+def compose_frames(image_paths: List[str], frame_w: int, frame_h: int) -> List[np.ndarray]:
+    frames = []
+    for path in image_paths:
+        img = cv2.imread(path)
+        if img is None:
+            continue
+        for size_ratio, x_ratio in PLACEMENTS:
+            frame = np.full((frame_h, frame_w, 3), 60, dtype=np.uint8)
+            side = int(frame_h * size_ratio)
+            face = cv2.resize(img, (side, side), interpolation=cv2.INTER_CUBIC)
+            x = int(np.clip(frame_w * x_ratio - side / 2, 0, frame_w - side))
+            y = (frame_h - side) // 2
+            frame[y:y + side, x:x + side] = face
+            frames.append(frame)
+    return frames
+
+
+def compose_shots(frames: List[np.ndarray], shot_length: int, seed: int = 0) -> List[np.ndarray]:
+    """Each frame repeated with small shifts and sensor-like noise."""
+    rng = np.random.default_rng(seed)
+    shots = []
+    for frame in frames:
+        h, w = frame.shape[:2]
+        for i in range(shot_length):
+            dx, dy = (int(v) for v in rng.integers(-3, 4, size=2)) if i else (0, 0)
+            shifted = cv2.warpAffine(
+                frame, np.float32([[1, 0, dx], [0, 1, dy]]), (w, h),
+                borderMode=cv2.BORDER_REPLICATE
+            )
+            noise = rng.normal(0, 2.0, size=frame.shape)
+            shots.append(np.clip(shifted + noise, 0, 255).astype(np.uint8))
+    return shots
+
+
+def iou(a: List[int], b: List[int]) -> float:
+    ax2, ay2 = a[0] + a[2], a[1] + a[3]
+    bx2, by2 = b[0] + b[2], b[1] + b[3]
+    iw = max(0, min(ax2, bx2) - max(a[0], b[0]))
+    ih = max(0, min(ay2, by2) - max(a[1], b[1]))
+    inter = iw * ih
+    union = a[2] * a[3] + b[2] * b[3] - inter
+    return inter / union if union else 0.0
+
+
+def run_mode(frames: List[np.ndarray], detector: SpeakerFaceDetector, repeat: int) -> Dict:
+    latencies = []
+    outcomes = []
+    for frame in frames:
+        result = None
+        for _ in range(repeat):
+            start = time.perf_counter()
+            result = detector.detect_speaker_face(frame)
+            latencies.append((time.perf_counter() - start) * 1000)
+        outcomes.append(result)
+    return {"latencies": latencies, "outcomes": outcomes}
+
+
+def batch_latency_ms(frames: List[np.ndarray], detector: SpeakerFaceDetector, batch_size: int) -> float:
+    detector.detect_speaker_faces(frames[:batch_size])  # Warm-up (model load)
+    start = time.perf_counter()
+    for k in range(0, len(frames), batch_size):
+        detector.detect_speaker_faces(frames[k:k + batch_size])
+    return round((time.perf_counter() - start) * 1000 / len(frames), 2)
+
+
+def summarize(run: Dict, baseline: Optional[Dict]) -> Dict:
+    lat = np.array(run["latencies"])
+    summary = {
+        "frames": len(run["outcomes"]),
+        "detected": sum(1 for r in run["outcomes"] if r["detected"]),
+        "latency_ms": {
+            "mean": round(float(lat.mean()), 2),
+            "p50": round(float(np.percentile(lat, 50)), 2),
+            "p95": round(float(np.percentile(lat, 95)), 2)
+        }
+    }
+    if baseline is None:
+        return summary
+
+    base_hits = [i for i, r in enumerate(baseline["outcomes"]) if r["detected"]]
+    both = [i for i in base_hits if run["outcomes"][i]["detected"]]
+    agree = sum(
+        1 for a, b in zip(baseline["outcomes"], run["outcomes"]) if a["detected"] == b["detected"]
+    )
+    ious = [iou(baseline["outcomes"][i]["face_box"], run["outcomes"][i]["face_box"]) for i in both]
+
+    summary["recall"] = round(len(both) / len(base_hits), 4) if base_hits else None
+    summary["agreement"] = round(agree / len(run["outcomes"]), 4) if run["outcomes"] else None
+    summary["box_iou_mean"] = round(float(np.mean(ious)), 4) if ious else None
+    summary["speedup"] = round(
+        float(np.mean(baseline["latencies"])) / float(lat.mean()), 2
+    ) if lat.mean() > 0 else None
+    return summary
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark face detection working resolutions")
+    parser.add_argument("--images", default=DEFAULT_IMAGES, help="Glob of source face images")
+    parser.add_argument("--sides", default="480,640,960", help="detection_max_side values to compare")
+    parser.add_argument("--frame-size", default="1920x1080", help="Composed frame size WxH")
+    parser.add_argument("--repeat", type=int, default=3, help="Timed runs per frame")
+    parser.add_argument("--shot-length", type=int, default=7,
+                        help="Frames per shot for the tracking comparison (0 = skip)")
+    parser.add_argument("--backends", default="",
+                        help="Detection backends to compare against haar (e.g. haar_alt2,lbp,yolo_person)")
+    parser.add_argument("--batch-size", type=int, default=8, help="Frames per detect_speaker_faces call")
+    args = parser.parse_args()
+
+    frame_w, frame_h = (int(v) for v in args.frame_size.lower().split("x"))
+    frames = compose_frames(sorted(glob.glob(args.images)), frame_w, frame_h)
+    if not frames:
+        print(json.dumps({"success": False, "error": f"No images matched {args.images}"}))
+        sys.exit(1)
+
+    print(f"[Benchmark] {len(frames)} frames at {frame_w}x{frame_h}", file=sys.stderr)
+
+    baseline = run_mode(frames, SpeakerFaceDetector(), args.repeat)
+    report = {"full": summarize(baseline, None)}
+
+    for side in (int(v) for v in args.sides.split(",") if v.strip()):
+        print(f"[Benchmark] detection_max_side={side}", file=sys.stderr)
+        run = run_mode(frames, SpeakerFaceDetector(detection_max_side=side), args.repeat)
+        report[f"max_side_{side}"] = summarize(run, baseline)
+
+    for name in (v.strip() for v in args.backends.split(",") if v.strip()):
+        print(f"[Benchmark] backend={name}", file=sys.stderr)
+        try:
+            detector = SpeakerFaceDetector(backend=create_backend(name))
+            run = run_mode(frames, detector, args.repeat)
+        except (ValueError, ImportError) as e:
+            report[f"backend_{name}"] = {"error": str(e)}
+            continue
+        report[f"backend_{name}"] = summarize(run, baseline)
+        report[f"backend_{name}"]["batch_latency_ms"] = batch_latency_ms(frames, detector, args.batch_size)
+
+    if args.shot_length > 0:
+        # Tracking state carries over between calls, so each shot frame is timed once
+        shots = compose_shots(frames, args.shot_length)
+        print(f"[Benchmark] tracking over {len(shots)} shot frames", file=sys.stderr)
+        shot_baseline = run_mode(shots, SpeakerFaceDetector(), 1)
+        tracker = SpeakerFaceDetector(tracking=True)
+        report["shots_full"] = summarize(shot_baseline, None)
+        report["shots_tracking"] = summarize(run_mode(shots, tracker, 1), shot_baseline)
+        report["shots_tracking"]["detector_calls"] = dict(tracker.tracking_stats)
+
+    print(json.dumps({
+        "success": True,
+        "frameSize": [frame_w, frame_h],
+        "frames": len(frames),
+        "modes": report
+    }, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,214 @@
+#!/usr/bin/env python3
+"""
+Detection Cache
+SQLite-backed cache of per-frame face detection results.
+
+Regenerating a carousel for the same video with slightly different quote
+timestamps or ranges mostly revisits frames that were already analyzed.
+Results are keyed by (video content hash, frame index, detector config), so
+a cached frame needs no decode, detection or enhancement. The enhanced crop
+is stored losslessly (PNG) next to the database, so frames written from a
+cached result are byte-identical to a fresh run.
+
+- video content hash: file size plus SHA-1 of a few 1 MiB samples, cheap
+  even for long videos and stable across cache paths / re-downloads
+- detector config: SpeakerFaceDetector.config_fingerprint(); entries made
+  with other thresholds are never read, and are reclaimed by eviction like
+  any unused entry (workers with different settings can share the cache)
+- eviction: least-recently-used entries once the crops exceed the byte budget
+"""
+
+import os
+import sys
+import json
+import time
+import sqlite3
+import hashlib
+import cv2
+import numpy as np
+from collections import OrderedDict
+from pathlib import Path
+from typing import Dict, List, Optional, Set, Tuple
+
+
+# ===============================
+# CONFIG
+# ===============================
+DETECTION_CACHE_DIR = os.environ.get(
+    "FRAME_DETECTION_CACHE_DIR",
+    str(Path(__file__).parent.parent / ".cache" / "detections")
+)
+DETECTION_CACHE_MAX_BYTES = int(os.environ.get("FRAME_DETECTION_CACHE_MAX_BYTES", 2 * 1024 ** 3))
+DETECTION_CACHE_ENABLED = os.environ.get("FRAME_DETECTION_CACHE", "1") != "0"
+
+HASH_SAMPLE_BYTES = 1024 ** 2
+HASH_SAMPLES = 4
+# Videos whose hash is kept in memory per process
+HASH_MEMO_SIZE = 32
+
+# Fields of a detect_speaker_face result that are stored (everything but the crop)
+RESULT_FIELDS = ["detected", "reason", "mode", "face_count", "face_box", "confidence", "blur_score", "face_ratio"]
+
+# abspath -> ((size, mtime), hash), least recently used first
+_hash_memo: "OrderedDict[str, Tuple[Tuple[int, int], str]]" = OrderedDict()
+
+
+def video_content_hash(video_path: str) -> str:
+    """Size + evenly spaced 1 MiB samples of the file (memoized per path, until size/mtime change)."""
+    st = os.stat(video_path)
+    memo_key, stamp = os.path.abspath(video_path), (st.st_size, st.st_mtime_ns)
+    memo_stamp, content_hash = _hash_memo.get(memo_key, (None, None))
+    if memo_stamp == stamp:
+        _hash_memo.move_to_end(memo_key)
+        return content_hash
+
+    h = hashlib.sha1(str(st.st_size).encode("utf-8"))
+    with open(video_path, "rb") as f:
+        span = max(0, st.st_size - HASH_SAMPLE_BYTES)
+        for k in range(HASH_SAMPLES):
+            f.seek(span * k // max(1, HASH_SAMPLES - 1))
+            h.update(f.read(HASH_SAMPLE_BYTES))
+
+    content_hash = h.hexdigest()[:20]
+    _hash_memo[memo_key] = (stamp, content_hash)
+    _hash_memo.move_to_end(memo_key)
+    while len(_hash_memo) > HASH_MEMO_SIZE:
+        _hash_memo.popitem(last=False)
+    return content_hash
+
+
+def _plain(value):
+    """numpy scalars / arrays -> JSON-native values."""
+    if isinstance(value, np.generic):
+        return value.item()
+    if isinstance(value, np.ndarray):
+        return value.tolist()
+    if isinstance(value, (list, tuple)):
+        return [_plain(v) for v in value]
+    return value
+
+
+class DetectionCache:
+    """Per-frame detection results for one detector configuration."""
+
+    def __init__(
+        self,
+        config: str,
+        root: str = DETECTION_CACHE_DIR,
+        max_bytes: int = DETECTION_CACHE_MAX_BYTES
+    ):
+        self.config = config
+        self.root = Path(root)
+        self.crops = self.root / "crops"
+        self.max_bytes = max_bytes
+        self.crops.mkdir(parents=True, exist_ok=True)
+
+        # Shard processes share the database: WAL + busy timeout
+        self.db = sqlite3.connect(str(self.root / "detections.sqlite3"), timeout=30)
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.execute("""
+            CREATE TABLE IF NOT EXISTS detections (
+                video_hash  TEXT    NOT NULL,
+                frame_index INTEGER NOT NULL,
+                config      TEXT    NOT NULL,
+                result      TEXT    NOT NULL,
+                crop_path   TEXT,
+                bytes       INTEGER NOT NULL DEFAULT 0,
+                last_used   REAL    NOT NULL,
+                PRIMARY KEY (video_hash, frame_index, config)
+            )
+        """)
+        self.db.execute("CREATE INDEX IF NOT EXISTS detections_lru ON detections (last_used)")
+        self.db.commit()
+
+    def contains(self, video_hash: str, frame_indices: List[int]) -> Set[int]:
+        """Which of these frames have a usable cached result."""
+        found = set()
+        for start in range(0, len(frame_indices), 500):
+            chunk = [int(n) for n in frame_indices[start:start + 500]]
+            rows = self.db.execute(
+                f"SELECT frame_index, crop_path FROM detections WHERE video_hash = ? AND config = ? "
+                f"AND frame_index IN ({','.join('?' * len(chunk))})",
+                [video_hash, self.config, *chunk]
+            ).fetchall()
+            found.update(n for n, crop_path in rows if not crop_path or os.path.exists(crop_path))
+        return found
+
+    def get(self, video_hash: str, frame_index: int) -> Optional[Dict]:
+        row = self.db.execute(
+            "SELECT result, crop_path FROM detections WHERE video_hash = ? AND frame_index = ? AND config = ?",
+            (video_hash, int(frame_index), self.config)
+        ).fetchone()
+        if row is None:
+            return None
+
+        result = json.loads(row[0])
+        if row[1]:
+            crop = cv2.imread(row[1], cv2.IMREAD_UNCHANGED)
+            if crop is None:
+                # Crop file gone (manual cleanup): treat as a miss
+                self.db.execute(
+                    "DELETE FROM detections WHERE video_hash = ? AND frame_index = ? AND config = ?",
+                    (video_hash, int(frame_index), self.config)
+                )
+                self.db.commit()
+                return None
+            result["cropped_face"] = crop
+
+        self.db.execute(
+            "UPDATE detections SET last_used = ? WHERE video_hash = ? AND frame_index = ? AND config = ?",
+            (time.time(), video_hash, int(frame_index), self.config)
+        )
+        self.db.commit()
+        return result
+
+    def put(self, video_hash: str, frame_index: int, face_result: Dict) -> None:
+        stored = {k: _plain(face_result[k]) for k in RESULT_FIELDS if k in face_result}
+
+        crop_path, size = None, 0
+        crop = face_result.get("cropped_face")
+        if crop is not None:
+            crop_path = str(self.crops / f"{video_hash}_{int(frame_index)}_{self.config}.png")
+            ok, buf = cv2.imencode(".png", crop, [cv2.IMWRITE_PNG_COMPRESSION, 1])
+            if not ok:
+                return
+            tmp_path = f"{crop_path}.{os.getpid()}.tmp"
+            with open(tmp_path, "wb") as f:
+                f.write(buf.tobytes())
+            os.replace(tmp_path, crop_path)
+            size = len(buf)
+
+        self.db.execute(
+            "INSERT OR REPLACE INTO detections VALUES (?, ?, ?, ?, ?, ?, ?)",
+            (video_hash, int(frame_index), self.config, json.dumps(stored), crop_path, size, time.time())
+        )
+        self.db.commit()
+
+    def evict(self) -> None:
+        """Delete least-recently-used results until the crops fit the byte budget."""
+        total = self.db.execute("SELECT COALESCE(SUM(bytes), 0) FROM detections").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+
+        removed = 0
+        rows = self.db.execute(
+            "SELECT video_hash, frame_index, config, crop_path, bytes FROM detections ORDER BY last_used"
+        ).fetchall()
+        for video_hash, frame_index, config, crop_path, size in rows:
+            if total <= self.max_bytes:
+                break
+            self._remove_crops([crop_path])
+            self.db.execute(
+                "DELETE FROM detections WHERE video_hash = ? AND frame_index = ? AND config = ?",
+                (video_hash, frame_index, config)
+            )
+            total -= size
+            removed += 1
+        self.db.commit()
+        print(f"[DetectionCache] Evicted {removed} results", file=sys.stderr)
+
+    @staticmethod
+    def _remove_crops(paths) -> None:
+        for p in paths:
+            if p:
+                Path(p).unlink(missing_ok=True)
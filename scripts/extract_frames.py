@@ -1,9 +1,18 @@
 #!/usr/bin/env python3
 """
 Video Frame Extractor with Quote-to-Frame Direct Mapping
-Supports two modes:
-1. LEGACY: Extract frames every 60 seconds with YOLO person detection
+Supports three modes:
+1. LEGACY: Extract frames every 60 seconds (or one per shot, FRAME_LEGACY_SAMPLING=scene)
+   with YOLO person detection
 2. QUOTE MODE: Extract frames at specific timestamps with speaker face detection
+3. RANGE MODE: One speaker frame per time range (--ranges), at the range's median
+   or the best of FRAME_RANGE_SAMPLES screened frames
+
+Quote and range jobs can split their items across worker processes (--workers,
+a pool kept for the process), download only the sections they need (--partial)
+or start extracting while the video is still downloading (FRAME_PROGRESSIVE_DOWNLOAD).
+Entry points: one job per invocation, a batch manifest (--batch), or a
+long-lived worker that keeps models warm between jobs (--serve).
 
 EC2 + PM2 + yt-dlp + ffmpeg + OpenCV safe
 """
@@ -13,12 +22,23 @@ import json
 import os
 import subprocess
 import cv2
+import numpy as np
 import uuid
 import argparse
+import functools
+import math
+import multiprocessing
+import shutil
+import tempfile
+import threading
+import time
 from pathlib import Path
-from typing import List, Dict, Optional
-from PIL import Image
-import imagehash
+import queue
+from concurrent.futures import ProcessPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+from contextlib import contextmanager
+from fractions import Fraction
+from typing import Callable, Iterable, Iterator, List, Dict, Optional, Set, Tuple
 
 # Import speaker face detector
 try:
@@ -28,16 +48,95 @@ except ImportError:
     sys.path.insert(0, str(Path(__file__).parent))
     from speaker_face_detector import SpeakerFaceDetector, format_timestamp
 
+from video_cache import VideoCache, VIDEO_CACHE_ENABLED, VIDEO_EXTENSIONS, cache_key, is_cache_entry
+from frame_scheduler import read_frames_sequential
+from ffmpeg_frames import (
+    iter_ffmpeg_frames, iter_ffmpeg_frames_with_pts, probe_video, read_frames_ffmpeg, read_frames_streamed
+)
+from progressive_download import ProgressiveDownload
+from phash_index import PerceptualHashIndex, phash_uint64
+from extraction_metrics import collect_metrics, current_metrics, export_textfile
+from frame_stream import current_listener, emit_frame, listen, ndjson_writer, remap_indices
+from detection_cache import DetectionCache, DETECTION_CACHE_ENABLED, video_content_hash
+from frame_index import FrameIndex, load_frame_index, remember_frame_index
+from frame_sink import open_frame_sink
+from frame_encoder import encode_frame
+from face_backends import FACE_BACKEND, create_backend
+
 # ===============================
 # CONFIG
 # ===============================
 FPS_VALUE = "1/60"
-FFMPEG_PATH = "ffmpeg"
+LEGACY_FRAME_WIDTH = 700
+
+# Legacy sampling: "interval" (one frame every FPS_VALUE) or "scene" (one frame
+# per shot, from ffmpeg's scene-change score, at most every SCENE_MIN_GAP_S and
+# at least every SCENE_MAX_GAP_S)
+LEGACY_SAMPLING = os.environ.get("FRAME_LEGACY_SAMPLING", "interval")
+SCENE_THRESHOLD = float(os.environ.get("FRAME_SCENE_THRESHOLD", 0.2))
+SCENE_MIN_GAP_S = float(os.environ.get("FRAME_SCENE_MIN_GAP_S", 2.0))
+SCENE_MAX_GAP_S = float(os.environ.get("FRAME_SCENE_MAX_GAP_S", 300.0))
+if LEGACY_SAMPLING not in ("interval", "scene"):
+    raise ValueError(f"FRAME_LEGACY_SAMPLING must be interval or scene, not {LEGACY_SAMPLING!r}")
 yt_dlp_path = "yt-dlp" 
+# HD Quality: Prefer 1080p, fallback to best available
+VIDEO_FORMAT = "bestvideo[height<=1080][ext=mp4]+bestaudio[ext=m4a]/bestvideo[height<=1080]+bestaudio/best[height<=1080]/best"
 MIN_W = 140
 MIN_H = 180
 DIFF_THRESHOLD = 27.5
 MAX_PEOPLE = 50
+YOLO_BATCH_SIZE = int(os.environ.get("FRAME_YOLO_BATCH_SIZE", 8))  # Frames per YOLO inference call
+
+# Professional Smart Seek: Search near timestamp if exact frame is bad
+# 0.0 (Exact), +0.5, +1.0, +1.5, +2.0 (Look forward), -0.5, -1.0 (Look back)
+SEARCH_OFFSETS = [0.0, 0.5, 1.0, 1.5, 2.0, -0.5, -1.0]
+
+# With a frame index, smart-seek offsets (not the exact timestamp) move to a
+# keyframe this close: intra-coded, so no inter-prediction artifacts
+KEYFRAME_SNAP_S = float(os.environ.get("FRAME_KEYFRAME_SNAP_S", 0.1))
+
+# Run the face cascade at this working resolution (longest side, px); 0 = full resolution
+DETECTION_MAX_SIDE = int(os.environ.get("FRAME_DETECTION_MAX_SIDE", 0)) or None
+
+# Reuse face detections between neighbouring frames (skip / ROI-only cascade when unchanged)
+DETECTION_TRACKING = os.environ.get("FRAME_DETECTION_TRACKING", "0") == "1"
+
+# Range mode: sample this many frames across each range (median included), rank them
+# by a cheap sharpness / exposure score on a PRESCREEN_WIDTH-wide grayscale copy and
+# run face detection on the best RANGE_TOP_K only. 1 = the median frame alone
+RANGE_SAMPLES = max(1, int(os.environ.get("FRAME_RANGE_SAMPLES", 1)))
+RANGE_TOP_K = max(1, int(os.environ.get("FRAME_RANGE_TOP_K", 2)))
+PRESCREEN_WIDTH = 320
+
+# Longest side of saved frames (px); crops are downscaled before enhancement. 0 = crop resolution
+OUTPUT_SIZE = int(os.environ.get("FRAME_OUTPUT_SIZE", 0)) or None
+
+# Quote / range frame decoding: "opencv" (VideoCapture seek + grab) or "ffmpeg" (one process, input seeks)
+DECODE_BACKEND = os.environ.get("FRAME_DECODE_BACKEND", "opencv")
+if DECODE_BACKEND not in ("opencv", "ffmpeg"):
+    raise ValueError(f"FRAME_DECODE_BACKEND must be opencv or ffmpeg, not {DECODE_BACKEND!r}")
+# Decode quote / range frames into one reused buffer, and convert them to grayscale
+# into another, instead of allocating both per frame. 0 = fresh arrays (for comparison)
+REUSE_FRAME_BUFFERS = os.environ.get("FRAME_REUSE_BUFFERS", "1") == "1"
+
+# Parallel extraction (--workers): time-contiguous shards, one process each
+def available_cpus() -> int:
+    try:
+        return len(os.sched_getaffinity(0))
+    except AttributeError:
+        return os.cpu_count() or 1
+
+EXTRACT_WORKERS = int(os.environ.get("FRAME_EXTRACT_WORKERS", 0)) or available_cpus()
+MIN_ITEMS_PER_SHARD = 4  # Smaller shards cost more in process startup than they save
+
+# Partial download (--partial): only fetch padded windows around the frames we need
+SECTION_VIDEO_FORMAT = "bestvideo[height<=1080][ext=mp4]/bestvideo[height<=1080]/best[height<=1080]/best"
+SECTION_PADDING_S = 3.0     # Extra seconds fetched on each side of a window
+SECTION_MERGE_GAP_S = 30.0  # Windows closer than this are fetched as one section
+
+# Full downloads (quote / range): extract while yt-dlp is still downloading
+# (video-only SECTION_VIDEO_FORMAT, one process, no shards)
+PROGRESSIVE_DOWNLOAD = os.environ.get("FRAME_PROGRESSIVE_DOWNLOAD", "0") == "1"
 
 # Custom encoder for numpy types
 class NumpyEncoder(json.JSONEncoder):
@@ -55,40 +154,227 @@ class NumpyEncoder(json.JSONEncoder):
         return json.JSONEncoder.default(self, obj)
 
 
+# ===============================
+# WARM MODELS
+# ===============================
+# Detectors are cached per thread so a long-lived worker (see --serve) pays
+# the Haar cascade / YOLO load once instead of once per job.
+_warm = threading.local()
+
+
+def get_speaker_detector() -> SpeakerFaceDetector:
+    detector = getattr(_warm, "detector", None)
+    if detector is None:
+        detector = SpeakerFaceDetector(
+            detection_max_side=DETECTION_MAX_SIDE,
+            tracking=DETECTION_TRACKING,
+            output_size=OUTPUT_SIZE,
+            reuse_buffers=REUSE_FRAME_BUFFERS,
+            # yolo_person shares legacy mode's warm model
+            backend=create_backend(FACE_BACKEND, yolo_loader=load_yolo_model)
+        )
+        _warm.detector = detector
+    return detector
+
+
+def get_detection_cache(detector: SpeakerFaceDetector) -> Optional[DetectionCache]:
+    """Per-thread handle on the detection cache for this detector's settings (None if disabled)."""
+    if not DETECTION_CACHE_ENABLED:
+        return None
+    cache = getattr(_warm, "detection_cache", None)
+    config = detector.config_fingerprint()
+    if cache is None or cache.config != config:
+        try:
+            cache = DetectionCache(config)
+        except Exception as e:
+            # A broken cache must never fail extraction
+            print(f"[DetectionCache] ⚠ Disabled: {e}", file=sys.stderr)
+            return None
+        _warm.detection_cache = cache
+    return cache
+
+
+def load_yolo_model():
+    model = getattr(_warm, "yolo", None)
+    if model is None:
+        print("[YOLO] Loading model...", file=sys.stderr)
+
+        from ultralytics import YOLO
+        import io, contextlib
+        with contextlib.redirect_stdout(io.StringIO()):
+            model = YOLO("yolov8n.pt").to("cpu")
+        _warm.yolo = model
+    return model
+
+
+def log_tracking_stats(detector: SpeakerFaceDetector, tag: str) -> None:
+    if detector.tracking:
+        stats = detector.tracking_stats
+        print(f"[{tag}] Face detection: {stats['full']} full-frame, {stats['roi']} ROI, "
+              f"{stats['reused']} reused", file=sys.stderr)
+
+
+def detect_face(detector: SpeakerFaceDetector, frame: np.ndarray) -> Dict:
+    """detect_speaker_face, with its time split into detection and enhancement."""
+    metrics = current_metrics()
+    enhance_before = detector.enhance_seconds
+    start = time.perf_counter()
+    result = detector.detect_speaker_face(frame)
+    enhance = detector.enhance_seconds - enhance_before
+    metrics.add_time("detection", time.perf_counter() - start - enhance)
+    metrics.add_time("enhancement", enhance)
+    metrics.count("detectorCalls")
+    return result
+
+
+def detect_and_cache(
+    detector: SpeakerFaceDetector,
+    frame: np.ndarray,
+    cache: Optional[DetectionCache],
+    video_hash: Optional[str],
+    frame_num: int
+) -> Dict:
+    face_result = detect_face(detector, frame)
+    if cache is not None:
+        cache.put(video_hash, frame_num, face_result)
+    return face_result
+
+
+def cached_detection(cache: Optional[DetectionCache], video_hash: Optional[str], frame_num: int) -> Optional[Dict]:
+    face_result = cache.get(video_hash, frame_num) if cache is not None else None
+    if face_result is not None:
+        current_metrics().count("cacheHits")
+    return face_result
+
+
+def open_video(
+    video_path: str,
+    download: Optional[ProgressiveDownload] = None
+) -> Tuple[Optional[cv2.VideoCapture], float, int, float, Optional[FrameIndex]]:
+    """(cap, fps, total_frames, duration, index); no capture while still downloading."""
+    with current_metrics().stage("probe"):
+        if download is not None:
+            info = download.info()
+            return None, info["fps"], int(info["duration"] * info["fps"]), info["duration"], None
+        
+        cap = cv2.VideoCapture(video_path)
+        if not cap.isOpened():
+            raise Exception(f"Could not open video: {video_path}")
+        
+        fps = cap.get(cv2.CAP_PROP_FPS)
+        total_frames = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
+        duration = total_frames / fps if fps > 0 else 0
+        return cap, fps, total_frames, duration, load_frame_index(video_path, save=is_cache_entry(video_path))
+
+
+def read_frames(
+    cap: Optional[cv2.VideoCapture],
+    video_path: str,
+    frame_nums: List[int],
+    fps: float,
+    wanted: Optional[Callable[[int], bool]] = None,
+    index: Optional[FrameIndex] = None,
+    download: Optional[ProgressiveDownload] = None
+) -> Iterator[Tuple[int, Optional[np.ndarray]]]:
+    """
+    (frame_num, frame) in ascending order from the configured decode backend.
+    With REUSE_FRAME_BUFFERS a frame is only valid until the next one is
+    yielded; callers copy the frames they keep.
+    """
+    reuse = REUSE_FRAME_BUFFERS
+    if download is not None:
+        info = download.info()
+        return _until_download_error(download, read_frames_streamed(
+            download.feed_to, frame_nums, lambda n: n / fps, info["width"], info["height"],
+            wanted=wanted, reuse_buffer=reuse
+        ))
+    if DECODE_BACKEND == "ffmpeg":
+        frame_time = index.time_of if index is not None else (lambda n: n / fps)
+        width = int(cap.get(cv2.CAP_PROP_FRAME_WIDTH))
+        height = int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
+        return read_frames_ffmpeg(video_path, frame_nums, frame_time, width, height, wanted=wanted, reuse_buffer=reuse)
+    return read_frames_sequential(cap, frame_nums, fps, wanted=wanted, index=index, reuse_buffer=reuse)
+
+
+def _until_download_error(
+    download: ProgressiveDownload,
+    frames: Iterator[Tuple[int, Optional[np.ndarray]]]
+) -> Iterator[Tuple[int, Optional[np.ndarray]]]:
+    """
+    Raise instead of yielding frames lost to a failed download, so they are
+    not reported as unreadable (extract_progressive resumes them).
+    """
+    for frame_num, frame in frames:
+        if frame is None and download.error is not None:
+            raise Exception(f"Download failed: {download.error}")
+        yield frame_num, frame
+
+
+def save_frame(sink, name: str, image: np.ndarray, quality: int) -> Tuple[str, str, str, Dict]:
+    """
+    Encode in memory (see frame_encoder) and hand the bytes to the frame sink.
+    name has no extension; returns (filename, path, url, encoding info).
+    """
+    metrics = current_metrics()
+    with metrics.stage("encoding"):
+        data, ext, encoding = encode_frame(image, quality)
+    filename = name + ext
+    with metrics.stage("write"):
+        out_path, url = sink.put(filename, data)
+    return filename, out_path, url, encoding
+
+
+def flush_sink(sink) -> None:
+    """Wait for the sink's pending uploads (counted as write time)."""
+    with current_metrics().stage("write"):
+        sink.flush()
+
+
+def frames_dir() -> str:
+    base_dir = Path(__file__).parent.parent / "public" / "frames"
+    base_dir.mkdir(parents=True, exist_ok=True)
+    return str(base_dir)
+
+
 # ===============================
 # DOWNLOAD VIDEO
 # ===============================
+def yt_dlp_args() -> List[str]:
+    return [
+        yt_dlp_path,
+        "--no-playlist",
+        "--cookies", "./cookies.txt",
+        "--extractor-args", "youtube:player_client=web",
+        "--js-runtimes", "node",
+        "--remote-components", "ejs:github",
+        "--retries", "5",
+        "--fragment-retries", "5",
+        "--sleep-interval", "2",
+        "--max-sleep-interval", "5",
+    ]
+
+
 def download_video(video_url: str, output_path: str) -> str:
     try:
         print(f"[yt-dlp] Downloading: {video_url}", file=sys.stderr)
 
         output_template = str(Path(output_path).with_suffix(".%(ext)s"))
 
-        cmd = [
-            yt_dlp_path,
-            "--no-playlist",
-            "--cookies", "./cookies.txt",
-            "--extractor-args", "youtube:player_client=web",
-            "--js-runtimes", "node",
-            "--remote-components", "ejs:github",
-            # HD Quality: Prefer 1080p, fallback to best available
-            "-f", "bestvideo[height<=1080][ext=mp4]+bestaudio[ext=m4a]/bestvideo[height<=1080]+bestaudio/best[height<=1080]/best",
+        cmd = yt_dlp_args() + [
+            "-f", VIDEO_FORMAT,
             "--merge-output-format", "mp4",
-            "--retries", "5",
-            "--fragment-retries", "5",
-            "--sleep-interval", "2",
-            "--max-sleep-interval", "5",
             "-o", output_template,
             video_url
         ]
 
-        subprocess.run(
-            cmd,
-            check=True,
-            stdout=subprocess.PIPE,
-            stderr=subprocess.PIPE,
-            text=True
-        )
+        with current_metrics().stage("download"):
+            subprocess.run(
+                cmd,
+                check=True,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.PIPE,
+                text=True
+            )
 
         base = Path(output_path).with_suffix("")
         for ext in [".mp4", ".webm", ".mkv"]:
@@ -104,20 +390,327 @@ def download_video(video_url: str, output_path: str) -> str:
 
 
 # ===============================
-# EXTRACT FRAMES (LEGACY MODE)
+# PARTIAL DOWNLOAD (SECTIONS)
+# ===============================
+def plan_sections(windows: List[Tuple[float, float]]) -> List[Tuple[float, float]]:
+    """Merge (start, end) windows into the sorted list of sections to download."""
+    sections = []
+    for start, end in sorted(windows):
+        start = max(0.0, start)
+        if sections and start - sections[-1][1] <= SECTION_MERGE_GAP_S:
+            sections[-1] = (sections[-1][0], max(sections[-1][1], end))
+        else:
+            sections.append((start, end))
+    return sections
+
+
+def download_sections(
+    video_url: str,
+    sections: List[Tuple[float, float]],
+    work_dir: str
+) -> List[Tuple[float, float, str]]:
+    """
+    Download only the given time sections (video stream only, no audio).
+    Cuts are re-encoded at keyframes so section-local time 0 is exactly the
+    section start. Returns [(start, end, path), ...] in section order.
+    """
+    try:
+        total = sum(end - start for start, end in sections)
+        print(f"[yt-dlp] Downloading {len(sections)} sections ({total:.0f}s total): {video_url}", file=sys.stderr)
+
+        cmd = yt_dlp_args() + [
+            "-f", SECTION_VIDEO_FORMAT,
+            "--force-keyframes-at-cuts",
+            "-o", os.path.join(work_dir, "section.%(section_start)s.%(ext)s"),
+        ]
+        for start, end in sections:
+            cmd += ["--download-sections", f"*{start:.3f}-{end:.3f}"]
+        cmd.append(video_url)
+
+        with current_metrics().stage("download"):
+            subprocess.run(
+                cmd,
+                check=True,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.PIPE,
+                text=True
+            )
+    except subprocess.CalledProcessError as e:
+        raise Exception(e.stderr.strip())
+
+    # section.<start>.<ext> -> match back to the requested start times
+    downloaded = {}
+    for name in os.listdir(work_dir):
+        if not name.startswith("section.") or Path(name).suffix not in (".mp4", ".webm", ".mkv"):
+            continue
+        try:
+            downloaded[float(name[len("section."):-len(Path(name).suffix)])] = os.path.join(work_dir, name)
+        except ValueError:
+            continue
+
+    results = []
+    for start, end in sections:
+        match = next((p for s, p in downloaded.items() if abs(s - start) < 0.01), None)
+        if match is None:
+            raise Exception(f"Section {start:.1f}-{end:.1f}s was not downloaded")
+        results.append((start, end, match))
+
+    print(f"[yt-dlp] ✓ Saved {len(results)} sections", file=sys.stderr)
+    return results
+
+
+def quote_windows(timestamps: List[float]) -> List[Tuple[float, float]]:
+    return [
+        (ts + min(SEARCH_OFFSETS) - SECTION_PADDING_S, ts + max(SEARCH_OFFSETS) + SECTION_PADDING_S)
+        for ts in timestamps
+    ]
+
+
+def range_windows(ranges: List[Dict]) -> List[Tuple[float, float]]:
+    windows = []
+    for item in ranges:
+        times = range_sample_times(float(item['start']), float(item['end']), RANGE_SAMPLES)
+        windows.append((min(times) - SECTION_PADDING_S, max(times) + SECTION_PADDING_S))
+    return windows
+
+
+def extract_from_sections(
+    video_url: str,
+    items: List,
+    windows: List[Tuple[float, float]],
+    extract: Callable[..., List[Dict]],
+    output_dir: str,
+    video_id: str
+) -> List[Dict]:
+    """
+    Run an extractor (extract_frames_at_timestamps / extract_frames_from_ranges)
+    over only the downloaded sections covering each item's window.
+    Items are grouped per section and shifted by the section start, so the
+    results carry original video timestamps and come back in request order.
+    """
+    sections = plan_sections(windows)
+    work_dir = tempfile.mkdtemp(prefix="sections_", dir=output_dir)
+
+    try:
+        downloaded = download_sections(video_url, sections, work_dir)
+
+        groups: Dict[int, List[int]] = {}
+        for idx, (start, end) in enumerate(windows):
+            center = (start + end) / 2.0
+            section_idx = next(
+                (i for i, (s, e, _) in enumerate(downloaded) if s <= center <= e),
+                len(downloaded) - 1
+            )
+            groups.setdefault(section_idx, []).append(idx)
+
+        results: List[Optional[Dict]] = [None] * len(items)
+        for section_idx, idxs in sorted(groups.items()):
+            start, end, path = downloaded[section_idx]
+            print(f"[Sections] {start:.1f}s → {end:.1f}s: {len(idxs)} items", file=sys.stderr)
+            with remap_indices(idxs):
+                section_results = extract(path, [items[i] for i in idxs], output_dir, video_id, time_offset=start)
+            for i, r in zip(idxs, section_results):
+                results[i] = r
+
+        return results
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+
+def is_video_url(video_path: str) -> bool:
+    return video_path.startswith("http://") or video_path.startswith("https://")
+
+
+def is_video_cached(video_url: str) -> bool:
+    if not VIDEO_CACHE_ENABLED:
+        return False
+    cache = VideoCache()
+    return cache.find(cache_key(video_url, VIDEO_FORMAT)) is not None
+
+
+@contextmanager
+def fetch_video(video_url: str, work_dir: str) -> Iterator[str]:
+    """
+    Yield a local copy of the video for the duration of a job.
+    Served from the shared video cache unless FRAME_VIDEO_CACHE=0, in which
+    case it is downloaded to a temp file in work_dir and removed afterwards.
+    A local path (e.g. a batch job's prefetched video) is used as is.
+    """
+    if not is_video_url(video_url):
+        yield video_url
+        return
+
+    if VIDEO_CACHE_ENABLED:
+        with VideoCache().open(video_url, VIDEO_FORMAT, download_video) as video_path:
+            yield video_path
+        return
+
+    temp_video = os.path.join(work_dir, f"temp_{uuid.uuid4().hex}.mp4")
+    try:
+        yield download_video(video_url, temp_video)
+    finally:
+        for ext in [".mp4", ".webm", ".mkv"]:
+            p = temp_video.replace(".mp4", ext)
+            if os.path.exists(p):
+                os.remove(p)
+
+
+def cache_progressive_download(video_url: str, download: ProgressiveDownload) -> None:
+    """
+    Hand a completed progressive download to the video cache, so the next job
+    for this video does not download it again. It is stored under the full
+    video's key: extraction only reads the video stream, which is the same.
+    """
+    if not VIDEO_CACHE_ENABLED or not download.done or download.error is not None:
+        return
+    ext = download.info().get("ext")
+    if f".{ext}" not in VIDEO_EXTENSIONS:
+        return
+
+    def adopt(_url: str, output_path: str) -> str:
+        path = os.path.splitext(output_path)[0] + f".{ext}"
+        shutil.move(download.path, path)
+        return path
+
+    try:
+        with VideoCache().open(video_url, VIDEO_FORMAT, adopt):
+            pass
+    except Exception as e:
+        print(f"[Progressive] ⚠ Could not cache the download: {e}", file=sys.stderr)
+
+
+def extract_progressive(
+    video_url: str,
+    items: List,
+    extract: Callable[..., List[Dict]],
+    output_dir: str,
+    video_id: str,
+    workers: Optional[int] = None
+) -> List[Dict]:
+    """
+    Run an extractor while the video is still downloading (PROGRESSIVE_DOWNLOAD):
+    items are processed in time order as soon as their frames arrive, so early
+    timestamps do not wait for the whole file. If the stream cannot be decoded
+    front to back or the download fails, the items not finished yet are
+    extracted from the complete file (or a fresh download); finished items
+    are neither reported nor saved twice. A download that completes is kept
+    in the video cache.
+    """
+    work_dir = tempfile.mkdtemp(prefix="progressive_", dir=output_dir)
+    download = ProgressiveDownload(yt_dlp_args(), video_url, SECTION_VIDEO_FORMAT, work_dir)
+    
+    # Results already handed to the listener, by item
+    finished: Dict[int, Dict] = {}
+    parent = current_listener()
+    
+    def record(i: int, frame: Dict) -> None:
+        finished[i] = frame
+        if parent is not None:
+            parent(i, frame)
+    
+    try:
+        try:
+            with listen(record):
+                results = extract(download.path, items, output_dir, video_id, download=download)
+            cache_progressive_download(video_url, download)
+            return results
+        except Exception as e:
+            print(f"[Progressive] ⚠ Cannot extract while downloading: {e}", file=sys.stderr)
+        
+        remaining = [i for i in range(len(items)) if i not in finished]
+        print(f"[Progressive] {len(remaining)} of {len(items)} items left; waiting for the complete download...",
+              file=sys.stderr)
+        try:
+            video_path = download.wait()
+        except Exception as e:
+            print(f"[Progressive] ⚠ {e}", file=sys.stderr)
+            video_path = None
+        
+        subset = [items[i] for i in remaining]
+        with remap_indices(remaining):
+            if video_path is not None:
+                rest = extract_parallel(extract, video_path, subset, output_dir, video_id, workers=workers)
+            else:
+                with fetch_video(video_url, output_dir) as fetched:
+                    rest = extract_parallel(extract, fetched, subset, output_dir, video_id, workers=workers)
+        
+        results = [finished.get(i) for i in range(len(items))]
+        for i, r in zip(remaining, rest):
+            results[i] = r
+        if video_path is not None:
+            cache_progressive_download(video_url, download)
+        return results
+    finally:
+        download.close()
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+
+# ===============================
+# STREAM FRAMES (LEGACY MODE)
 # ===============================
-def extract_raw_frames(video_path: str, frames_dir: str) -> None:
-    print("[ffmpeg] Extracting frames...", file=sys.stderr)
+def stream_sampled_frames(video_path: str, pool_size: int = YOLO_BATCH_SIZE) -> Iterator[Tuple[float, np.ndarray]]:
+    """
+    Yield (timestamp, frame) every FPS_VALUE (or once per shot, see
+    LEGACY_SAMPLING), scaled to LEGACY_FRAME_WIDTH, decoded by ffmpeg straight
+    into reusable buffers (see ffmpeg_frames).
+    A frame is overwritten after pool_size more frames have been read.
+    """
+    with current_metrics().stage("probe"):
+        info = probe_video(video_path)
+    out_h = max(2, int(round(info["height"] * LEGACY_FRAME_WIDTH / info["width"])))
+    
+    if LEGACY_SAMPLING == "scene":
+        yield from stream_scene_frames(video_path, out_h, pool_size)
+        return
+    
+    interval = float(1 / Fraction(FPS_VALUE))
 
-    subprocess.run([
-        FFMPEG_PATH,
-        "-loglevel", "error",
-        "-i", video_path,
-        "-vf", f"fps={FPS_VALUE},scale=700:-1",
-        f"{frames_dir}/raw_%04d.jpg"
-    ], check=True)
+    print(f"[ffmpeg] Streaming frames every {interval:g}s at {LEGACY_FRAME_WIDTH}x{out_h}...", file=sys.stderr)
 
-    print("[ffmpeg] ✓ Frames extracted", file=sys.stderr)
+    frames = iter_ffmpeg_frames(
+        video_path,
+        LEGACY_FRAME_WIDTH,
+        out_h,
+        video_filter=f"fps={FPS_VALUE},scale={LEGACY_FRAME_WIDTH}:{out_h}",
+        pool_size=pool_size
+    )
+    try:
+        for k, frame in enumerate(frames):
+            # The fps filter emits output frame k at exactly k * interval
+            yield k * interval, frame
+    finally:
+        frames.close()
+
+
+def stream_scene_frames(video_path: str, out_h: int, pool_size: int) -> Iterator[Tuple[float, np.ndarray]]:
+    """
+    The first frame of each shot: select passes a frame when its scene score
+    (difference to the previous frame) exceeds SCENE_THRESHOLD and at least
+    SCENE_MIN_GAP_S has passed, or when SCENE_MAX_GAP_S has passed without one.
+    Static talking-head footage yields a handful of frames, cutaways are not
+    missed between fixed samples.
+    """
+    select = (
+        f"select='isnan(prev_selected_t)"
+        f"+gte(t-prev_selected_t,{SCENE_MAX_GAP_S:g})"
+        f"+gt(scene,{SCENE_THRESHOLD:g})*gte(t-prev_selected_t,{SCENE_MIN_GAP_S:g})'"
+    )
+    print(f"[ffmpeg] Streaming one frame per shot (scene > {SCENE_THRESHOLD:g}, "
+          f"every {SCENE_MIN_GAP_S:g}-{SCENE_MAX_GAP_S:g}s) at {LEGACY_FRAME_WIDTH}x{out_h}...", file=sys.stderr)
+
+    frames = iter_ffmpeg_frames_with_pts(
+        video_path,
+        LEGACY_FRAME_WIDTH,
+        out_h,
+        # select first: only selected frames are scaled; scaling every frame
+        # costs more than the scene score saves on smaller input
+        video_filter=f"{select},scale={LEGACY_FRAME_WIDTH}:{out_h}",
+        pool_size=pool_size
+    )
+    try:
+        yield from frames
+    finally:
+        frames.close()
 
 
 # ===============================
@@ -127,7 +720,10 @@ def extract_frames_at_timestamps(
     video_path: str,
     timestamps: List[int],  # List of seconds [45, 120, 185, ...]
     output_dir: str,
-    video_id: str
+    video_id: str,
+    time_offset: float = 0.0,
+    download: Optional[ProgressiveDownload] = None,
+    sink=None
 ) -> List[Dict]:
     """
     Extract frames at EXACT timestamps where quotes were spoken.
@@ -138,6 +734,10 @@ def extract_frames_at_timestamps(
         timestamps: List of timestamps in seconds
         output_dir: Directory to save frames
         video_id: Unique video identifier
+        time_offset: Start time of video_path within the original video
+            (partial downloads); results keep original timestamps
+        download: video_path is still being downloaded (progressive mode)
+        sink: where frames are stored (default: FRAME_SINK, see frame_sink)
     
     Returns:
         List of frame results with status (VALID or SKIP_FRAME)
@@ -145,102 +745,202 @@ def extract_frames_at_timestamps(
     print(f"[QuoteMode] Extracting {len(timestamps)} frames at specific timestamps", file=sys.stderr)
     
     # Initialize speaker face detector
-    detector = SpeakerFaceDetector()
+    detector = get_speaker_detector()
+    detector.reset_tracking()
+    # An incomplete file has no content hash yet
+    cache = get_detection_cache(detector) if download is None else None
+    video_hash = video_content_hash(video_path) if cache is not None else None
+    sink = sink or open_frame_sink(output_dir)
     
     # Open video
-    cap = cv2.VideoCapture(video_path)
-    if not cap.isOpened():
-        raise Exception(f"Could not open video: {video_path}")
-    
-    fps = cap.get(cv2.CAP_PROP_FPS)
-    total_frames = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
-    duration = total_frames / fps if fps > 0 else 0
+    cap, fps, total_frames, duration, index = open_video(video_path, download)
     
     print(f"[QuoteMode] Video: {fps:.2f} FPS, {total_frames} frames, {duration:.2f}s duration", file=sys.stderr)
+    if time_offset:
+        print(f"[QuoteMode] Section starts at {time_offset:.2f}s", file=sys.stderr)
     
-    results = []
+    # Collect every smart-seek candidate up front, in priority order per timestamp
+    candidates: List[List[Tuple[float, float, int]]] = []
+    for original_ts in timestamps:
+        cands = []
+        for offset in SEARCH_OFFSETS:
+            ts = original_ts + offset
+            local_ts = ts - time_offset
+            
+            # Boundary check
+            if ts < 0 or local_ts < 0 or local_ts > duration:
+                continue
+            
+            if index is None:
+                frame_num = int(local_ts * fps)
+            else:
+                frame_num = index.frame_at(local_ts)
+                keyframe = index.nearest_keyframe(local_ts, KEYFRAME_SNAP_S) if offset else None
+                if keyframe is not None and all(keyframe != c[2] for c in cands):
+                    frame_num = keyframe
+                    ts = index.time_of(keyframe) + time_offset
+            
+            # Two offsets landing on the same frame would give the same result
+            if any(frame_num == c[2] for c in cands):
+                continue
+            
+            cands.append((offset, ts, frame_num))
+        candidates.append(cands)
     
-    try:
-        for idx, original_ts in enumerate(timestamps):
-            print(f"[QuoteMode] Processing timestamp {original_ts}s ({idx+1}/{len(timestamps)})", file=sys.stderr)
+    results: List[Optional[Dict]] = [None] * len(timestamps)
+    next_candidate = [0] * len(timestamps)
+    fail_info = [("UNKNOWN", {}) for _ in timestamps]
+    
+    # frame_num -> timestamps still waiting to evaluate it
+    needed_by: Dict[int, set] = {}
+    for idx, cands in enumerate(candidates):
+        for _, _, frame_num in cands:
+            needed_by.setdefault(frame_num, set()).add(idx)
+    
+    # Decoded frames (None = read failed) and their detections, kept only
+    # while some unresolved timestamp still needs them
+    frames: Dict[int, Optional[np.ndarray]] = {}
+    detections: Dict[int, Dict] = {}
+    
+    # Frames analyzed by an earlier run: never decoded
+    cached = cache.contains(video_hash, list(needed_by)) if cache is not None else set()
+    # Cached frames whose result was evicted before it was read: decoded after all
+    evicted: Set[int] = set()
+    
+    def release(idx: int, frame_num: int) -> None:
+        waiting = needed_by.get(frame_num)
+        if waiting is None:
+            return
+        waiting.discard(idx)
+        if not waiting:
+            del needed_by[frame_num]
+            frames.pop(frame_num, None)
+            detections.pop(frame_num, None)
+    
+    def finish_skip(idx: int) -> None:
+        original_ts = timestamps[idx]
+        best_fail_reason, best_fail_details = fail_info[idx]
+        results[idx] = {
+            "timestampFormatted": format_timestamp(original_ts),
+            "timestamp": original_ts,
+            "originalTimestamp": original_ts,
+            "status": "SKIP_FRAME",
+            "reason": best_fail_reason,
+            "details": best_fail_details
+        }
+        print(f"[QuoteMode] ⚠ SKIP_FRAME at {original_ts}s after smart seek: {best_fail_reason}", file=sys.stderr)
+        emit_frame(idx, results[idx])
+    
+    def advance(idx: int) -> None:
+        """Evaluate this timestamp's candidates in priority order as far as decoded frames allow."""
+        cands = candidates[idx]
+        original_ts = timestamps[idx]
+        
+        while next_candidate[idx] < len(cands):
+            offset, ts, frame_num = cands[next_candidate[idx]]
+            if frame_num not in frames and frame_num not in cached:
+                return  # Not decoded yet
             
-            # Professional Smart Seek: Search near timestamp if exact frame is bad
-            # 0.0 (Exact), +0.5, +1.0, +1.5, +2.0 (Look forward), -0.5, -1.0 (Look back)
-            search_offsets = [0.0, 0.5, 1.0, 1.5, 2.0, -0.5, -1.0]
+            # Detect (once per frame, shared by overlapping smart-seek windows)
+            face_result = detections.get(frame_num)
+            if face_result is None and frame_num in cached:
+                face_result = cached_detection(cache, video_hash, frame_num)
+                if face_result is None:
+                    # Evicted since contains(): wait for it to be decoded
+                    cached.discard(frame_num)
+                    evicted.add(frame_num)
+                    return
             
-            found_valid_frame = False
-            best_fail_reason = "UNKNOWN"
-            best_fail_details = {}
+            if next_candidate[idx] == 0:
+                print(f"[QuoteMode] Processing timestamp {original_ts}s ({idx+1}/{len(timestamps)})", file=sys.stderr)
+            next_candidate[idx] += 1
             
-            for offset in search_offsets:
-                ts = original_ts + offset
-                
-                # Boundary check
-                if ts < 0 or ts > duration:
+            if face_result is None:
+                frame = frames[frame_num]
+                if frame is None:
+                    release(idx, frame_num)
                     continue
-                    
-                frame_num = int(ts * fps)
-                cap.set(cv2.CAP_PROP_POS_FRAMES, frame_num)
-                ret, frame = cap.read()
+                face_result = detect_and_cache(detector, frame, cache, video_hash, frame_num)
+            detections[frame_num] = face_result
+            release(idx, frame_num)
+            
+            if face_result['detected']:
+                # Success!
+                cropped = face_result['cropped_face']
+                filename, out_path, url, encoding = save_frame(sink, f"{video_id}_quote_{int(ts):04d}", cropped, 95)
                 
-                if not ret or frame is None:
-                    continue
-                    
-                # Detect
-                face_result = detector.detect_speaker_face(frame)
+                results[idx] = {
+                    "timestampFormatted": format_timestamp(ts),
+                    "timestamp": ts,  # Actual frame time
+                    "originalTimestamp": original_ts, # Requested time (for matching)
+                    "status": "VALID",
+                    "filename": filename,
+                    "path": out_path,
+                    "url": url,
+                    "encoding": encoding,
+                    "confidence": face_result.get('confidence', 0.0),
+                    "faceBox": face_result.get('face_box'),
+                    "blurScore": face_result.get('blur_score')
+                }
                 
-                if face_result['detected']:
-                    # Success!
-                    filename = f"{video_id}_quote_{int(ts):04d}.jpg"
-                    out_path = os.path.join(output_dir, filename)
-                    
-                    cropped = face_result['cropped_face']
-                    cv2.imwrite(out_path, cropped, [cv2.IMWRITE_JPEG_QUALITY, 95])
-                    
-                    results.append({
-                        "timestampFormatted": format_timestamp(ts),
-                        "timestamp": ts,  # Actual frame time
-                        "originalTimestamp": original_ts, # Requested time (for matching)
-                        "status": "VALID",
-                        "filename": filename,
-                        "path": out_path,
-                        "url": f"/frames/{filename}",
-                        "confidence": face_result.get('confidence', 0.0),
-                        "faceBox": face_result.get('face_box'),
-                        "blurScore": face_result.get('blur_score')
-                    })
-                    
-                    print(f"[QuoteMode] ✓ Valid frame found at {ts}s (Offset: {offset}s)", file=sys.stderr)
-                    found_valid_frame = True
-                    break
-                else:
-                    # Keep track of why we failed (prioritizing the exact timestamp's reason)
-                    if offset == 0.0:
-                        best_fail_reason = face_result.get('reason', 'UNKNOWN')
-                        best_fail_details = {
-                            "blur_score": face_result.get('blur_score'),
-                            "face_ratio": face_result.get('face_ratio')
-                        }
+                print(f"[QuoteMode] ✓ Valid frame found at {ts}s (Offset: {offset}s)", file=sys.stderr)
+                emit_frame(idx, results[idx])
+                
+                # Remaining candidates are no longer needed (and won't be decoded)
+                for _, _, other in cands[next_candidate[idx]:]:
+                    release(idx, other)
+                return
             
-            # If loop finishes without success
-            if not found_valid_frame:
-                results.append({
-                    "timestampFormatted": format_timestamp(original_ts),
-                    "timestamp": original_ts,
-                    "originalTimestamp": original_ts,
-                    "status": "SKIP_FRAME",
-                    "reason": best_fail_reason,
-                    "details": best_fail_details
+            # Keep track of why we failed (prioritizing the exact timestamp's reason)
+            if offset == 0.0:
+                fail_info[idx] = (face_result.get('reason', 'UNKNOWN'), {
+                    "blur_score": face_result.get('blur_score'),
+                    "face_ratio": face_result.get('face_ratio')
                 })
-                print(f"[QuoteMode] ⚠ SKIP_FRAME at {original_ts}s after smart seek: {best_fail_reason}", file=sys.stderr)
+        
+        # If loop finishes without success
+        finish_skip(idx)
+    
+    try:
+        # Timestamps with no in-bounds candidates resolve immediately, and
+        # those settled by cached frames alone need no decoding at all
+        for idx, cands in enumerate(candidates):
+            if not cands:
+                finish_skip(idx)
+            elif cached:
+                advance(idx)
+        
+        # One forward pass over every candidate frame, decoding only what is still needed
+        wanted = lambda n: n in needed_by and n not in cached
+        pending = list(needed_by)
+        while pending:
+            for frame_num, frame in read_frames(cap, video_path, pending, fps, wanted=wanted, index=index, download=download):
+                frames[frame_num] = frame
+                for idx in sorted(needed_by.get(frame_num, ())):
+                    if results[idx] is None:
+                        advance(idx)
+                if frame is not None and frames.get(frame_num) is frame:
+                    # Still waiting on an earlier candidate: keep it past the next read
+                    frames[frame_num] = frame.copy()
+            # Evicted frames the pass had already gone past: one more pass for them
+            pending = sorted(n for n in evicted if n in needed_by and n not in frames)
+            evicted.clear()
+        
+        for idx in range(len(timestamps)):
+            if results[idx] is None:
+                finish_skip(idx)
         
     finally:
-        if 'cap' in locals() and cap.isOpened():
+        if cap is not None and cap.isOpened():
             cap.release()
+    flush_sink(sink)
     
     valid_count = sum(1 for r in results if r.get('status') == 'VALID')
     skip_count = sum(1 for r in results if r.get('status') == 'SKIP_FRAME')
     print(f"[QuoteMode] Results: {valid_count} valid, {skip_count} skipped", file=sys.stderr)
+    log_tracking_stats(detector, "QuoteMode")
+    if cache is not None:
+        cache.evict()
     
     return results
 
@@ -248,123 +948,242 @@ def extract_frames_at_timestamps(
 # ===============================
 # MEDIAN FRAME EXTRACTION (PROFESSIONAL)
 # ===============================
-def extract_frames_from_ranges(video_path: str, ranges: List[Dict], output_dir: str, video_id: str) -> List[Dict]:
+def range_sample_times(start: float, end: float, samples: int) -> List[float]:
+    """The median, then samples - 1 evenly spaced times across [start, end]."""
+    median_ts = (start + end) / 2.0
+    if samples <= 1 or end <= start:
+        return [median_ts]
+    step = (end - start) / (samples - 1)
+    return [median_ts] + [start + (j + 0.5) * step for j in range(samples - 1)]
+
+
+def extract_frames_from_ranges(
+    video_path: str,
+    ranges: List[Dict],
+    output_dir: str,
+    video_id: str,
+    time_offset: float = 0.0,
+    download: Optional[ProgressiveDownload] = None,
+    sink=None
+) -> List[Dict]:
     """
     Extracts a SINGLE FRAME at the MEDIAN timestamp (midpoint) of each range.
     This provides a predictable, professional result tied to the content's timeline.
+    With FRAME_RANGE_SAMPLES > 1, the best of several frames across the range
+    instead (cheap pre-screen, then face detection on the top RANGE_TOP_K).
     
     ranges: [{"start": 10, "end": 20, "index": 0}, ...]
+    time_offset: start time of video_path within the original video (partial downloads)
+    download: video_path is still being downloaded (progressive mode)
+    sink: where frames are stored (default: FRAME_SINK, see frame_sink)
     """
-    cap = cv2.VideoCapture(video_path)
-    if not cap.isOpened():
-        raise Exception(f"Could not open video: {video_path}")
+    cap, fps, total_frames, duration, index = open_video(video_path, download)
     
-    fps = cap.get(cv2.CAP_PROP_FPS)
-    total_frames = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
-    duration = total_frames / fps if fps > 0 else 0
-    
-    detector = SpeakerFaceDetector()
-    results = []
+    detector = get_speaker_detector()
+    detector.reset_tracking()
+    cache = get_detection_cache(detector) if download is None else None
+    video_hash = video_content_hash(video_path) if cache is not None else None
+    sink = sink or open_frame_sink(output_dir)
     
     print(f"\n{'='*60}", file=sys.stderr)
     print(f"  📹 MEDIAN FRAME EXTRACTION", file=sys.stderr)
     print(f"  Video: {fps:.1f} FPS | {duration:.1f}s duration | {len(ranges)} slides", file=sys.stderr)
     print(f"{'='*60}", file=sys.stderr)
     
+    def log_slide(slide_idx: int, start_time: float, end_time: float, median_ts: float) -> None:
+        print(f"\n  [Slide #{slide_idx + 1}]", file=sys.stderr)
+        print(f"    Range: {start_time:.1f}s → {end_time:.1f}s", file=sys.stderr)
+        print(f"    Median: {median_ts:.1f}s", file=sys.stderr)
+    
+    def process(
+        i: int,
+        frame_num: int,
+        frame: Optional[np.ndarray],
+        face_result: Optional[Dict] = None,
+        ts: Optional[float] = None
+    ) -> Dict:
+        start_time, end_time, slide_idx, median_ts = slides[i]
+        log_slide(slide_idx, start_time, end_time, median_ts)
+        ts = median_ts if ts is None else ts
+        
+        if face_result is None and frame is None:
+            print(f"    ⚠️  SKIP: Could not read frame", file=sys.stderr)
+            return {
+                "slideIndex": slide_idx,
+                "status": "SKIP_FRAME",
+                "reason": "FRAME_READ_FAILED",
+                "startTime": start_time,
+                "endTime": end_time,
+                "medianTime": median_ts
+            }
+        
+        # Detect and crop speaker face (unless an earlier run already did)
+        if face_result is None:
+            face_result = detect_and_cache(detector, frame, cache, video_hash, frame_num)
+        
+        if face_result['detected']:
+            # Save the cropped frame
+            cropped = face_result['cropped_face']
+            filename, out_path, url, encoding = save_frame(
+                sink, f"{video_id}_slide_{slide_idx}_{int(ts):04d}", cropped, 100  # HD Quality
+            )
+            
+            mode = face_result.get('mode', 'UNKNOWN')
+            blur = face_result.get('blur_score', 0)
+            
+            if ts != median_ts:
+                print(f"    Best frame: {ts:.1f}s", file=sys.stderr)
+            print(f"    ✅ EXTRACTED: {filename}", file=sys.stderr)
+            print(f"       Mode: {mode} | Blur: {blur:.0f}", file=sys.stderr)
+            
+            result = {
+                "slideIndex": slide_idx,
+                "timestampFormatted": format_timestamp(ts),
+                "timestamp": ts,
+                "startTime": start_time,
+                "endTime": end_time,
+                "status": "VALID",
+                "filename": filename,
+                "path": out_path,
+                "url": url,
+                "encoding": encoding,
+                "confidence": face_result.get('confidence', 0.0),
+                "blurScore": blur,
+                "mode": mode
+            }
+            if RANGE_SAMPLES > 1:
+                result["medianTime"] = median_ts
+            return result
+        
+        reason = face_result.get('reason', 'UNKNOWN')
+        print(f"    ⚠️  SKIP: {reason}", file=sys.stderr)
+        
+        return {
+            "slideIndex": slide_idx,
+            "status": "SKIP_FRAME",
+            "reason": reason,
+            "startTime": start_time,
+            "endTime": end_time,
+            "medianTime": median_ts,
+            "details": {
+                "blur_score": face_result.get('blur_score'),
+                "face_ratio": face_result.get('face_ratio')
+            }
+        }
+    
+    # Sampled ranges: frame -> (range, sample time); per range the best-scored
+    # frames so far (-score, sample no, time, frame number, frame) and samples left
+    sample_frames: Dict[int, List[Tuple[int, int, float]]] = {}
+    shortlists: Dict[int, List[Tuple]] = {}
+    remaining: Dict[int, int] = {}
+    
+    def screen(i: int, sample_no: int, ts: float, frame_num: int, frame: Optional[np.ndarray], score: float) -> None:
+        if frame is not None:
+            shortlist = shortlists[i]
+            # Copied: readers may reuse the buffer for later frames
+            shortlist.append((-score, sample_no, ts, frame_num, frame.copy()))
+            shortlist.sort(key=lambda c: c[:2])
+            del shortlist[RANGE_TOP_K:]
+        remaining[i] -= 1
+    
+    def pick_best(i: int) -> Dict:
+        """Full detection on the shortlist, best score first; the first face wins."""
+        shortlist = shortlists.pop(i)
+        if not shortlist:
+            return process(i, -1, None)
+        fallback = None
+        for _, _, ts, frame_num, frame in shortlist:
+            face_result = cached_detection(cache, video_hash, frame_num)
+            if face_result is None:
+                face_result = detect_and_cache(detector, frame, cache, video_hash, frame_num)
+            if face_result['detected']:
+                return process(i, frame_num, frame, face_result, ts)
+            fallback = fallback or (frame_num, frame, face_result, ts)
+        # Report why the best-scored frame failed
+        return process(i, *fallback)
+    
+    slides = []
+    by_frame: Dict[int, List[int]] = {}
+    results: List[Optional[Dict]] = [None] * len(ranges)
+    
     try:
-        for item in ranges:
+        for i, item in enumerate(ranges):
             start_time = float(item['start'])
             end_time = float(item['end'])
             slide_idx = item.get('index', 0)
             
             # Calculate MEDIAN (midpoint) timestamp
             median_ts = (start_time + end_time) / 2.0
+            slides.append((start_time, end_time, slide_idx, median_ts))
             
-            print(f"\n  [Slide #{slide_idx + 1}]", file=sys.stderr)
-            print(f"    Range: {start_time:.1f}s → {end_time:.1f}s", file=sys.stderr)
-            print(f"    Median: {median_ts:.1f}s", file=sys.stderr)
+            local_ts = median_ts - time_offset
             
             # Boundary check
-            if median_ts > duration:
+            if local_ts > duration or local_ts < 0:
+                log_slide(slide_idx, start_time, end_time, median_ts)
                 print(f"    ⚠️  SKIP: Timestamp exceeds video duration", file=sys.stderr)
-                results.append({
+                results[i] = {
                     "slideIndex": slide_idx,
                     "status": "SKIP_FRAME",
                     "reason": "TIMESTAMP_OUT_OF_BOUNDS",
                     "startTime": start_time,
                     "endTime": end_time,
                     "medianTime": median_ts
-                })
+                }
+                emit_frame(i, results[i])
                 continue
             
-            # Extract frame at median timestamp
-            frame_num = int(median_ts * fps)
-            cap.set(cv2.CAP_PROP_POS_FRAMES, frame_num)
-            ret, frame = cap.read()
+            if RANGE_SAMPLES > 1:
+                seen = set()
+                shortlists[i], remaining[i] = [], 0
+                for sample_no, ts in enumerate(range_sample_times(start_time, end_time, RANGE_SAMPLES)):
+                    local = ts - time_offset
+                    if not 0 <= local <= duration:
+                        continue
+                    n = int(local * fps) if index is None else index.frame_at(local)
+                    if n not in seen:
+                        seen.add(n)
+                        sample_frames.setdefault(n, []).append((i, sample_no, ts))
+                        remaining[i] += 1
+                continue
             
-            if not ret or frame is None:
-                print(f"    ⚠️  SKIP: Could not read frame", file=sys.stderr)
-                results.append({
-                    "slideIndex": slide_idx,
-                    "status": "SKIP_FRAME",
-                    "reason": "FRAME_READ_FAILED",
-                    "startTime": start_time,
-                    "endTime": end_time,
-                    "medianTime": median_ts
-                })
+            frame_num = int(local_ts * fps) if index is None else index.frame_at(local_ts)
+            face_result = cached_detection(cache, video_hash, frame_num)
+            if face_result is not None:
+                results[i] = process(i, frame_num, None, face_result)
+                emit_frame(i, results[i])
                 continue
             
-            # Detect and crop speaker face
-            face_result = detector.detect_speaker_face(frame)
+            # Frame at median timestamp, read below in one forward pass
+            by_frame.setdefault(frame_num, []).append(i)
+        
+        wanted = list(set(by_frame) | set(sample_frames))
+        for frame_num, frame in read_frames(cap, video_path, wanted, fps, index=index, download=download):
+            for i in by_frame.get(frame_num, ()):
+                results[i] = process(i, frame_num, frame)
+                emit_frame(i, results[i])
             
-            if face_result['detected']:
-                # Save the cropped frame
-                filename = f"{video_id}_slide_{slide_idx}_{int(median_ts):04d}.jpg"
-                out_path = os.path.join(output_dir, filename)
-                
-                cropped = face_result['cropped_face']
-                cv2.imwrite(out_path, cropped, [cv2.IMWRITE_JPEG_QUALITY, 100])  # HD Quality
-                
-                mode = face_result.get('mode', 'UNKNOWN')
-                blur = face_result.get('blur_score', 0)
-                
-                print(f"    ✅ EXTRACTED: {filename}", file=sys.stderr)
-                print(f"       Mode: {mode} | Blur: {blur:.0f}", file=sys.stderr)
-                
-                results.append({
-                    "slideIndex": slide_idx,
-                    "timestampFormatted": format_timestamp(median_ts),
-                    "timestamp": median_ts,
-                    "startTime": start_time,
-                    "endTime": end_time,
-                    "status": "VALID",
-                    "filename": filename,
-                    "path": out_path,
-                    "url": f"/frames/{filename}",
-                    "confidence": face_result.get('confidence', 0.0),
-                    "blurScore": blur,
-                    "mode": mode
-                })
+            samples = sample_frames.get(frame_num, ())
+            if samples and frame is not None:
+                with current_metrics().stage("detection"):
+                    score = detector.prescreen_score(frame, PRESCREEN_WIDTH)
             else:
-                reason = face_result.get('reason', 'UNKNOWN')
-                print(f"    ⚠️  SKIP: {reason}", file=sys.stderr)
-                
-                results.append({
-                    "slideIndex": slide_idx,
-                    "status": "SKIP_FRAME",
-                    "reason": reason,
-                    "startTime": start_time,
-                    "endTime": end_time,
-                    "medianTime": median_ts,
-                    "details": {
-                        "blur_score": face_result.get('blur_score'),
-                        "face_ratio": face_result.get('face_ratio')
-                    }
-                })
+                score = 0.0
+            for i, sample_no, ts in samples:
+                screen(i, sample_no, ts, frame_num, frame, score)
+                if remaining[i] == 0:
+                    results[i] = pick_best(i)
+                    emit_frame(i, results[i])
+        
+        # Ranges whose samples were not all delivered (e.g. reading stopped early)
+        for i in list(shortlists):
+            results[i] = pick_best(i)
+            emit_frame(i, results[i])
 
     finally:
-        if 'cap' in locals() and cap.isOpened():
+        if cap is not None and cap.isOpened():
             cap.release()
+    flush_sink(sink)
     
     # Summary
     valid_count = sum(1 for r in results if r.get('status') == 'VALID')
@@ -372,10 +1191,157 @@ def extract_frames_from_ranges(video_path: str, ranges: List[Dict], output_dir:
     print(f"\n{'='*60}", file=sys.stderr)
     print(f"  📊 SUMMARY: {valid_count} extracted, {skip_count} skipped", file=sys.stderr)
     print(f"{'='*60}\n", file=sys.stderr)
+    log_tracking_stats(detector, "RangeMode")
+    if cache is not None:
+        cache.evict()
             
     return results
 
 
+# ===============================
+# PARALLEL EXTRACTION (SHARDS)
+# ===============================
+def item_time(item) -> float:
+    """Timeline position of a quote timestamp or a range (its median)."""
+    if isinstance(item, dict):
+        return (float(item['start']) + float(item['end'])) / 2.0
+    return float(item)
+
+
+def shard_by_time(items: List, workers: int) -> List[List[int]]:
+    """Split item indices into at most `workers` time-contiguous shards."""
+    order = sorted(range(len(items)), key=lambda i: item_time(items[i]))
+    shard_count = max(1, min(workers, math.ceil(len(order) / MIN_ITEMS_PER_SHARD)))
+    size = math.ceil(len(order) / shard_count) if order else 1
+    return [order[k:k + size] for k in range(0, len(order), size)]
+
+
+# Shard processes outlive a job: started on first use and kept (with their
+# imports and warm detectors) for later jobs in the same process, e.g. --serve
+_shard_lock = threading.Lock()
+_shard_pool: Optional[ProcessPoolExecutor] = None
+_shard_pool_size = 0
+_shard_manager = None
+
+
+def _init_shard_process() -> None:
+    # One process per core already; keep OpenCV from spawning its own threads on top
+    cv2.setNumThreads(1)
+    get_speaker_detector()
+
+
+def shard_pool(size: int) -> ProcessPoolExecutor:
+    """The shared shard pool, grown to at least `size` processes."""
+    global _shard_pool, _shard_pool_size
+    with _shard_lock:
+        if _shard_pool is None or _shard_pool_size < size:
+            if _shard_pool is not None:
+                # Jobs already submitted to the smaller pool still finish
+                _shard_pool.shutdown(wait=False)
+            _shard_pool = ProcessPoolExecutor(
+                max_workers=size, mp_context=multiprocessing.get_context("spawn"), initializer=_init_shard_process
+            )
+            _shard_pool_size = size
+        return _shard_pool
+
+
+def discard_shard_pool(pool: ProcessPoolExecutor) -> None:
+    """Drop a broken pool (a shard process died) so the next job starts a new one."""
+    global _shard_pool, _shard_pool_size
+    with _shard_lock:
+        if _shard_pool is pool:
+            _shard_pool, _shard_pool_size = None, 0
+    pool.shutdown(wait=False)
+
+
+def shard_manager():
+    """Shared multiprocessing manager for streamed-frame queues (started on first use)."""
+    global _shard_manager
+    with _shard_lock:
+        if _shard_manager is None:
+            _shard_manager = multiprocessing.get_context("spawn").Manager()
+        return _shard_manager
+
+
+def _run_shard(
+    extract, video_path, items, output_dir, video_id, time_offset, shard_no=0, frame_queue=None, index=None
+) -> Tuple[List[Dict], Dict]:
+    if index is not None:
+        remember_frame_index(video_path, index)
+    # Streamed frames go back to the parent, which owns the output
+    forward = (lambda i, frame: frame_queue.put((shard_no, i, frame))) if frame_queue is not None else None
+    with collect_metrics() as metrics, listen(forward):
+        results = extract(video_path, items, output_dir, video_id, time_offset=time_offset)
+    return results, metrics.to_dict()
+
+
+def forward_shard_frames(frame_queue, shards: List[List[int]], listener) -> None:
+    while True:
+        try:
+            shard_no, i, frame = frame_queue.get_nowait()
+        except queue.Empty:
+            return
+        listener(shards[shard_no][i], frame)
+
+
+def extract_parallel(
+    extract: Callable[..., List[Dict]],
+    video_path: str,
+    items: List,
+    output_dir: str,
+    video_id: str,
+    time_offset: float = 0.0,
+    workers: Optional[int] = None
+) -> List[Dict]:
+    """
+    Run extract_frames_at_timestamps / extract_frames_from_ranges across a
+    process pool. Each worker gets a time-contiguous shard and opens its own
+    capture; results are merged back into request order, so the output
+    (including file names) is the same as a serial run. The pool is kept
+    for later jobs (shard_pool), so only the first one pays process startup
+    and detector loading.
+    """
+    shards = shard_by_time(items, workers or EXTRACT_WORKERS)
+    if len(shards) <= 1:
+        return extract(video_path, items, output_dir, video_id, time_offset=time_offset)
+
+    print(f"[Parallel] {len(items)} items across {len(shards)} worker processes", file=sys.stderr)
+    
+    # Built once here and handed to the shards
+    with current_metrics().stage("probe"):
+        index = load_frame_index(video_path, save=is_cache_entry(video_path))
+
+    results: List[Optional[Dict]] = [None] * len(items)
+    listener = current_listener()
+    frame_queue = shard_manager().Queue() if listener is not None else None
+    pool = shard_pool(len(shards))
+    try:
+        futures = [
+            pool.submit(
+                _run_shard, extract, video_path, [items[i] for i in shard], output_dir, video_id, time_offset,
+                shard_no, frame_queue, index
+            )
+            for shard_no, shard in enumerate(shards)
+        ]
+        if frame_queue is not None:
+            # Stream frames as shards finish them, not when the whole shard is done
+            pending = set(futures)
+            while pending:
+                _, pending = wait(pending, timeout=0.1)
+                forward_shard_frames(frame_queue, shards, listener)
+
+        for shard, future in zip(shards, futures):
+            shard_results, shard_metrics = future.result()
+            current_metrics().merge(shard_metrics)
+            for i, r in zip(shard, shard_results):
+                results[i] = r
+    except BrokenProcessPool:
+        discard_shard_pool(pool)
+        raise
+
+    return results
+
+
 # ===============================
 # CROP HELPER (LEGACY)
 # ===============================
@@ -397,185 +1363,392 @@ def crop_center_square(img, x1, y1, x2, y2):
 # ===============================
 # YOLO PROCESSING (LEGACY)
 # ===============================
-def process_frames_with_yolo(frames_dir: str, video_id: str) -> List[Dict]:
-    print("[YOLO] Loading model...", file=sys.stderr)
-    
-    from ultralytics import YOLO
-    import io, contextlib
-    with contextlib.redirect_stdout(io.StringIO()):
-        model = YOLO("yolov8n.pt").to("cpu")
+def iter_batches(items: Iterable, batch_size: int) -> Iterator[List]:
+    batch = []
+    for item in items:
+        batch.append(item)
+        if len(batch) >= max(1, batch_size):
+            yield batch
+            batch = []
+    if batch:
+        yield batch
 
-    known_hashes = []
-    saved = 0
-    results = []
-
-    raw_files = sorted(f for f in os.listdir(frames_dir) if f.startswith("raw_"))
-
-    for f in raw_files:
-        frame_path = os.path.join(frames_dir, f)
-        frame = cv2.imread(frame_path)
-        if frame is None:
-            continue
 
-        detections = model(frame, conf=0.4, imgsz=640, verbose=False)[0]
-
-        for box in detections.boxes:
-            if int(box.cls[0]) != 0:
-                continue
+def process_frames_with_yolo(
+    frames: Iterable[Tuple[float, np.ndarray]],
+    output_dir: str,
+    video_id: str,
+    batch_size: int = YOLO_BATCH_SIZE,
+    hash_index: Optional[PerceptualHashIndex] = None,
+    sink=None
+) -> List[Dict]:
+    """
+    Run YOLO person detection over (timestamp, frame) pairs in batches of
+    batch_size. Per-frame handling (person filter, size checks, crop, phash
+    dedup, MAX_PEOPLE stop) is applied in frame order, so the output is the
+    same as running the model one frame at a time. Iteration stops as soon
+    as MAX_PEOPLE is reached, so a streaming source stops decoding too.
 
-            x1, y1, x2, y2 = map(int, box.xyxy[0])
-            if (x2 - x1) < MIN_W or (y2 - y1) < MIN_H:
-                continue
+    Pass a pre-filled hash_index to also dedup against other videos, and a
+    sink to store crops somewhere other than FRAME_SINK (see frame_sink).
+    """
+    model = load_yolo_model()
+    metrics = current_metrics()
+    sink = sink or open_frame_sink(output_dir)
 
-            crop = crop_center_square(frame, x1, y1, x2, y2)
-            if crop.shape[0] > 512 and crop.shape[1] > 512:
-                crop = cv2.resize(crop, (512, 512), interpolation=cv2.INTER_LANCZOS4)
+    if hash_index is None:
+        hash_index = PerceptualHashIndex(DIFF_THRESHOLD)
+    saved = 0
+    results = []
 
-            pil = Image.fromarray(cv2.cvtColor(crop, cv2.COLOR_BGR2RGB))
-            hsh = imagehash.phash(pil)
+    for batch in iter_batches(frames, batch_size):
+        with metrics.stage("detection"):
+            batch_detections = model([frame for _, frame in batch], conf=0.4, imgsz=640, verbose=False)
+        metrics.count("detectorCalls", len(batch))
 
-            if any(hsh - k < DIFF_THRESHOLD for k in known_hashes):
-                break
+        for (ts, frame), detections in zip(batch, batch_detections):
+            for box in detections.boxes:
+                if int(box.cls[0]) != 0:
+                    continue
 
-            known_hashes.append(hsh)
+                x1, y1, x2, y2 = map(int, box.xyxy[0])
+                if (x2 - x1) < MIN_W or (y2 - y1) < MIN_H:
+                    continue
 
-            out_name = f"{video_id}_person_{saved:04d}.jpg"
-            out_path = os.path.join(frames_dir, out_name)
-            cv2.imwrite(out_path, crop, [cv2.IMWRITE_JPEG_QUALITY, 95])
+                crop = crop_center_square(frame, x1, y1, x2, y2)
+                if crop.shape[0] > 512 and crop.shape[1] > 512:
+                    crop = cv2.resize(crop, (512, 512), interpolation=cv2.INTER_LANCZOS4)
 
-            frame_num = int(f.replace("raw_", "").replace(".jpg", ""))
-            ts = (frame_num - 1) * 60
-            m, s = divmod(ts, 60)
-            h, m = divmod(m, 60)
-            timestamp = f"{h:02d}:{m:02d}:{s:02d}" if h else f"{m:02d}:{s:02d}"
+                if not hash_index.add_if_new(phash_uint64(crop)):
+                    break
 
-            results.append({
-                "timestamp": timestamp,
-                "timestampSeconds": ts,
-                "filename": out_name,
-                "path": out_path,
-                "personIndex": saved
-            })
+                out_name, out_path, url, encoding = save_frame(sink, f"{video_id}_person_{saved:04d}", crop, 95)
 
-            saved += 1
-            break
+                results.append({
+                    "timestamp": format_timestamp(ts),
+                    "timestampSeconds": int(ts) if float(ts).is_integer() else round(ts, 3),
+                    "filename": out_name,
+                    "path": out_path,
+                    "personIndex": saved,
+                    "url": url,
+                    "encoding": encoding
+                })
+                emit_frame(saved, results[-1])
 
-        os.remove(frame_path)
+                saved += 1
+                break
 
-        if saved >= MAX_PEOPLE:
-            break
+            if saved >= MAX_PEOPLE:
+                flush_sink(sink)
+                return results
 
+    flush_sink(sink)
     return results
 
 
 # ===============================
-# MAIN - QUOTE MODE
+# JOBS
 # ===============================
-def main_quote_mode():
-    """
-    Quote-to-Frame extraction mode.
-    Usage: script --quote-mode <url> <video_id> --timestamps <json_array>
-    """
-    import argparse
-    
-    parser = argparse.ArgumentParser(description="Extract frames at specific timestamps")
-    parser.add_argument("--quote-mode", action="store_true", help="Enable quote mode")
-    parser.add_argument("url", help="YouTube video URL")
-    parser.add_argument("video_id", help="Video ID for naming")
-    parser.add_argument("--timestamps", required=True, help="JSON array of timestamps in seconds")
-    
-    args = parser.parse_args()
-    
-    # Parse timestamps
-    timestamps = json.loads(args.timestamps)
+# Each mode is a job: a plain dict in, a JSON-serializable dict out. The CLI
+# entry points and the long-lived worker (--serve) both go through these, so
+# a job never calls sys.exit or prints its result itself.
+def job_metrics(mode: str) -> Callable:
+    """Attach a "metrics" block (see extraction_metrics) to the job's result."""
+    def decorate(run: Callable[..., Dict]) -> Callable[..., Dict]:
+        @functools.wraps(run)
+        def wrapper(*args, **kwargs) -> Dict:
+            with collect_metrics() as metrics:
+                result = run(*args, **kwargs)
+            result["metrics"] = metrics.to_dict()
+            export_textfile(mode, bool(result.get("success")), result["metrics"])
+            return result
+        return wrapper
+    return decorate
+
+
+@job_metrics("quote")
+def run_quote_job(
+    video_url: str,
+    video_id: str,
+    timestamps: List[int],
+    partial: bool = False,
+    workers: Optional[int] = None
+) -> Dict:
     if not isinstance(timestamps, list):
-        print(json.dumps({"success": False, "error": "timestamps must be a JSON array"}))
-        sys.exit(1)
-    
-    base_dir = Path(__file__).parent.parent / "public" / "frames"
-    base_dir.mkdir(parents=True, exist_ok=True)
-    base_dir = str(base_dir)
-    
-    temp_video = os.path.join(base_dir, f"temp_{uuid.uuid4().hex}.mp4")
-    
+        return {"success": False, "error": "timestamps must be a JSON array"}
+
+    base_dir = frames_dir()
+    extract = functools.partial(extract_parallel, extract_frames_at_timestamps, workers=workers)
+
     try:
-        print(f"[QuoteMode] Starting for {args.video_id}", file=sys.stderr)
+        print(f"[QuoteMode] Starting for {video_id}", file=sys.stderr)
         print(f"[QuoteMode] Timestamps: {timestamps}", file=sys.stderr)
-        
-        video_path = download_video(args.url, temp_video)
-        frames = extract_frames_at_timestamps(video_path, timestamps, base_dir, args.video_id)
-        
-        if os.path.exists(video_path):
-            os.remove(video_path)
-        
+
+        frames = None
+        if partial and is_video_url(video_url) and not is_video_cached(video_url):
+            try:
+                frames = extract_from_sections(
+                    video_url, timestamps, quote_windows(timestamps),
+                    extract, base_dir, video_id
+                )
+            except Exception as e:
+                print(f"[QuoteMode] ⚠ Partial download failed, fetching full video: {e}", file=sys.stderr)
+
+        if frames is None and PROGRESSIVE_DOWNLOAD and is_video_url(video_url) and not is_video_cached(video_url):
+            try:
+                frames = extract_progressive(
+                    video_url, timestamps, extract_frames_at_timestamps, base_dir, video_id, workers=workers
+                )
+            except Exception as e:
+                print(f"[QuoteMode] ⚠ Progressive download failed, fetching full video: {e}", file=sys.stderr)
+
+        if frames is None:
+            with fetch_video(video_url, base_dir) as video_path:
+                frames = extract(video_path, timestamps, base_dir, video_id)
+
         valid_frames = [f for f in frames if f.get('status') == 'VALID']
         skip_frames = [f for f in frames if f.get('status') == 'SKIP_FRAME']
-        
-        print(json.dumps({
+
+        return {
             "success": True,
             "mode": "quote",
-            "videoId": args.video_id,
+            "videoId": video_id,
             "totalRequested": len(timestamps),
             "validCount": len(valid_frames),
             "skipCount": len(skip_frames),
             "frames": frames
-        }, cls=NumpyEncoder))
-    
-    except Exception as e:
-        if os.path.exists(temp_video):
-            os.remove(temp_video)
-        print(json.dumps({"success": False, "error": str(e)}))
-        sys.exit(1)
-
-
-# ===============================
-# MAIN - LEGACY MODE
-# ===============================
-def main_legacy():
-    """Legacy extraction mode (every 60 seconds with YOLO)"""
-    if len(sys.argv) < 3:
-        print(json.dumps({"success": False, "error": "Usage: script <url> <video_id>"}, cls=NumpyEncoder))
-        sys.exit(1)
+        }
 
-    video_url = sys.argv[1]
-    video_id = sys.argv[2]
+    except Exception as e:
+        return {"success": False, "error": str(e)}
 
-    base_dir = Path(__file__).parent.parent / "public" / "frames"
-    base_dir.mkdir(parents=True, exist_ok=True)
-    base_dir = str(base_dir)
 
-    temp_video = os.path.join(base_dir, f"temp_{uuid.uuid4().hex}.mp4")
+@job_metrics("legacy")
+def run_legacy_job(video_url: str, video_id: str, dedup_index: Optional[str] = None) -> Dict:
+    """
+    dedup_index: optional .npy path of phash values shared across videos
+    (e.g. all videos of one speaker); loaded if present and updated after.
+    """
+    base_dir = frames_dir()
 
     try:
         print(f"[LegacyMode] Starting for {video_id}", file=sys.stderr)
 
-        video_path = download_video(video_url, temp_video)
-        extract_raw_frames(video_path, base_dir)
-        frames = process_frames_with_yolo(base_dir, video_id)
+        hash_index = None
+        if dedup_index and os.path.exists(dedup_index):
+            hash_index = PerceptualHashIndex.load(dedup_index, DIFF_THRESHOLD)
+            print(f"[LegacyMode] Dedup against {len(hash_index)} known crops", file=sys.stderr)
+        elif dedup_index:
+            hash_index = PerceptualHashIndex(DIFF_THRESHOLD)
 
-        for f in frames:
-            f["url"] = f"/frames/{f['filename']}"
+        with fetch_video(video_url, base_dir) as video_path:
+            sampled = stream_sampled_frames(video_path)
+            try:
+                frames = process_frames_with_yolo(sampled, base_dir, video_id, hash_index=hash_index)
+            finally:
+                # Stops ffmpeg if MAX_PEOPLE was reached before the end
+                sampled.close()
 
-        if os.path.exists(video_path):
-            os.remove(video_path)
+        if dedup_index:
+            hash_index.save(dedup_index)
 
-        print(json.dumps({
+        return {
             "success": True,
             "mode": "legacy",
             "videoId": video_id,
             "frameCount": len(frames),
             "frames": frames
-        }, cls=NumpyEncoder))
+        }
 
     except Exception as e:
-        if os.path.exists(temp_video):
-            os.remove(temp_video)
-        print(json.dumps({"success": False, "error": str(e)}))
+        return {"success": False, "error": str(e)}
+
+
+@job_metrics("range")
+def run_range_job(
+    video_path: str,
+    ranges: List[Dict],
+    output_dir: str,
+    video_id: str = "unknown",
+    partial: bool = False,
+    workers: Optional[int] = None
+) -> Dict:
+    extract = functools.partial(extract_parallel, extract_frames_from_ranges, workers=workers)
+
+    try:
+        # Ensure output directory exists
+        os.makedirs(output_dir, exist_ok=True)
+
+        # Determine if video_path is a URL or local file
+        is_url = is_video_url(video_path)
+
+        results = None
+        if is_url and partial and not is_video_cached(video_path):
+            try:
+                results = extract_from_sections(
+                    video_path, ranges, range_windows(ranges),
+                    extract, output_dir, video_id
+                )
+            except Exception as e:
+                print(f"[RangeMode] ⚠ Partial download failed, fetching full video: {e}", file=sys.stderr)
+
+        if results is None and is_url and PROGRESSIVE_DOWNLOAD and not is_video_cached(video_path):
+            try:
+                results = extract_progressive(
+                    video_path, ranges, extract_frames_from_ranges, output_dir, video_id, workers=workers
+                )
+            except Exception as e:
+                print(f"[RangeMode] ⚠ Progressive download failed, fetching full video: {e}", file=sys.stderr)
+
+        if results is None and is_url:
+            print(f"[RangeMode] Fetching video from URL...", file=sys.stderr)
+            with fetch_video(video_path, output_dir) as local_path:
+                print(f"[RangeMode] ✓ Video ready at: {local_path}", file=sys.stderr)
+                results = extract(local_path, ranges, output_dir, video_id)
+        elif results is None:
+            results = extract(video_path, ranges, output_dir, video_id)
+
+        return {
+            "success": True,
+            "mode": "range",
+            "videoId": video_id,
+            "frames": results
+        }
+
+    except Exception as e:
+        return {"success": False, "error": str(e)}
+
+
+def run_job(job: Dict) -> Dict:
+    """
+    Dispatch a job dict to its mode.
+
+    {"mode": "quote",  "url": ..., "video_id": ..., "timestamps": [45, 120]}
+    {"mode": "range",  "video_path": ..., "video_id": ..., "ranges": [...], "output_dir": ...}
+    {"mode": "legacy", "url": ..., "video_id": ..., "dedup_index": "speaker.npy" (optional)}
+
+    Quote and range jobs accept "partial": true to download only the
+    sections around the requested timestamps, and "workers": n to set the
+    number of extraction processes (default: available cores).
+    """
+    mode = job.get("mode")
+    try:
+        if mode == "quote":
+            return run_quote_job(
+                job["url"],
+                job["video_id"],
+                job["timestamps"],
+                partial=bool(job.get("partial")),
+                workers=job.get("workers")
+            )
+        if mode == "range":
+            return run_range_job(
+                job.get("video_path") or job["url"],
+                job["ranges"],
+                job.get("output_dir") or frames_dir(),
+                job.get("video_id", "unknown"),
+                partial=bool(job.get("partial")),
+                workers=job.get("workers")
+            )
+        if mode == "legacy":
+            return run_legacy_job(job["url"], job["video_id"], dedup_index=job.get("dedup_index"))
+    except KeyError as e:
+        return {"success": False, "error": f"Missing job field: {e.args[0]}"}
+    return {"success": False, "error": f"Unknown mode: {mode}"}
+
+
+def emit_result(result: Dict, stream: bool = False) -> None:
+    """
+    Print the job result. With stream=True (--stream) it is the final NDJSON
+    line, after the per-frame lines, tagged {"type": "summary"}.
+    """
+    if stream:
+        result = {"type": "summary", **result}
+    print(json.dumps(result, cls=NumpyEncoder), flush=True)
+    if not result.get("success"):
         sys.exit(1)
 
 
+def frame_stream(enabled: bool):
+    """--stream: write one NDJSON line per finished frame to stdout."""
+    return listen(ndjson_writer(sys.stdout, NumpyEncoder) if enabled else None)
+
+
 # ===============================
-# ENTRY POINT
+# BATCH (--batch)
+# ===============================
+@contextmanager
+def prefetch_job_video(job: Dict) -> Iterator[Dict]:
+    """
+    Download stage of a batch job (see batch_runner): fetch the video of a URL
+    job and yield the job pointing at the local file, held until the job is
+    done. Each job extracts in a single process (workers=1); the batch's
+    process pool provides the parallelism. Partial jobs fetch their own
+    sections when they run.
+    """
+    source = job.get("video_path") or job.get("url")
+    local_job = dict(job, workers=1)
+    if not isinstance(source, str) or not is_video_url(source) or job.get("partial"):
+        yield local_job
+        return
+
+    with fetch_video(source, job.get("output_dir") or frames_dir()) as video_path:
+        local_job.update({"url": video_path, "video_path": video_path})
+        yield local_job
+
+
+def _init_batch_process() -> None:
+    # One job per core already; keep OpenCV from spawning its own threads on top
+    cv2.setNumThreads(1)
+
+
+# ===============================
+# MAIN - QUOTE MODE
+# ===============================
+def main_quote_mode():
+    """
+    Quote-to-Frame extraction mode.
+    Usage: script --quote-mode <url> <video_id> --timestamps <json_array>
+    """
+    parser = argparse.ArgumentParser(description="Extract frames at specific timestamps")
+    parser.add_argument("--quote-mode", action="store_true", help="Enable quote mode")
+    parser.add_argument("url", help="YouTube video URL")
+    parser.add_argument("video_id", help="Video ID for naming")
+    parser.add_argument("--timestamps", required=True, help="JSON array of timestamps in seconds")
+    parser.add_argument("--partial", action="store_true", help="Download only sections around the timestamps")
+    parser.add_argument("--workers", type=int, help="Extraction processes (default: available cores)")
+    parser.add_argument("--stream", action="store_true", help="NDJSON: one line per frame, then a summary line")
+    
+    args = parser.parse_args()
+    
+    with frame_stream(args.stream):
+        result = run_quote_job(
+            args.url,
+            args.video_id,
+            json.loads(args.timestamps),
+            partial=args.partial,
+            workers=args.workers
+        )
+    emit_result(result, stream=args.stream)
+
+
+# ===============================
+# MAIN - LEGACY MODE
+# ===============================
+def main_legacy():
+    """Legacy extraction mode (every 60 seconds with YOLO)"""
+    stream = "--stream" in sys.argv
+    args = [a for a in sys.argv[1:] if a != "--stream"]
+    if len(args) < 2:
+        emit_result({"success": False, "error": "Usage: script <url> <video_id> [--stream]"}, stream=stream)
+
+    with frame_stream(stream):
+        result = run_legacy_job(args[0], args[1])
+    emit_result(result, stream=stream)
+
+
+# ===============================
+# MAIN - RANGE MODE
 # ===============================
 def main_range_mode():
     parser = argparse.ArgumentParser()
@@ -583,55 +1756,130 @@ def main_range_mode():
     parser.add_argument("--ranges", required=True)  # JSON string
     parser.add_argument("--output_dir", required=True)
     parser.add_argument("--video_id", default="unknown")
+    parser.add_argument("--partial", action="store_true", help="Download only sections around the range midpoints")
+    parser.add_argument("--workers", type=int, help="Extraction processes (default: available cores)")
+    parser.add_argument("--stream", action="store_true", help="NDJSON: one line per frame, then a summary line")
     
     args = parser.parse_args()
-    
-    temp_video = None
-    
+
     try:
         ranges = json.loads(args.ranges)
-        
-        # Ensure output directory exists
-        os.makedirs(args.output_dir, exist_ok=True)
-        
-        # Determine if video_path is a URL or local file
-        video_path = args.video_path
-        is_url = video_path.startswith("http://") or video_path.startswith("https://")
-        
-        if is_url:
-            # Download video first
-            temp_video = os.path.join(args.output_dir, f"temp_{uuid.uuid4().hex}.mp4")
-            print(f"[RangeMode] Downloading video from URL...", file=sys.stderr)
-            video_path = download_video(args.video_path, temp_video)
-            print(f"[RangeMode] ✓ Video downloaded to: {video_path}", file=sys.stderr)
-        
-        # Run extraction
-        results = extract_frames_from_ranges(video_path, ranges, args.output_dir, args.video_id)
-        
-        # Cleanup temp video
-        if temp_video and os.path.exists(video_path):
-            os.remove(video_path)
-            print(f"[RangeMode] Cleaned up temp video", file=sys.stderr)
-        
-        print(json.dumps({
-            "success": True,
-            "mode": "range",
-            "videoId": args.video_id,
-            "frames": results
-        }, cls=NumpyEncoder))
-        
-    except Exception as e:
-        # Cleanup on error
-        if temp_video:
-            for ext in [".mp4", ".webm", ".mkv"]:
-                p = temp_video.replace(".mp4", ext)
-                if os.path.exists(p):
-                    os.remove(p)
-        print(json.dumps({"success": False, "error": str(e)}, cls=NumpyEncoder))
-        sys.exit(1)
+    except ValueError as e:
+        emit_result({"success": False, "error": str(e)}, stream=args.stream)
+
+    with frame_stream(args.stream):
+        result = run_range_job(
+            args.video_path,
+            ranges,
+            args.output_dir,
+            args.video_id,
+            partial=args.partial,
+            workers=args.workers
+        )
+    emit_result(result, stream=args.stream)
+
 
+# ===============================
+# MAIN - BATCH MODE
+# ===============================
+def main_batch():
+    """
+    Run a manifest of quote/range/legacy jobs (see batch_runner).
+    Usage: script --batch <jobs.json | jobs.ndjson | -> [--download-workers 4] [--cpu-workers N]
+    Prints one NDJSON line per job as it finishes, then a summary line.
+    """
+    from batch_runner import load_manifest, run_batch
+
+    parser = argparse.ArgumentParser(description="Run a manifest of extraction jobs")
+    parser.add_argument("--batch", required=True, help="JSON / NDJSON manifest of jobs (- for stdin)")
+    parser.add_argument("--download-workers", type=int, default=4, help="Videos downloaded concurrently")
+    parser.add_argument("--cpu-workers", type=int, default=EXTRACT_WORKERS,
+                        help="Jobs extracted concurrently (default: available cores)")
+
+    args = parser.parse_args()
+
+    try:
+        jobs = load_manifest(args.batch)
+    except (OSError, ValueError) as e:
+        emit_result({"success": False, "error": str(e)}, stream=True)
+
+    print(f"[Batch] {len(jobs)} jobs, {args.download_workers} download / {args.cpu_workers} CPU workers",
+          file=sys.stderr)
+    started = time.perf_counter()
+    failed = 0
+
+    def on_result(index: int, result: Dict) -> None:
+        nonlocal failed
+        if not result.get("success"):
+            failed += 1
+        line = {"type": "job", "index": index, "videoId": jobs[index].get("video_id"), **result}
+        print(json.dumps(line, cls=NumpyEncoder), flush=True)
+
+    run_batch(
+        jobs,
+        prefetch_job_video,
+        run_job,
+        on_result,
+        download_workers=args.download_workers,
+        cpu_workers=args.cpu_workers,
+        initializer=_init_batch_process
+    )
+
+    summary = {"success": failed == 0, "jobs": len(jobs), "failed": failed,
+               "wallSeconds": round(time.perf_counter() - started, 4)}
+    if failed:
+        summary["error"] = f"{failed} of {len(jobs)} jobs failed"
+    emit_result(summary, stream=True)
+
+
+# ===============================
+# MAIN - WORKER MODE
+# ===============================
+def main_serve():
+    """
+    Long-lived worker: keeps the face detector and YOLO warm and runs
+    quote/range/legacy jobs posted over HTTP or a Unix socket.
+    Usage: script --serve [--host 127.0.0.1 --port 8765 | --socket /tmp/frames.sock]
+    """
+    from frame_worker import serve
+
+    parser = argparse.ArgumentParser(description="Run the frame extraction worker")
+    parser.add_argument("--serve", action="store_true")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--socket", help="Listen on a Unix socket instead of TCP")
+    parser.add_argument("--workers", type=int, default=1, help="Jobs run concurrently")
+    parser.add_argument("--queue-size", type=int, default=16, help="Jobs waiting before new ones are rejected")
+    parser.add_argument("--preload-yolo", action="store_true", help="Load YOLO at startup (legacy mode)")
+
+    args = parser.parse_args()
+
+    def warm_up():
+        get_speaker_detector()
+        if args.preload_yolo:
+            load_yolo_model()
+
+    serve(
+        run_job,
+        host=args.host,
+        port=args.port,
+        socket_path=args.socket,
+        workers=args.workers,
+        queue_size=args.queue_size,
+        warm_up=warm_up,
+        encoder=NumpyEncoder
+    )
+
+
+# ===============================
+# ENTRY POINT
+# ===============================
 if __name__ == "__main__":
-    if "--ranges" in sys.argv:
+    if "--serve" in sys.argv:
+        main_serve()
+    elif "--batch" in sys.argv:
+        main_batch()
+    elif "--ranges" in sys.argv:
         main_range_mode()
     elif "--quote-mode" in sys.argv:
         main_quote_mode()
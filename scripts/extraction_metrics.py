@@ -0,0 +1,257 @@
+#!/usr/bin/env python3
+"""
+Extraction Metrics
+Per-job stage timings, counters and peak memory for extract_frames.py.
+
+Each job collects into its own ExtractionMetrics (see collect_metrics); code
+anywhere in the job records into current_metrics() without passing it
+around. Jobs run one per thread in the worker (--serve), so the current
+metrics are thread-local. Process-pool shards collect their own and the
+parent merges them.
+
+Stages (wall seconds, summed across the job):
+    download    yt-dlp (full video or sections)
+    probe       opening the video and reading fps / size / duration
+    decode      seeking and decoding frames
+    detection   face cascade / YOLO inference
+    enhancement crop enhancement (light_enhance)
+    encoding    JPEG encoding
+    write       writing encoded frames to disk
+
+Peak RSS is per job: the process's lifetime high-water mark when the job
+raised it, otherwise the highest RSS sampled while the job ran (Linux;
+null elsewhere). It is process-wide, so in a worker running several jobs
+at once it includes the others.
+
+Optional Prometheus textfile export (FRAME_METRICS_TEXTFILE=<path>.prom)
+accumulates totals across runs in <path>.prom.json and rewrites the .prom
+file atomically, for node_exporter's textfile collector.
+"""
+
+import os
+import sys
+import json
+import time
+import threading
+from contextlib import contextmanager
+from typing import Dict, Iterator, Optional
+
+try:
+    import resource
+except ImportError:  # Windows: no getrusage, peak RSS is reported as null
+    resource = None
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+
+# ===============================
+# CONFIG
+# ===============================
+METRICS_TEXTFILE = os.environ.get("FRAME_METRICS_TEXTFILE")
+
+STAGES = ["download", "probe", "decode", "detection", "enhancement", "encoding", "write"]
+COUNTERS = ["seeks", "decodedFrames", "detectorCalls", "cacheHits"]
+
+# How often a running job samples RSS
+RSS_SAMPLE_INTERVAL_S = 0.05
+
+_current = threading.local()
+
+
+def peak_rss_bytes() -> Optional[int]:
+    """Peak resident set size of this process (lifetime high-water mark)."""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports KiB, macOS bytes
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+def current_rss_bytes() -> Optional[int]:
+    """Resident set size of this process right now (None where /proc is unavailable)."""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        return None
+
+
+class ExtractionMetrics:
+    """Stage timings and counters for one job."""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.stages = {name: 0.0 for name in STAGES}
+        self.counts = {name: 0 for name in COUNTERS}
+        self.child_peak_rss = 0
+        self.start_peak_rss = peak_rss_bytes()
+        self.sampled_rss = current_rss_bytes() or 0
+        self._sampling: Optional[threading.Event] = None
+
+    def start_sampling(self, interval: float = RSS_SAMPLE_INTERVAL_S) -> None:
+        """Sample RSS on a background thread until stop_sampling()."""
+        if current_rss_bytes() is None:
+            return
+        stop = self._sampling = threading.Event()
+
+        def run() -> None:
+            while not stop.wait(interval):
+                self.sampled_rss = max(self.sampled_rss, current_rss_bytes() or 0)
+
+        threading.Thread(target=run, name="rss-sampler", daemon=True).start()
+
+    def stop_sampling(self) -> None:
+        if self._sampling is not None:
+            self._sampling.set()
+
+    def peak_rss(self) -> Optional[int]:
+        """This job's peak RSS (see module docstring)."""
+        lifetime = peak_rss_bytes()
+        if lifetime and self.start_peak_rss and lifetime > self.start_peak_rss:
+            # A new high-water mark was reached during the job: exact
+            return lifetime
+        return max(self.sampled_rss, current_rss_bytes() or 0) or None
+
+    @contextmanager
+    def stage(self, name: str) -> Iterator[None]:
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.stages[name] += time.perf_counter() - start
+
+    def add_time(self, name: str, seconds: float) -> None:
+        self.stages[name] += seconds
+
+    def count(self, name: str, n: int = 1) -> None:
+        self.counts[name] += n
+
+    def merge(self, other: Dict) -> None:
+        """Add a shard's to_dict() (stages and counts sum, peak RSS is max)."""
+        for name, seconds in other.get("stageSeconds", {}).items():
+            self.stages[name] = self.stages.get(name, 0.0) + seconds
+        for name, n in other.get("counts", {}).items():
+            self.counts[name] = self.counts.get(name, 0) + n
+        self.child_peak_rss = max(self.child_peak_rss, other.get("peakRssBytes") or 0)
+
+    def to_dict(self) -> Dict:
+        peak = self.peak_rss()
+        return {
+            "wallSeconds": round(time.perf_counter() - self.started, 4),
+            "stageSeconds": {name: round(seconds, 4) for name, seconds in self.stages.items()},
+            "counts": dict(self.counts),
+            "peakRssBytes": max(peak or 0, self.child_peak_rss) or None
+        }
+
+
+def current_metrics() -> ExtractionMetrics:
+    """The running job's metrics (a throwaway instance outside collect_metrics)."""
+    metrics = getattr(_current, "metrics", None)
+    return metrics if metrics is not None else ExtractionMetrics()
+
+
+@contextmanager
+def collect_metrics() -> Iterator[ExtractionMetrics]:
+    """Make a fresh ExtractionMetrics current for this thread for the block."""
+    previous = getattr(_current, "metrics", None)
+    metrics = _current.metrics = ExtractionMetrics()
+    metrics.start_sampling()
+    try:
+        yield metrics
+    finally:
+        metrics.stop_sampling()
+        _current.metrics = previous
+
+
+# ===============================
+# PROMETHEUS TEXTFILE EXPORT
+# ===============================
+_CAMEL_TO_SNAKE = {"decodedFrames": "decoded_frames", "detectorCalls": "detector_calls", "cacheHits": "cache_hits"}
+
+
+def _render_textfile(totals: Dict) -> str:
+    lines = [
+        "# HELP frame_extraction_jobs_total Extraction jobs run, by mode and outcome.",
+        "# TYPE frame_extraction_jobs_total counter",
+    ]
+    for key, n in sorted(totals["jobs"].items()):
+        mode, status = key.split("|")
+        lines.append(f'frame_extraction_jobs_total{{mode="{mode}",status="{status}"}} {n}')
+
+    lines += [
+        "# HELP frame_extraction_wall_seconds_total Job wall time.",
+        "# TYPE frame_extraction_wall_seconds_total counter",
+    ]
+    for mode, seconds in sorted(totals["wall"].items()):
+        lines.append(f'frame_extraction_wall_seconds_total{{mode="{mode}"}} {seconds:.6f}')
+
+    lines += [
+        "# HELP frame_extraction_stage_seconds_total Time spent per pipeline stage.",
+        "# TYPE frame_extraction_stage_seconds_total counter",
+    ]
+    for key, seconds in sorted(totals["stages"].items()):
+        mode, stage = key.split("|")
+        lines.append(f'frame_extraction_stage_seconds_total{{mode="{mode}",stage="{stage}"}} {seconds:.6f}')
+
+    for counter in COUNTERS:
+        name = f"frame_extraction_{_CAMEL_TO_SNAKE.get(counter, counter)}_total"
+        lines += [f"# TYPE {name} counter"]
+        for key, n in sorted(totals["counts"].items()):
+            mode, c = key.split("|")
+            if c == counter:
+                lines.append(f'{name}{{mode="{mode}"}} {n}')
+
+    lines += [
+        "# HELP frame_extraction_peak_rss_bytes Peak process RSS during the most recent job, by mode.",
+        "# TYPE frame_extraction_peak_rss_bytes gauge",
+    ]
+    for mode, peak in sorted(totals["peakRss"].items()):
+        lines.append(f'frame_extraction_peak_rss_bytes{{mode="{mode}"}} {peak}')
+
+    return "\n".join(lines) + "\n"
+
+
+def export_textfile(mode: str, success: bool, metrics: Dict, path: Optional[str] = METRICS_TEXTFILE) -> None:
+    """Add one job to the running totals and rewrite the .prom file."""
+    if not path:
+        return
+
+    state_path = path + ".json"
+    lock_fd = os.open(path + ".lock", os.O_RDWR | os.O_CREAT, 0o644)
+    try:
+        if fcntl:
+            fcntl.flock(lock_fd, fcntl.LOCK_EX)
+
+        totals = {"jobs": {}, "wall": {}, "stages": {}, "counts": {}, "peakRss": {}}
+        if os.path.exists(state_path):
+            with open(state_path) as f:
+                totals.update(json.load(f))
+
+        status = "success" if success else "failure"
+        totals["jobs"][f"{mode}|{status}"] = totals["jobs"].get(f"{mode}|{status}", 0) + 1
+        totals["wall"][mode] = totals["wall"].get(mode, 0.0) + metrics["wallSeconds"]
+        for stage, seconds in metrics["stageSeconds"].items():
+            key = f"{mode}|{stage}"
+            totals["stages"][key] = totals["stages"].get(key, 0.0) + seconds
+        for counter, n in metrics["counts"].items():
+            key = f"{mode}|{counter}"
+            totals["counts"][key] = totals["counts"].get(key, 0) + n
+        if metrics.get("peakRssBytes"):
+            totals["peakRss"][mode] = metrics["peakRssBytes"]
+
+        # Write-then-rename so the collector never reads a partial file
+        for target, content in ((state_path, json.dumps(totals)), (path, _render_textfile(totals))):
+            tmp = f"{target}.{os.getpid()}.tmp"
+            with open(tmp, "w") as f:
+                f.write(content)
+            os.replace(tmp, target)
+    except Exception as e:
+        # Metrics must never fail a job
+        print(f"[Metrics] ⚠ Could not update {path}: {e}", file=sys.stderr)
+    finally:
+        if fcntl:
+            fcntl.flock(lock_fd, fcntl.LOCK_UN)
+        os.close(lock_fd)
@@ -0,0 +1,152 @@
+#!/usr/bin/env python3
+"""
+Face Detection Backends
+Interchangeable face box detectors for SpeakerFaceDetector.
+
+Every backend maps images to face boxes ([x, y, w, h] rows, full image
+coordinates) through detect(image, min_size) and detect_batch(images,
+min_size). Images are grayscale, as SpeakerFaceDetector passes them.
+
+    haar         OpenCV's default frontal-face Haar cascade (the reference)
+    haar_alt2    the smaller "alt2" Haar cascade shipped with OpenCV: fewer
+                 features per stage, usually faster
+    lbp          an LBP cascade (integer features, fastest of the
+                 cascades); pip OpenCV does not ship one, so point
+                 FRAME_LBP_CASCADE at lbpcascade_frontalface(_improved).xml
+    yolo_person  YOLO person boxes (yolov8n.pt, as legacy mode uses), each
+                 mapped to the head region at the top of the box; one
+                 batched inference call per detect_batch
+
+Pick the cheapest backend that agrees well enough with haar on your own
+footage (scripts/benchmark_face_detection.py --backends ...).
+"""
+
+import os
+import functools
+import cv2
+import numpy as np
+from pathlib import Path
+from typing import Callable, List, Optional
+
+
+# ===============================
+# CONFIG
+# ===============================
+BACKENDS = ["haar", "haar_alt2", "lbp", "yolo_person"]
+FACE_BACKEND = os.environ.get("FRAME_FACE_BACKEND", "haar")
+if FACE_BACKEND not in BACKENDS:
+    raise ValueError(f"FRAME_FACE_BACKEND must be one of {', '.join(BACKENDS)}, not {FACE_BACKEND!r}")
+LBP_CASCADE = os.environ.get("FRAME_LBP_CASCADE")
+
+# Head box from a person box: side as a share of the person box width,
+# capped by a share of its height (full-body boxes are tall and narrow)
+HEAD_WIDTH_RATIO = 0.45
+HEAD_HEIGHT_RATIO = 0.3
+YOLO_PERSON_CONF = 0.4
+
+LBP_SEARCH_PATHS = [
+    Path(cv2.data.haarcascades).parent / "lbpcascades",
+    Path("/usr/share/opencv4/lbpcascades"),
+    Path("/usr/share/opencv/lbpcascades"),
+]
+
+
+def _no_faces() -> np.ndarray:
+    return np.empty((0, 4), dtype=np.int32)
+
+
+class CascadeBackend:
+    """An OpenCV CascadeClassifier (Haar or LBP) run with detectMultiScale."""
+
+    def __init__(self, name: str, cascade_path: str, scale_factor: float = 1.1, min_neighbors: int = 5):
+        self.name = name
+        self.cascade = cv2.CascadeClassifier(cascade_path)
+        if self.cascade.empty():
+            raise ValueError(f"Could not load cascade {cascade_path}")
+        self.scale_factor = scale_factor
+        self.min_neighbors = min_neighbors
+
+    def detect(self, image: np.ndarray, min_size: int = 30):
+        if image.ndim == 3:
+            image = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
+        return self.cascade.detectMultiScale(
+            image,
+            scaleFactor=self.scale_factor,
+            minNeighbors=self.min_neighbors,
+            minSize=(min_size, min_size),
+            flags=cv2.CASCADE_SCALE_IMAGE
+        )
+
+    def detect_batch(self, images: List[np.ndarray], min_size: int = 30) -> List:
+        # Cascades have no batched entry point; one call per image
+        return [self.detect(image, min_size) for image in images]
+
+
+class YoloPersonBackend:
+    """Head boxes derived from YOLO person detections."""
+
+    name = "yolo_person"
+
+    def __init__(self, model_loader: Callable):
+        # Loaded on first use; the loader lets callers share a warm model
+        self.model_loader = model_loader
+
+    def detect(self, image: np.ndarray, min_size: int = 30) -> np.ndarray:
+        return self.detect_batch([image], min_size)[0]
+
+    def detect_batch(self, images: List[np.ndarray], min_size: int = 30) -> List[np.ndarray]:
+        if not images:
+            return []
+        color = [cv2.cvtColor(img, cv2.COLOR_GRAY2BGR) if img.ndim == 2 else img for img in images]
+        results = self.model_loader()(color, conf=YOLO_PERSON_CONF, classes=[0], imgsz=640, verbose=False)
+
+        boxes = []
+        for img, detections in zip(images, results):
+            img_h, img_w = img.shape[:2]
+            heads = []
+            for box in detections.boxes:
+                if int(box.cls[0]) != 0:
+                    continue
+                x1, y1, x2, y2 = (float(v) for v in box.xyxy[0])
+                side = min((x2 - x1) * HEAD_WIDTH_RATIO, (y2 - y1) * HEAD_HEIGHT_RATIO)
+                if side < min_size:
+                    continue
+                hx = int(round(np.clip((x1 + x2 - side) / 2, 0, img_w - side)))
+                hy = int(round(np.clip(y1 + side * 0.1, 0, img_h - side)))
+                heads.append([hx, hy, int(side), int(side)])
+            boxes.append(np.array(heads, dtype=np.int32) if heads else _no_faces())
+        return boxes
+
+
+def find_lbp_cascade() -> Optional[str]:
+    if LBP_CASCADE:
+        return LBP_CASCADE
+    for directory in LBP_SEARCH_PATHS:
+        for name in ("lbpcascade_frontalface_improved.xml", "lbpcascade_frontalface.xml"):
+            if (directory / name).exists():
+                return str(directory / name)
+    return None
+
+
+@functools.lru_cache(maxsize=None)
+def default_yolo_loader():
+    from ultralytics import YOLO
+    import io, contextlib
+    with contextlib.redirect_stdout(io.StringIO()):
+        return YOLO("yolov8n.pt").to("cpu")
+
+
+def create_backend(name: str = FACE_BACKEND, yolo_loader: Optional[Callable] = None):
+    """A backend by name (see module docstring). Raises ValueError if unavailable."""
+    if name == "haar":
+        return CascadeBackend(name, cv2.data.haarcascades + "haarcascade_frontalface_default.xml")
+    if name == "haar_alt2":
+        return CascadeBackend(name, cv2.data.haarcascades + "haarcascade_frontalface_alt2.xml")
+    if name == "lbp":
+        path = find_lbp_cascade()
+        if path is None:
+            raise ValueError("No LBP face cascade found; set FRAME_LBP_CASCADE to lbpcascade_frontalface_improved.xml")
+        return CascadeBackend(name, path)
+    if name == "yolo_person":
+        return YoloPersonBackend(yolo_loader or default_yolo_loader)
+    raise ValueError(f"Unknown face backend {name!r} ({', '.join(BACKENDS)})")
@@ -0,0 +1,355 @@
+#!/usr/bin/env python3
+"""
+FFmpeg Frame Source
+Streams decoded frames from an ffmpeg process as raw BGR over a pipe.
+
+read_frames_ffmpeg is an alternative to frame_scheduler's cv2 reader for
+quote / range mode: every requested frame is decoded by one ffmpeg process,
+with one input-side -ss seek per cluster of nearby frames (ffmpeg seeks to
+the keyframe and decodes forward, much cheaper than cv2's seek) and a
+select filter picking the exact frames out of each cluster.
+
+Frames are read straight into a small pool of preallocated numpy buffers
+(no JPEG encode / disk write / decode round trip). A yielded frame stays
+valid until `pool_size` more frames have been read, so consumers that hold
+several frames at once (e.g. a YOLO batch) must use a pool at least that
+large. Closing the generator kills ffmpeg, so stopping early also stops
+decoding.
+"""
+
+import re
+import json
+import time
+import queue
+import threading
+import functools
+import subprocess
+from collections import deque
+import numpy as np
+from typing import BinaryIO, Callable, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+from extraction_metrics import current_metrics
+
+
+# ===============================
+# CONFIG
+# ===============================
+FFMPEG_PATH = "ffmpeg"
+FFPROBE_PATH = "ffprobe"
+
+# Requested frames closer than this share one seek (and are decoded through)
+CLUSTER_GAP_S = 4.0
+
+_FFMPEG_VERSION = re.compile(r"^ffmpeg version n?(\d+)\.(\d+)")
+
+
+@functools.lru_cache(maxsize=None)
+def passthrough_args() -> Tuple[str, str]:
+    """
+    Output option keeping frame timestamps as decoded (no duplicates / drops).
+    -fps_mode exists from ffmpeg 5.1 on; older builds (still common in distro
+    packages) only have -vsync, which newer ones deprecate. Builds whose
+    version is not a release number (git snapshots) are assumed new.
+    """
+    try:
+        out = subprocess.run([FFMPEG_PATH, "-version"], stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, text=True).stdout
+    except OSError:
+        return "-fps_mode", "passthrough"
+    match = _FFMPEG_VERSION.match(out)
+    if match and (int(match.group(1)), int(match.group(2))) < (5, 1):
+        return "-vsync", "passthrough"
+    return "-fps_mode", "passthrough"
+
+
+def probe_video(video_path: str) -> Dict:
+    """Width, height, fps and duration of the first video stream."""
+    try:
+        out = subprocess.run(
+            [
+                FFPROBE_PATH,
+                "-v", "error",
+                "-select_streams", "v:0",
+                "-show_entries", "stream=width,height,avg_frame_rate:format=duration",
+                "-of", "json",
+                video_path
+            ],
+            check=True,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            text=True
+        )
+    except subprocess.CalledProcessError as e:
+        raise Exception(f"ffprobe failed: {e.stderr.strip()}")
+
+    data = json.loads(out.stdout)
+    if not data.get("streams"):
+        raise Exception(f"No video stream in {video_path}")
+
+    stream = data["streams"][0]
+    num, _, den = (stream.get("avg_frame_rate") or "0/1").partition("/")
+    fps = float(num) / float(den) if den and float(den) else 0.0
+
+    return {
+        "width": int(stream["width"]),
+        "height": int(stream["height"]),
+        "fps": fps,
+        "duration": float(data.get("format", {}).get("duration") or 0.0)
+    }
+
+
+def iter_ffmpeg_frames(
+    video_path: str,
+    width: int,
+    height: int,
+    video_filter: Optional[str] = None,
+    input_args: Sequence[str] = (),
+    pool_size: int = 2
+) -> Iterator[np.ndarray]:
+    """
+    Yield BGR frames (height x width x 3) decoded by ffmpeg.
+
+    video_filter must produce frames of exactly width x height
+    (e.g. "fps=1/60,scale=700:394").
+    """
+    cmd: List[str] = [FFMPEG_PATH, "-loglevel", "error", "-nostdin"]
+    cmd += list(input_args)
+    cmd += ["-i", video_path]
+    if video_filter:
+        cmd += ["-vf", video_filter]
+    cmd += ["-f", "rawvideo", "-pix_fmt", "bgr24", "pipe:1"]
+    yield from _iter_raw_frames(cmd, width, height, pool_size)
+
+
+_SHOWINFO_PTS = re.compile(r"Parsed_showinfo.*\bpts_time:\s*(-?[0-9.]+)")
+
+
+def iter_ffmpeg_frames_with_pts(
+    video_path: str,
+    width: int,
+    height: int,
+    video_filter: str,
+    pool_size: int = 2,
+    feed: Optional[Callable[[BinaryIO], None]] = None
+) -> Iterator[Tuple[float, np.ndarray]]:
+    """
+    Like iter_ffmpeg_frames, yielding (source timestamp, frame) for filters
+    that drop frames irregularly (e.g. select). Timestamps come from a
+    showinfo filter appended to video_filter, parsed off stderr.
+    With feed, ffmpeg reads the video from stdin (pass video_path "pipe:0")
+    and feed(stdin) writes it on a thread.
+    """
+    cmd: List[str] = [FFMPEG_PATH, "-loglevel", "info", "-hide_banner", "-nostdin", "-i", video_path]
+    cmd += ["-vf", f"{video_filter},showinfo", *passthrough_args()]
+    cmd += ["-f", "rawvideo", "-pix_fmt", "bgr24", "pipe:1"]
+
+    pts: "queue.Queue[float]" = queue.Queue()
+
+    def on_stderr(line: str) -> bool:
+        match = _SHOWINFO_PTS.search(line)
+        if match:
+            pts.put(float(match.group(1)))
+        return match is None  # Keep anything else for error messages
+
+    for frame in _iter_raw_frames(cmd, width, height, pool_size, on_stderr=on_stderr, feed=feed):
+        # showinfo logs a frame before it is written to stdout
+        yield pts.get(timeout=30), frame
+
+
+def _iter_raw_frames(
+    cmd: List[str],
+    width: int,
+    height: int,
+    pool_size: int,
+    on_stderr: Optional[Callable[[str], bool]] = None,
+    feed: Optional[Callable[[BinaryIO], None]] = None
+) -> Iterator[np.ndarray]:
+    """
+    Run ffmpeg writing bgr24 to stdout and yield its frames from the buffer pool.
+    on_stderr(line), if given, sees each stderr line as it is written (read on a
+    thread, so a chatty filter cannot fill the pipe) and returns whether to keep
+    it for the error message. feed(stdin), if given, writes ffmpeg's input on
+    a thread.
+    """
+    frame_bytes = width * height * 3
+    pool = [np.empty((height, width, 3), dtype=np.uint8) for _ in range(max(1, pool_size))]
+    views = [memoryview(buf.reshape(-1)) for buf in pool]
+
+    metrics = current_metrics()
+    proc = subprocess.Popen(
+        cmd,
+        stdin=subprocess.PIPE if feed is not None else None,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE
+    )
+    if feed is not None:
+        def write_stdin():
+            try:
+                feed(proc.stdin)
+            except (BrokenPipeError, ValueError):
+                pass  # ffmpeg exited (error, or killed after the last frame needed)
+            finally:
+                try:
+                    proc.stdin.close()
+                except (BrokenPipeError, ValueError):
+                    pass
+        threading.Thread(target=write_stdin, daemon=True).start()
+    kept = deque(maxlen=20)
+    reader = None
+    if on_stderr is not None:
+        def read_stderr():
+            for raw in proc.stderr:
+                line = raw.decode("utf-8", "replace").rstrip()
+                if on_stderr(line):
+                    kept.append(line)
+        reader = threading.Thread(target=read_stderr, daemon=True)
+        reader.start()
+    finished = False
+    try:
+        n = 0
+        while True:
+            view = views[n % len(pool)]
+            filled = 0
+            # Time spent waiting on ffmpeg for the next frame
+            start = time.perf_counter()
+            while filled < frame_bytes:
+                got = proc.stdout.readinto(view[filled:])
+                if not got:
+                    break
+                filled += got
+            metrics.add_time("decode", time.perf_counter() - start)
+
+            if filled < frame_bytes:
+                break
+
+            metrics.count("decodedFrames")
+            yield pool[n % len(pool)]
+            n += 1
+
+        finished = True
+    finally:
+        if not finished and proc.poll() is None:
+            # Consumer stopped early: stop decoding the rest of the video
+            proc.kill()
+        proc.stdout.close()
+        if reader is not None:
+            reader.join()
+            stderr = "\n".join(kept)
+        else:
+            stderr = proc.stderr.read().decode("utf-8", "replace").strip()
+        proc.stderr.close()
+        proc.wait()
+
+    if proc.returncode != 0:
+        raise Exception(f"ffmpeg failed ({proc.returncode}): {stderr}")
+
+
+def read_frames_ffmpeg(
+    video_path: str,
+    frame_nums: Iterable[int],
+    frame_time: Callable[[int], float],
+    width: int,
+    height: int,
+    wanted: Optional[Callable[[int], bool]] = None,
+    cluster_gap_s: float = CLUSTER_GAP_S,
+    reuse_buffer: bool = False
+) -> Iterator[Tuple[int, Optional[np.ndarray]]]:
+    """
+    Same contract as frame_scheduler.read_frames_sequential, decoded by one
+    ffmpeg process. frame_time(n) is frame n's presentation time in seconds.
+
+    Frames past the end of the video come back as None. wanted() is checked
+    before each frame is yielded, but every requested frame is decoded: the
+    selection is fixed when ffmpeg starts. With reuse_buffer, frames are
+    yielded straight from the read buffer (valid until the next frame).
+    """
+    targets = sorted(set(int(n) for n in frame_nums))
+    if not targets:
+        return
+
+    clusters: List[List[int]] = []
+    for n in targets:
+        if clusters and frame_time(n) - frame_time(clusters[-1][-1]) <= cluster_gap_s:
+            clusters[-1].append(n)
+        else:
+            clusters.append([n])
+
+    cmd: List[str] = [FFMPEG_PATH, "-loglevel", "error", "-nostdin"]
+    graph = []
+    for k, cluster in enumerate(clusters):
+        # Accurate input seek: output starts at the first frame at/after start
+        start = max(0.0, frame_time(cluster[0]) - 0.001)
+        span = frame_time(cluster[-1]) - start + 0.01  # Stop decoding right after the last pick
+        cmd += ["-ss", f"{start:.6f}", "-t", f"{span:.6f}", "-i", video_path]
+        picks = "+".join(f"eq(n,{n - cluster[0]})" for n in cluster)
+        graph.append(f"[{k}:v:0]select='{picks}'[v{k}]")
+    graph.append("".join(f"[v{k}]" for k in range(len(clusters))) + f"concat=n={len(clusters)}:v=1:a=0[out]")
+    cmd += [
+        "-filter_complex", ";".join(graph),
+        "-map", "[out]",
+        *passthrough_args(),
+        "-f", "rawvideo", "-pix_fmt", "bgr24", "pipe:1"
+    ]
+    current_metrics().count("seeks", len(clusters))
+
+    # Frames arrive in target order; any shortfall is the tail past the end
+    remaining = iter(targets)
+    for frame in _iter_raw_frames(cmd, width, height, pool_size=1):
+        n = next(remaining, None)
+        if n is None:
+            break
+        if wanted is None or wanted(n):
+            # Unless told otherwise, callers may hold frames across yields
+            yield n, frame if reuse_buffer else frame.copy()
+    for n in remaining:
+        if wanted is None or wanted(n):
+            yield n, None
+
+
+def read_frames_streamed(
+    feed: Callable[[BinaryIO], None],
+    frame_nums: Iterable[int],
+    frame_time: Callable[[int], float],
+    width: int,
+    height: int,
+    wanted: Optional[Callable[[int], bool]] = None,
+    reuse_buffer: bool = False
+) -> Iterator[Tuple[int, Optional[np.ndarray]]]:
+    """
+    Same contract as read_frames_ffmpeg for a video that can only be read
+    once, front to back (feed writes it to ffmpeg's stdin, e.g. while it is
+    still downloading). Each frame is yielded as soon as ffmpeg decodes it.
+
+    Frame n is the first frame at or after frame_time(n), which is exactly
+    frame n for constant frame rate video. select passes each such frame
+    once; prev_selected_t stops it passing the frames that follow.
+    """
+    targets = sorted(set(int(n) for n in frame_nums))
+    if not targets:
+        return
+
+    times = [frame_time(n) - 0.001 for n in targets]
+    picks = "+".join(
+        f"gte(t,{t:.6f})*(isnan(prev_selected_t)+lt(prev_selected_t,{t:.6f}))" for t in times
+    )
+    frames = iter_ffmpeg_frames_with_pts(
+        "pipe:0", width, height,
+        video_filter=f"select='{picks}',scale={width}:{height}",
+        pool_size=1,
+        feed=feed
+    )
+
+    k = 0
+    try:
+        for pts, frame in frames:
+            # A frame stands in for every target it is the first frame at or after
+            while k < len(targets) and times[k] <= pts:
+                if wanted is None or wanted(targets[k]):
+                    yield targets[k], frame if reuse_buffer else frame.copy()
+                k += 1
+            if k == len(targets):
+                break  # Every target seen: stop decoding the rest
+    finally:
+        frames.close()
+    for n in targets[k:]:
+        if wanted is None or wanted(n):
+            yield n, None
@@ -0,0 +1,175 @@
+#!/usr/bin/env python3
+"""
+Frame Encoder
+Turns a finished crop into the bytes handed to the frame sink.
+
+By default crops are baseline JPEG at the mode's quality (95, range mode
+100), as before. Configurable:
+
+- format: jpeg, webp or avif (whichever the installed OpenCV can write),
+  or auto: every available format, keeping the smallest result
+- progressive / optimized-Huffman JPEG (smaller files, same pixels)
+- quality search: instead of a fixed quality, the lowest quality whose
+  SSIM against the crop stays above FRAME_MIN_SSIM, and/or the highest
+  quality that fits in FRAME_TARGET_BYTES (the byte budget wins when both
+  are set and disagree)
+
+encode_frame() returns the bytes, the file extension and an "encoding"
+block (format, quality, bytes, width, height, ssim when measured) that is
+reported with each frame.
+"""
+
+import os
+import cv2
+import numpy as np
+from typing import Callable, Dict, List, Optional, Tuple
+
+
+# ===============================
+# CONFIG
+# ===============================
+FORMATS = {
+    # name: (extension, quality flag)
+    "jpeg": (".jpg", cv2.IMWRITE_JPEG_QUALITY),
+    "webp": (".webp", cv2.IMWRITE_WEBP_QUALITY),
+    "avif": (".avif", getattr(cv2, "IMWRITE_AVIF_QUALITY", None)),
+}
+
+OUTPUT_FORMAT = os.environ.get("FRAME_OUTPUT_FORMAT", "jpeg")
+OUTPUT_QUALITY = int(os.environ.get("FRAME_OUTPUT_QUALITY", 0)) or None  # None: the mode's quality
+JPEG_PROGRESSIVE = os.environ.get("FRAME_JPEG_PROGRESSIVE", "0") == "1"
+JPEG_OPTIMIZE = os.environ.get("FRAME_JPEG_OPTIMIZE", "0") == "1"
+
+# Quality search (either or both)
+TARGET_BYTES = int(os.environ.get("FRAME_TARGET_BYTES", 0)) or None
+MIN_SSIM = float(os.environ.get("FRAME_MIN_SSIM", 0)) or None
+MIN_QUALITY = int(os.environ.get("FRAME_MIN_QUALITY", 30))
+
+
+def available_formats() -> List[str]:
+    """Formats the installed OpenCV can encode."""
+    return [
+        name for name, (ext, flag) in FORMATS.items()
+        if flag is not None and cv2.haveImageWriter("frame" + ext)
+    ]
+
+
+if OUTPUT_FORMAT != "auto" and OUTPUT_FORMAT not in FORMATS:
+    raise ValueError(f"FRAME_OUTPUT_FORMAT must be one of {', '.join(FORMATS)} or auto, not {OUTPUT_FORMAT!r}")
+if OUTPUT_FORMAT in FORMATS and OUTPUT_FORMAT not in available_formats():
+    raise ValueError(f"FRAME_OUTPUT_FORMAT={OUTPUT_FORMAT}: this OpenCV build cannot write it")
+if OUTPUT_FORMAT == "auto" and MIN_SSIM is None:
+    # Quality numbers mean different things per codec; compare at equal fidelity
+    raise ValueError("FRAME_OUTPUT_FORMAT=auto needs FRAME_MIN_SSIM")
+
+
+def encode_params(fmt: str, quality: int) -> List[int]:
+    params = [FORMATS[fmt][1], int(quality)]
+    if fmt == "jpeg":
+        if JPEG_PROGRESSIVE:
+            params += [cv2.IMWRITE_JPEG_PROGRESSIVE, 1]
+        if JPEG_OPTIMIZE:
+            params += [cv2.IMWRITE_JPEG_OPTIMIZE, 1]
+    return params
+
+
+def encode(image: np.ndarray, fmt: str, quality: int) -> bytes:
+    ok, buf = cv2.imencode(FORMATS[fmt][0], image, encode_params(fmt, quality))
+    if not ok:
+        raise Exception(f"Could not encode {fmt} at quality {quality}")
+    return buf.tobytes()
+
+
+def ssim(a: np.ndarray, b: np.ndarray) -> float:
+    """Mean structural similarity of two same-sized images, on luma (Wang et al. 2004)."""
+    if a.ndim == 3:
+        a = cv2.cvtColor(a, cv2.COLOR_BGR2GRAY)
+    if b.ndim == 3:
+        b = cv2.cvtColor(b, cv2.COLOR_BGR2GRAY)
+    a = a.astype(np.float32)
+    b = b.astype(np.float32)
+    c1, c2 = (0.01 * 255) ** 2, (0.03 * 255) ** 2
+
+    def blur(x):
+        return cv2.GaussianBlur(x, (11, 11), 1.5)
+
+    mu_a, mu_b = blur(a), blur(b)
+    var_a = blur(a * a) - mu_a * mu_a
+    var_b = blur(b * b) - mu_b * mu_b
+    cov = blur(a * b) - mu_a * mu_b
+    ssim_map = ((2 * mu_a * mu_b + c1) * (2 * cov + c2)) / ((mu_a * mu_a + mu_b * mu_b + c1) * (var_a + var_b + c2))
+    return float(ssim_map.mean())
+
+
+def _lowest_passing(lo: int, hi: int, passes: Callable[[int], bool]) -> Optional[int]:
+    """Lowest q in [lo, hi] with passes(q), assuming passes is monotonic in q."""
+    if lo > hi or not passes(hi):
+        return None
+    while lo < hi:
+        mid = (lo + hi) // 2
+        if passes(mid):
+            hi = mid
+        else:
+            lo = mid + 1
+    return hi
+
+
+def search_quality(image: np.ndarray, fmt: str, max_quality: int) -> Tuple[int, bytes, Optional[float]]:
+    """Quality for MIN_SSIM / TARGET_BYTES (binary search); returns (quality, bytes, ssim)."""
+    encoded: Dict[int, bytes] = {}
+    scores: Dict[int, float] = {}
+
+    def data(q: int) -> bytes:
+        if q not in encoded:
+            encoded[q] = encode(image, fmt, q)
+        return encoded[q]
+
+    def score(q: int) -> float:
+        if q not in scores:
+            decoded = cv2.imdecode(np.frombuffer(data(q), np.uint8), cv2.IMREAD_COLOR)
+            scores[q] = ssim(image, decoded)
+        return scores[q]
+
+    lo = min(MIN_QUALITY, max_quality)
+    quality = max_quality
+    if MIN_SSIM is not None:
+        quality = _lowest_passing(lo, max_quality, lambda q: score(q) >= MIN_SSIM) or max_quality
+    if TARGET_BYTES is not None and len(data(quality)) > TARGET_BYTES:
+        # Highest quality in budget = one below the lowest quality over it
+        over = _lowest_passing(lo, quality, lambda q: len(data(q)) > TARGET_BYTES)
+        quality = max(lo, (over or lo) - 1)
+
+    return quality, data(quality), scores.get(quality)
+
+
+def encode_frame(image: np.ndarray, quality: int) -> Tuple[bytes, str, Dict]:
+    """
+    Encode a crop with the configured format and quality settings.
+    quality: the mode's default, used unless FRAME_OUTPUT_QUALITY is set;
+    the ceiling of the quality search.
+    Returns (data, extension, encoding info).
+    """
+    quality = OUTPUT_QUALITY or quality
+    formats = available_formats() if OUTPUT_FORMAT == "auto" else [OUTPUT_FORMAT]
+    search = MIN_SSIM is not None or TARGET_BYTES is not None
+
+    best = None
+    for fmt in formats:
+        if search:
+            q, data, score = search_quality(image, fmt, quality)
+        else:
+            q, data, score = quality, encode(image, fmt, quality), None
+        if best is None or len(data) < len(best[2]):
+            best = (fmt, q, data, score)
+
+    fmt, q, data, score = best
+    info = {
+        "format": fmt,
+        "quality": q,
+        "bytes": len(data),
+        "width": int(image.shape[1]),
+        "height": int(image.shape[0]),
+    }
+    if score is not None:
+        info["ssim"] = round(score, 4)
+    return data, FORMATS[fmt][0], info
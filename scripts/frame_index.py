@@ -0,0 +1,194 @@
+#!/usr/bin/env python3
+"""
+Frame Index
+Per-video table of frame timestamps and keyframes, built once with ffprobe.
+
+OpenCV maps seconds to frames with the container's average fps, which is
+only approximate for variable-frame-rate downloads, and a CAP_PROP_POS_*
+seek decodes from whichever keyframe precedes the target, so its cost
+depends on GOP length. The index lists every frame's presentation timestamp
+and which frames are keyframes (read from the packet table, no decoding),
+so callers can pick the exact frame for a timestamp and know in advance how
+many frames a seek will decode.
+
+Indexes of video cache entries are stored as JSON next to the video
+(<video>.frames.json; the cache evicts it together with the video) and
+rebuilt whenever the video's content hash changes. mtime is not used: the
+video cache touches entries on every hit. Nothing is written next to other
+videos (temporary downloads, local files the pipeline does not own); their
+index lives in memory for the process, and parallel shards are handed the
+parent's copy (remember_frame_index). The in-memory copies are kept per
+path, checked against the content hash, for the FRAME_INDEX_MEMO_SIZE most
+recently used videos, so a long-lived worker's memory stays bounded.
+"""
+
+import os
+import sys
+import json
+import subprocess
+from bisect import bisect_right
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+
+from ffmpeg_frames import FFPROBE_PATH
+from detection_cache import video_content_hash
+
+
+# ===============================
+# CONFIG
+# ===============================
+FRAME_INDEX_ENABLED = os.environ.get("FRAME_SEEK_INDEX", "1") != "0"
+
+INDEX_VERSION = 1
+INDEX_SUFFIX = ".frames.json"
+
+# OpenCV's FFmpeg backend seeks to this many frames before the target and
+# decodes forward from the keyframe preceding that point
+SEEK_PREROLL_FRAMES = 16
+
+# Timestamps within this of a frame's pts select that frame (pts rounding)
+TIME_EPSILON_S = 0.001
+
+# Indexes kept in memory per process (a 2-hour video's is a few MB)
+FRAME_INDEX_MEMO_SIZE = 4
+
+# abspath -> (content hash, index), least recently used first
+_memo: "OrderedDict[str, Tuple[str, FrameIndex]]" = OrderedDict()
+
+
+class FrameIndex:
+    """Presentation timestamps (seconds from the first frame) and keyframe numbers."""
+
+    def __init__(self, pts: List[float], keyframes: List[int]):
+        self.pts = pts
+        self.keyframes = keyframes or [0]
+
+    def __len__(self) -> int:
+        return len(self.pts)
+
+    def frame_at(self, t: float) -> int:
+        """The frame shown at time t (the last frame starting at or before it)."""
+        return max(0, bisect_right(self.pts, t + TIME_EPSILON_S) - 1)
+
+    def time_of(self, frame_num: int) -> float:
+        return self.pts[min(max(0, frame_num), len(self.pts) - 1)]
+
+    def keyframe_before(self, frame_num: int) -> int:
+        """The last keyframe at or before frame_num."""
+        k = bisect_right(self.keyframes, frame_num) - 1
+        return self.keyframes[max(0, k)]
+
+    def seek_cost(self, frame_num: int) -> int:
+        """Frames decoded to land on frame_num with a cv2 seek."""
+        return frame_num - self.keyframe_before(max(0, frame_num - SEEK_PREROLL_FRAMES)) + 1
+
+    def nearest_keyframe(self, t: float, max_distance_s: float) -> Optional[int]:
+        """Closest keyframe within max_distance_s of time t, if any."""
+        k = bisect_right(self.keyframes, self.frame_at(t))
+        near = [
+            kf for kf in self.keyframes[max(0, k - 1):k + 1]
+            if abs(self.time_of(kf) - t) <= max_distance_s
+        ]
+        return min(near, key=lambda kf: abs(self.time_of(kf) - t)) if near else None
+
+    def to_dict(self) -> Dict:
+        return {"pts": self.pts, "keyframes": self.keyframes}
+
+
+def probe_frame_index(video_path: str) -> FrameIndex:
+    """Build the index from the first video stream's packets (no decoding)."""
+    try:
+        out = subprocess.run(
+            [
+                FFPROBE_PATH,
+                "-v", "error",
+                "-select_streams", "v:0",
+                "-show_entries", "packet=pts_time,flags",
+                "-of", "csv=print_section=0",
+                video_path
+            ],
+            check=True,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            text=True
+        )
+    except subprocess.CalledProcessError as e:
+        raise Exception(f"ffprobe failed: {e.stderr.strip()}")
+
+    packets = []
+    for line in out.stdout.splitlines():
+        pts_time, _, flags = line.strip().partition(",")
+        try:
+            packets.append((float(pts_time), "K" in flags))
+        except ValueError:
+            continue  # pts_time N/A (e.g. header packets)
+    if not packets:
+        raise Exception(f"No video packets in {video_path}")
+
+    # Packets are in decode order; frames are numbered in presentation order
+    packets.sort(key=lambda p: p[0])
+    first = packets[0][0]
+    pts = [round(t - first, 6) for t, _ in packets]
+    keyframes = [n for n, (_, key) in enumerate(packets) if key]
+    return FrameIndex(pts, keyframes)
+
+
+def _memoize(video_path: str, content_hash: str, index: FrameIndex) -> None:
+    key = os.path.abspath(video_path)
+    _memo[key] = (content_hash, index)
+    _memo.move_to_end(key)
+    while len(_memo) > FRAME_INDEX_MEMO_SIZE:
+        _memo.popitem(last=False)
+
+
+def remember_frame_index(video_path: str, index: FrameIndex) -> None:
+    """Use an index built elsewhere (e.g. by the parent of a shard process) for this video."""
+    _memoize(video_path, video_content_hash(video_path), index)
+
+
+def load_frame_index(video_path: str, save: bool = False) -> Optional[FrameIndex]:
+    """
+    The video's index: from memory, from <video>.frames.json, or built now.
+    save: write a newly built index to <video>.frames.json; only for videos
+    whose directory the pipeline owns (video cache entries).
+    None when disabled (FRAME_SEEK_INDEX=0) or ffprobe cannot read the video.
+    """
+    if not FRAME_INDEX_ENABLED:
+        return None
+
+    content_hash = video_content_hash(video_path)
+    memo_hash, index = _memo.get(os.path.abspath(video_path), (None, None))
+    if memo_hash == content_hash:
+        _memo.move_to_end(os.path.abspath(video_path))
+        return index
+
+    index_path = video_path + INDEX_SUFFIX
+    index = None
+    try:
+        with open(index_path) as f:
+            data = json.load(f)
+        if (data.get("version"), data.get("video_hash")) == (INDEX_VERSION, content_hash):
+            index = FrameIndex(data["pts"], data["keyframes"])
+    except (OSError, ValueError, KeyError):
+        pass
+
+    if index is None:
+        try:
+            index = probe_frame_index(video_path)
+        except Exception as e:
+            print(f"[FrameIndex] ⚠ Falling back to fps-based seeking: {e}", file=sys.stderr)
+            return None
+        print(f"[FrameIndex] Indexed {len(index)} frames, {len(index.keyframes)} keyframes", file=sys.stderr)
+
+        if save:
+            # Write-then-rename: concurrent jobs on the same cached video may build it at once
+            try:
+                tmp_path = f"{index_path}.{os.getpid()}.tmp"
+                with open(tmp_path, "w") as f:
+                    json.dump({"version": INDEX_VERSION, "video_hash": content_hash, **index.to_dict()}, f)
+                os.replace(tmp_path, index_path)
+            except OSError as e:
+                print(f"[FrameIndex] ⚠ Could not save {index_path}: {e}", file=sys.stderr)
+
+    _memoize(video_path, content_hash, index)
+    return index
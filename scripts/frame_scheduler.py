@@ -0,0 +1,145 @@
+#!/usr/bin/env python3
+"""
+Frame Scheduler
+Reads a set of frame numbers from a cv2.VideoCapture in one forward pass.
+
+Seeking with CAP_PROP_POS_FRAMES makes OpenCV decode again from the previous
+keyframe, so requesting frames in caller order (e.g. every smart-seek offset
+of every quote) re-decodes the same GOPs many times. The scheduler sorts and
+de-duplicates the requested frames, skips short gaps with grab() (decode
+only, no colour conversion / copy), calls retrieve() only for frames that are
+still wanted, and seeks only across gaps too long to decode through.
+
+With a FrameIndex (see frame_index.py) frame numbers are exact presentation
+order positions rather than fps-derived guesses: after each seek the decoder's
+reported timestamp says exactly which frame it landed on, and a gap is
+decoded through only while that is cheaper than the seek's known cost
+(frames from the target's keyframe).
+
+With reuse_buffer, every frame is retrieved into one preallocated buffer
+instead of a fresh array per frame; a yielded frame is then only valid
+until the next one is read, so consumers that hold frames must copy them.
+"""
+
+import time
+import cv2
+import numpy as np
+from typing import Callable, Iterable, Iterator, Optional, Tuple
+
+from extraction_metrics import current_metrics
+from frame_index import FrameIndex
+
+
+# ===============================
+# CONFIG
+# ===============================
+# Gaps shorter than this are decoded through with grab(); longer gaps seek.
+MAX_GRAB_GAP_S = 4.0
+
+
+def read_frames_sequential(
+    cap: cv2.VideoCapture,
+    frame_nums: Iterable[int],
+    fps: float,
+    wanted: Optional[Callable[[int], bool]] = None,
+    max_grab_gap_s: float = MAX_GRAB_GAP_S,
+    index: Optional[FrameIndex] = None,
+    reuse_buffer: bool = False
+) -> Iterator[Tuple[int, Optional[np.ndarray]]]:
+    """
+    Yield (frame_num, frame) for each requested frame in ascending order.
+
+    frame is None when the frame could not be read (e.g. past the end).
+    wanted(frame_num) is checked right before each frame is decoded; frames
+    no longer wanted are skipped without retrieve(). With reuse_buffer,
+    frames share one buffer (see module docstring).
+    """
+    if index is not None:
+        yield from _read_frames_indexed(cap, frame_nums, index, wanted, reuse_buffer)
+        return
+
+    max_gap = max(1, int(fps * max_grab_gap_s)) if fps > 0 else 1
+    pos: Optional[int] = None  # Frame number the next grab() will return
+    metrics = current_metrics()
+    buf: Optional[np.ndarray] = None
+
+    for target in sorted(set(int(n) for n in frame_nums)):
+        if wanted is not None and not wanted(target):
+            continue
+
+        start = time.perf_counter()
+        if pos is None or target < pos or target - pos > max_gap:
+            cap.set(cv2.CAP_PROP_POS_FRAMES, target)
+            metrics.count("seeks")
+            pos = target
+
+        grabbed = pos
+        while pos < target and cap.grab():
+            pos += 1
+
+        if pos < target or not cap.grab():
+            # Read failure (usually past the end): seek again for the next frame
+            metrics.count("decodedFrames", pos - grabbed)
+            metrics.add_time("decode", time.perf_counter() - start)
+            pos = None
+            yield target, None
+            continue
+        pos += 1
+
+        ret, frame = cap.retrieve(buf)
+        if reuse_buffer and ret:
+            buf = frame
+        metrics.count("decodedFrames", pos - grabbed)
+        metrics.add_time("decode", time.perf_counter() - start)
+        yield target, frame if ret else None
+
+
+def _read_frames_indexed(
+    cap: cv2.VideoCapture,
+    frame_nums: Iterable[int],
+    index: FrameIndex,
+    wanted: Optional[Callable[[int], bool]] = None,
+    reuse_buffer: bool = False
+) -> Iterator[Tuple[int, Optional[np.ndarray]]]:
+    """read_frames_sequential with frame numbers from a FrameIndex."""
+    pos: Optional[int] = None  # Frame number the next grab() will return
+    metrics = current_metrics()
+    buf: Optional[np.ndarray] = None
+
+    for target in sorted(set(int(n) for n in frame_nums)):
+        if wanted is not None and not wanted(target):
+            continue
+
+        start = time.perf_counter()
+        decoded = 0
+        if pos is None or target < pos or target - pos >= index.seek_cost(target):
+            cap.set(cv2.CAP_PROP_POS_MSEC, index.time_of(target) * 1000.0)
+            metrics.count("seeks")
+            # Where the decoder actually landed, from the frame's timestamp
+            pos = None
+            if cap.grab():
+                decoded += 1
+                pos = index.frame_at(cap.get(cv2.CAP_PROP_POS_MSEC) / 1000.0) + 1
+            if pos is not None and pos > target + 1:
+                # Landed past the target (inexact seek): fall back to cv2's frame count
+                cap.set(cv2.CAP_PROP_POS_FRAMES, target)
+                pos = target + 1 if cap.grab() else None
+                decoded += 1
+
+        while pos is not None and pos <= target and cap.grab():
+            pos += 1
+            decoded += 1
+
+        metrics.count("decodedFrames", decoded)
+        if pos != target + 1:
+            # Read failure (usually past the end): seek again for the next frame
+            metrics.add_time("decode", time.perf_counter() - start)
+            pos = None
+            yield target, None
+            continue
+
+        ret, frame = cap.retrieve(buf)
+        if reuse_buffer and ret:
+            buf = frame
+        metrics.add_time("decode", time.perf_counter() - start)
+        yield target, frame if ret else None
@@ -0,0 +1,158 @@
+#!/usr/bin/env python3
+"""
+Frame Sink
+Where extracted frames go once they are encoded.
+
+    local  (default) files in the job's output directory, served by the app
+           as /frames/<name>
+    s3     objects in AWS_S3_BUCKET, uploaded straight from memory; results
+           carry the object URL, so any app node can serve them
+
+Extractors encode a crop to bytes and hand it to sink.put(), which returns
+the "path" and "url" fields of the result. S3 uploads run in the
+background on a shared thread pool through one pooled client per process
+(boto3 clients are thread-safe), so encoding the next frame overlaps the
+previous upload. sink.flush() waits for the uploads and raises if any
+failed; extractors call it before returning their results.
+
+FRAME_S3_ENDPOINT_URL points the client at an S3-compatible stand-in
+(MinIO, LocalStack, moto server) for local testing.
+"""
+
+import os
+import io
+import threading
+from urllib.parse import urlsplit
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import List, Optional, Tuple
+
+
+# ===============================
+# CONFIG
+# ===============================
+FRAME_SINK = os.environ.get("FRAME_SINK", "local")
+if FRAME_SINK not in ("local", "s3"):
+    raise ValueError(f"FRAME_SINK must be local or s3, not {FRAME_SINK!r}")
+
+S3_BUCKET = os.environ.get("AWS_S3_BUCKET")
+S3_PREFIX = os.environ.get("FRAME_S3_PREFIX", "frames/")
+S3_ENDPOINT_URL = os.environ.get("FRAME_S3_ENDPOINT_URL") or None
+S3_REGION = os.environ.get("AWS_REGION") or os.environ.get("AWS_DEFAULT_REGION") or None
+# Base of the returned URLs (e.g. a CloudFront domain); default: the bucket's own URL
+S3_PUBLIC_URL = os.environ.get("FRAME_S3_PUBLIC_URL")
+S3_UPLOAD_WORKERS = int(os.environ.get("FRAME_S3_UPLOAD_WORKERS", 8))
+# Frames are far below this; larger objects are uploaded in parts
+S3_MULTIPART_THRESHOLD = 8 * 1024 ** 2
+
+CONTENT_TYPES = {
+    ".jpg": "image/jpeg", ".jpeg": "image/jpeg", ".png": "image/png", ".webp": "image/webp", ".avif": "image/avif"
+}
+
+_s3_lock = threading.Lock()
+_s3_client = None
+_transfer_config = None
+_upload_pool: Optional[ThreadPoolExecutor] = None
+
+
+def content_type(filename: str) -> str:
+    """MIME type for an encoded frame, by extension (so browsers / CDNs render it inline)."""
+    return CONTENT_TYPES.get(os.path.splitext(filename)[1].lower(), "application/octet-stream")
+
+
+class LocalFrameSink:
+    """Files in output_dir, served by the app under /frames/."""
+
+    def __init__(self, output_dir: str, url_prefix: str = "/frames/"):
+        self.output_dir = output_dir
+        self.url_prefix = url_prefix
+
+    def put(self, filename: str, data: bytes) -> Tuple[str, str]:
+        """Store one encoded frame; returns (path, url)."""
+        out_path = os.path.join(self.output_dir, filename)
+        with open(out_path, "wb") as f:
+            f.write(data)
+        return out_path, self.url_prefix + filename
+
+    def flush(self) -> None:
+        pass
+
+
+def _shared_s3():
+    """This process's S3 client, transfer config and upload pool (created on first use)."""
+    global _s3_client, _transfer_config, _upload_pool
+    with _s3_lock:
+        if _s3_client is None:
+            try:
+                import boto3
+                from boto3.s3.transfer import TransferConfig
+                from botocore.config import Config
+            except ImportError:
+                raise Exception("FRAME_SINK=s3 needs boto3 (pip install boto3)")
+            _s3_client = boto3.client(
+                "s3",
+                endpoint_url=S3_ENDPOINT_URL,
+                region_name=S3_REGION,
+                # One connection per upload thread
+                config=Config(max_pool_connections=max(10, S3_UPLOAD_WORKERS))
+            )
+            # Parallelism comes from the upload pool, not per-object threads
+            _transfer_config = TransferConfig(multipart_threshold=S3_MULTIPART_THRESHOLD, use_threads=False)
+            _upload_pool = ThreadPoolExecutor(max_workers=S3_UPLOAD_WORKERS, thread_name_prefix="s3-upload")
+        return _s3_client, _transfer_config, _upload_pool
+
+
+class S3FrameSink:
+    """Objects under s3://bucket/prefix, uploaded in the background."""
+
+    def __init__(self, bucket: Optional[str] = S3_BUCKET, prefix: str = S3_PREFIX,
+                 public_url: Optional[str] = S3_PUBLIC_URL):
+        if not bucket:
+            raise Exception("FRAME_SINK=s3 needs AWS_S3_BUCKET")
+        self.bucket = bucket
+        self.prefix = prefix
+        self.public_url = public_url.rstrip("/") if public_url else None
+        self.client, self.transfer_config, self.pool = _shared_s3()
+        self._pending: List[Future] = []
+
+    def object_url(self, key: str) -> str:
+        if self.public_url:
+            return f"{self.public_url}/{key}"
+        # The endpoint the client actually uses (FRAME_S3_ENDPOINT_URL or
+        # boto3's own AWS_ENDPOINT_URL); S3-compatible stand-ins are path-style
+        endpoint = self.client.meta.endpoint_url
+        if endpoint and not (urlsplit(endpoint).hostname or "").endswith(".amazonaws.com"):
+            return f"{endpoint.rstrip('/')}/{self.bucket}/{key}"
+        region = self.client.meta.region_name
+        if not region:
+            return f"https://{self.bucket}.s3.amazonaws.com/{key}"
+        return f"https://{self.bucket}.s3.{region}.amazonaws.com/{key}"
+
+    def _upload(self, key: str, data: bytes) -> None:
+        self.client.upload_fileobj(
+            io.BytesIO(data),
+            self.bucket,
+            key,
+            ExtraArgs={"ContentType": content_type(key)},
+            Config=self.transfer_config
+        )
+
+    def put(self, filename: str, data: bytes) -> Tuple[str, str]:
+        """Queue one encoded frame for upload; returns (s3:// path, url)."""
+        key = self.prefix + filename
+        self._pending.append(self.pool.submit(self._upload, key, data))
+        return f"s3://{self.bucket}/{key}", self.object_url(key)
+
+    def flush(self) -> None:
+        """Wait for queued uploads; raises the first failure."""
+        pending, self._pending = self._pending, []
+        errors = [f.exception() for f in pending]
+        failed = [e for e in errors if e is not None]
+        if failed:
+            raise Exception(f"{len(failed)} of {len(pending)} frame uploads failed: {failed[0]}")
+
+
+def open_frame_sink(output_dir: str, kind: str = FRAME_SINK):
+    """The configured sink (FRAME_SINK) for a job writing into output_dir."""
+    if kind == "s3":
+        return S3FrameSink()
+    return LocalFrameSink(output_dir)
@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+"""
+Frame Stream
+Hands each finished frame result (VALID or SKIP_FRAME) to a listener as soon
+as it is ready, for NDJSON streaming output (--stream).
+
+Extraction code calls emit_frame(index, frame) where index is the position
+in the request it was given. Layers that split a request (sections, process
+shards) wrap their calls in remap_indices() so listeners always see indices
+into the original request. With no listener installed everything here is a
+no-op.
+"""
+
+import sys
+import json
+import threading
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterator, Optional, Sequence, TextIO
+
+FrameListener = Callable[[int, Dict], None]
+
+_current = threading.local()
+
+
+def current_listener() -> Optional[FrameListener]:
+    return getattr(_current, "listener", None)
+
+
+def emit_frame(index: int, frame: Dict) -> None:
+    listener = current_listener()
+    if listener is not None:
+        listener(index, frame)
+
+
+@contextmanager
+def listen(listener: Optional[FrameListener]) -> Iterator[None]:
+    """Install a listener for this thread for the block."""
+    previous = current_listener()
+    _current.listener = listener
+    try:
+        yield
+    finally:
+        _current.listener = previous
+
+
+@contextmanager
+def remap_indices(indices: Sequence[int]) -> Iterator[None]:
+    """Inside the block, frame i is reported as indices[i]."""
+    parent = current_listener()
+    if parent is None:
+        yield
+        return
+    with listen(lambda i, frame: parent(indices[i], frame)):
+        yield
+
+
+def ndjson_writer(stream: TextIO = sys.stdout, encoder: Optional[type] = None) -> FrameListener:
+    """Listener writing {"type": "frame", "index": i, "frame": {...}} lines."""
+    lock = threading.Lock()
+
+    def write(index: int, frame: Dict) -> None:
+        line = json.dumps({"type": "frame", "index": index, "frame": frame}, cls=encoder)
+        with lock:
+            stream.write(line + "\n")
+            stream.flush()
+
+    return write
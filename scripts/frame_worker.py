@@ -0,0 +1,174 @@
+#!/usr/bin/env python3
+"""
+Frame Extraction Worker
+Long-lived HTTP (TCP or Unix socket) service with a bounded job queue.
+
+Spawning extract_frames.py per request pays interpreter startup, the
+cv2/PIL/imagehash imports and the detector load every time. The worker pays
+that once and then runs jobs from a queue:
+
+    POST /jobs   {"mode": "quote", "url": ..., "video_id": ..., "timestamps": [...]}
+                 -> 200 + result JSON (same shape as the CLI output)
+                 -> 503 when the queue is full
+    GET  /health -> {"ok": true, "queued": n, "workers": n}
+
+Usage:
+    python3 scripts/extract_frames.py --serve --port 8765
+    python3 scripts/extract_frames.py --serve --socket /tmp/frames.sock
+"""
+
+import sys
+import os
+import json
+import queue
+import socketserver
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, Dict, Optional
+
+
+class _Job:
+    def __init__(self, payload: Dict):
+        self.payload = payload
+        self.result: Optional[Dict] = None
+        self.done = threading.Event()
+
+
+class ThreadingUnixHTTPServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+
+class JobQueue:
+    """Bounded queue drained by a fixed number of worker threads."""
+
+    def __init__(self, runner: Callable[[Dict], Dict], workers: int = 1, queue_size: int = 16,
+                 warm_up: Optional[Callable[[], None]] = None):
+        self.runner = runner
+        self.warm_up = warm_up
+        self.workers = max(1, workers)
+        self._queue: "queue.Queue[_Job]" = queue.Queue(maxsize=max(1, queue_size))
+        self._threads = []
+
+    def start(self) -> None:
+        for i in range(self.workers):
+            t = threading.Thread(target=self._loop, name=f"frame-worker-{i}", daemon=True)
+            t.start()
+            self._threads.append(t)
+
+    def submit(self, payload: Dict) -> Optional[_Job]:
+        """Queue a job; returns None when the queue is full."""
+        job = _Job(payload)
+        try:
+            self._queue.put_nowait(job)
+        except queue.Full:
+            return None
+        return job
+
+    def depth(self) -> int:
+        return self._queue.qsize()
+
+    def _loop(self) -> None:
+        # Warm the detectors on each worker thread before taking jobs
+        if self.warm_up:
+            try:
+                self.warm_up()
+            except Exception as e:
+                print(f"[Worker] ⚠ Warm-up failed: {e}", file=sys.stderr)
+
+        while True:
+            job = self._queue.get()
+            try:
+                job.result = self.runner(job.payload)
+            except Exception as e:
+                job.result = {"success": False, "error": str(e)}
+            finally:
+                job.done.set()
+                self._queue.task_done()
+
+
+def _make_handler(jobs: JobQueue, encoder=None):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def _send_json(self, status: int, body: Dict) -> None:
+            data = json.dumps(body, cls=encoder).encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def do_GET(self):
+            if self.path != "/health":
+                self._send_json(404, {"success": False, "error": "Not found"})
+                return
+            self._send_json(200, {"ok": True, "queued": jobs.depth(), "workers": jobs.workers})
+
+        def do_POST(self):
+            if self.path != "/jobs":
+                self._send_json(404, {"success": False, "error": "Not found"})
+                return
+
+            try:
+                length = int(self.headers.get("Content-Length") or 0)
+                payload = json.loads(self.rfile.read(length) or b"{}")
+                if not isinstance(payload, dict):
+                    raise ValueError("job must be a JSON object")
+            except ValueError as e:
+                self._send_json(400, {"success": False, "error": f"Invalid job: {e}"})
+                return
+
+            job = jobs.submit(payload)
+            if job is None:
+                self._send_json(503, {"success": False, "error": "Worker queue is full"})
+                return
+
+            job.done.wait()
+            self._send_json(200, job.result)
+
+        def log_message(self, format, *args):
+            print(f"[Worker] {format % args}", file=sys.stderr)
+
+    return Handler
+
+
+def serve(
+    runner: Callable[[Dict], Dict],
+    host: str = "127.0.0.1",
+    port: int = 8765,
+    socket_path: Optional[str] = None,
+    workers: int = 1,
+    queue_size: int = 16,
+    warm_up: Optional[Callable[[], None]] = None,
+    encoder=None
+) -> None:
+    jobs = JobQueue(runner, workers=workers, queue_size=queue_size, warm_up=warm_up)
+    jobs.start()
+    handler = _make_handler(jobs, encoder)
+
+    if socket_path:
+        if os.path.exists(socket_path):
+            os.remove(socket_path)
+        server = ThreadingUnixHTTPServer(socket_path, handler)
+        where = socket_path
+    else:
+        server = ThreadingHTTPServer((host, port), handler)
+        where = f"http://{host}:{port}"
+
+    print(f"[Worker] ✓ Listening on {where} ({jobs.workers} workers, queue {queue_size})", file=sys.stderr)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        if socket_path and os.path.exists(socket_path):
+            os.remove(socket_path)
+
+
+if __name__ == "__main__":
+    from pathlib import Path
+    sys.path.insert(0, str(Path(__file__).parent))
+    sys.argv.insert(1, "--serve")
+    import extract_frames
+    extract_frames.main_serve()
@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+"""
+Perceptual Hash Index
+Near-duplicate lookup for 64-bit perceptual hashes.
+
+Hashes are stored packed as uint64 in a growable numpy array, and a lookup
+is one vectorized XOR + popcount over the whole index instead of a Python
+loop over ImageHash objects. Threshold semantics match the original
+`hsh - known < threshold` check: an image is a duplicate when its Hamming
+distance to any stored hash is strictly below the threshold.
+
+Usable from any mode (legacy YOLO crops, quote/range frames) and across
+videos via save()/load().
+"""
+
+import cv2
+import numpy as np
+import imagehash
+from PIL import Image
+from typing import Optional, Union
+
+# Bits set in each byte value, for numpy builds without bitwise_count
+_POPCOUNT_8 = np.array([bin(i).count("1") for i in range(256)], dtype=np.uint8)
+
+
+def pack_hash(hsh: imagehash.ImageHash) -> int:
+    """Pack an 8x8 ImageHash into a 64-bit integer."""
+    bits = np.asarray(hsh.hash, dtype=bool).reshape(-1)
+    if bits.size != 64:
+        raise ValueError(f"Expected a 64-bit hash, got {bits.size} bits")
+    return int.from_bytes(np.packbits(bits).tobytes(), "big")
+
+
+def phash_uint64(image: np.ndarray) -> int:
+    """64-bit perceptual hash of a BGR image (same as imagehash.phash)."""
+    pil = Image.fromarray(cv2.cvtColor(image, cv2.COLOR_BGR2RGB))
+    return pack_hash(imagehash.phash(pil))
+
+
+def _popcount(values: np.ndarray) -> np.ndarray:
+    if hasattr(np, "bitwise_count"):
+        return np.bitwise_count(values)
+    return _POPCOUNT_8[values.view(np.uint8).reshape(-1, 8)].sum(axis=1)
+
+
+class PerceptualHashIndex:
+    """Packed uint64 hashes with vectorized Hamming-distance search."""
+
+    def __init__(self, threshold: float, capacity: int = 64):
+        self.threshold = threshold
+        self._hashes = np.empty(max(1, capacity), dtype=np.uint64)
+        self._size = 0
+
+    def __len__(self) -> int:
+        return self._size
+
+    def add(self, hsh: Union[int, imagehash.ImageHash]) -> None:
+        if self._size == len(self._hashes):
+            grown = np.empty(len(self._hashes) * 2, dtype=np.uint64)
+            grown[:self._size] = self._hashes[:self._size]
+            self._hashes = grown
+        self._hashes[self._size] = self._as_int(hsh)
+        self._size += 1
+
+    def min_distance(self, hsh: Union[int, imagehash.ImageHash]) -> Optional[int]:
+        """Smallest Hamming distance to any stored hash (None if empty)."""
+        if self._size == 0:
+            return None
+        diff = np.bitwise_xor(self._hashes[:self._size], np.uint64(self._as_int(hsh)))
+        return int(_popcount(diff).min())
+
+    def contains_near(self, hsh: Union[int, imagehash.ImageHash]) -> bool:
+        distance = self.min_distance(hsh)
+        return distance is not None and distance < self.threshold
+
+    def add_if_new(self, hsh: Union[int, imagehash.ImageHash]) -> bool:
+        """Add the hash unless a near duplicate is already stored; True if added."""
+        if self.contains_near(hsh):
+            return False
+        self.add(hsh)
+        return True
+
+    def save(self, path: str) -> None:
+        with open(path, "wb") as f:
+            np.save(f, self._hashes[:self._size])
+
+    @classmethod
+    def load(cls, path: str, threshold: float) -> "PerceptualHashIndex":
+        hashes = np.load(path).astype(np.uint64)
+        index = cls(threshold, capacity=max(64, len(hashes)))
+        index._hashes[:len(hashes)] = hashes
+        index._size = len(hashes)
+        return index
+
+    @staticmethod
+    def _as_int(hsh: Union[int, imagehash.ImageHash]) -> int:
+        return hsh if isinstance(hsh, int) else pack_hash(hsh)
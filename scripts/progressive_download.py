@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+"""
+Progressive Download
+Downloads a video with yt-dlp while frames are already being extracted.
+
+yt-dlp streams a single video-only format to stdout; a pump thread appends
+it to a local file as it arrives. Readers follow the file from the start
+(feed_to), blocking at its end until more data lands, so ffmpeg decodes
+early timestamps while later parts are still downloading.
+
+This needs a container ffmpeg can demux front to back (fragmented MP4 /
+faststart MP4 / WebM, which is what YouTube serves for video-only formats).
+When it is not (moov atom at the end), ffmpeg fails before the first frame
+and the caller falls back to waiting for the complete file via wait().
+"""
+
+import os
+import sys
+import time
+import threading
+import subprocess
+from typing import BinaryIO, Dict, Optional
+
+from extraction_metrics import current_metrics
+
+
+# ===============================
+# CONFIG
+# ===============================
+CHUNK_BYTES = 1024 ** 2
+INFO_TIMEOUT_S = 120.0
+
+# One line, written by yt-dlp after format selection (before the download starts)
+INFO_TEMPLATE = "%(width)s %(height)s %(fps)s %(duration)s %(ext)s"
+
+
+class ProgressiveDownload:
+    """yt-dlp writing one video-only format to `path`, readable while it grows."""
+
+    def __init__(self, yt_dlp_cmd: list, video_url: str, format_selector: str, work_dir: str):
+        self.path = os.path.join(work_dir, "progressive.video")
+        self.info_path = os.path.join(work_dir, "progressive.info")
+        self.log_path = os.path.join(work_dir, "progressive.log")
+        self.size = 0
+        self.done = False
+        self.error: Optional[str] = None
+        self._cond = threading.Condition()
+        self._metrics = current_metrics()
+        self._started = time.perf_counter()
+
+        print(f"[yt-dlp] Streaming download: {video_url}", file=sys.stderr)
+        cmd = yt_dlp_cmd + [
+            "-f", format_selector,
+            "--no-simulate",
+            "--print-to-file", INFO_TEMPLATE, self.info_path,
+            "-o", "-",
+            video_url
+        ]
+        open(self.path, "wb").close()  # Readers may open it before the first chunk
+        self._log = open(self.log_path, "wb")
+        self._proc = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=self._log)
+        self._pump_thread = threading.Thread(target=self._pump, daemon=True)
+        self._pump_thread.start()
+
+    def _pump(self) -> None:
+        try:
+            with open(self.path, "ab") as out:
+                while True:
+                    chunk = self._proc.stdout.read1(CHUNK_BYTES)
+                    if not chunk:
+                        break
+                    out.write(chunk)
+                    out.flush()
+                    with self._cond:
+                        self.size += len(chunk)
+                        self._cond.notify_all()
+            self._proc.wait()
+            if self._proc.returncode != 0:
+                with open(self.log_path, "rb") as f:
+                    self.error = f.read().decode("utf-8", "replace").strip()[-2000:] or f"yt-dlp exited {self._proc.returncode}"
+        except Exception as e:
+            self.error = str(e)
+        finally:
+            self._metrics.add_time("download", time.perf_counter() - self._started)
+            with self._cond:
+                self.done = True
+                self._cond.notify_all()
+
+    def info(self) -> Dict:
+        """width, height, fps, duration and ext of the selected format (raises if unknown)."""
+        deadline = time.monotonic() + INFO_TIMEOUT_S
+        while True:
+            line = ""
+            if os.path.exists(self.info_path):
+                with open(self.info_path) as f:
+                    line = f.readline()
+            if line.endswith("\n"):  # Complete line, not one being written
+                break
+            if self.done or time.monotonic() > deadline:
+                raise Exception(self.error or "yt-dlp did not report the video format")
+            time.sleep(0.05)
+
+        width, height, fps, duration, *ext = line.split()
+        try:
+            return {
+                "width": int(width), "height": int(height), "fps": float(fps), "duration": float(duration),
+                "ext": ext[0] if ext else None
+            }
+        except ValueError:
+            raise Exception(f"Format does not report size / fps / duration: {line}")
+
+    def feed_to(self, sink: BinaryIO) -> None:
+        """Write the download into sink as it arrives, until it is complete (or failed: see error)."""
+        with open(self.path, "rb") as src:
+            while True:
+                chunk = src.read(CHUNK_BYTES)
+                if chunk:
+                    sink.write(chunk)
+                    continue
+                with self._cond:
+                    if self.done and src.tell() >= self.size:
+                        break
+                    self._cond.wait_for(lambda: self.done or self.size > src.tell(), timeout=1.0)
+
+    def wait(self) -> str:
+        """Block until the download is complete; returns its path."""
+        with self._cond:
+            self._cond.wait_for(lambda: self.done)
+        if self.error:
+            raise Exception(f"Download failed: {self.error}")
+        return self.path
+
+    def close(self) -> None:
+        if self._proc.poll() is None:
+            self._proc.kill()
+        self._pump_thread.join()
+        self._log.close()
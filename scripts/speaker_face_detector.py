@@ -5,11 +5,16 @@ Detects and crops speaker faces from video frames with light enhancement.
 Follows strict validation rules for visual-content alignment.
 """
 
+import time
+import json
+import hashlib
 import cv2
 import numpy as np
 from typing import Dict, List, Tuple, Optional
 from pathlib import Path
 
+from face_backends import create_backend
+
 
 class SpeakerFaceDetector:
     """
@@ -35,10 +40,38 @@ class SpeakerFaceDetector:
     ❌ AI face reconstruction
     """
     
-    def __init__(self):
-        # Use OpenCV's Haar Cascade for face detection (no dlib dependency)
-        cascade_path = cv2.data.haarcascades + 'haarcascade_frontalface_default.xml'
-        self.face_cascade = cv2.CascadeClassifier(cascade_path)
+    # Bump when detection, cropping or enhancement changes in a way the
+    # settings in config_fingerprint() don't capture (invalidates cached results)
+    RESULTS_VERSION = 1
+    
+    def __init__(
+        self,
+        detection_max_side: Optional[int] = None,
+        tracking: bool = False,
+        output_size: Optional[int] = None,
+        reuse_buffers: bool = False,
+        backend=None
+    ):
+        # Face boxes come from a detection backend (see face_backends);
+        # default: OpenCV's Haar Cascade (no dlib dependency)
+        self.backend = backend or create_backend("haar")
+        
+        # Run the cascade on a frame downscaled so its longest side is at most
+        # this many pixels (None = full resolution). Boxes are mapped back to
+        # full-resolution coordinates; crop, blur and enhancement still use
+        # the full-resolution frame.
+        self.detection_max_side = detection_max_side
+        
+        # Temporal reuse between neighbouring frames (smart-seek offsets,
+        # consecutive ranges of one shot). When a frame barely differs from
+        # the last one the cascade ran on, its boxes are reused; otherwise the
+        # cascade searches an expanded ROI around them first and only falls
+        # back to the full frame when the ROI has no face.
+        self.tracking = tracking
+        self.track_thumb_width = 64        # Thumbnail width for the change check
+        self.reuse_diff_threshold = 2.0    # Mean abs thumbnail difference (0-255)
+        self.roi_expand = 1.0              # ROI margin, in face-box sizes per side
+        self.reset_tracking()
         
         # Minimum face size as percentage of frame
         self.min_face_ratio = 0.002  # 0.2% (aggressively relaxed for wide shots)
@@ -48,6 +81,23 @@ class SpeakerFaceDetector:
         
         # Face padding ratio for cropping
         self.padding_ratio = 0.35
+        
+        # Longest side of the enhanced crop (None = keep crop resolution).
+        # Crops are downscaled before enhancement, so the filters only run
+        # on pixels that are actually shown.
+        self.output_size = output_size
+        
+        # Built once, reused for every crop
+        self.clahe = cv2.createCLAHE(clipLimit=2.0, tileGridSize=(8, 8))
+        
+        # Convert frames to grayscale into one buffer, reallocated only when
+        # the frame size changes (results never keep the grayscale image)
+        self.reuse_buffers = reuse_buffers
+        self._gray: Optional[np.ndarray] = None
+        
+        # Total time spent in light_enhance (lets callers split detection
+        # time from enhancement time)
+        self.enhance_seconds = 0.0
     
     def detect_speaker_face(
         self, 
@@ -78,17 +128,36 @@ class SpeakerFaceDetector:
             }
         
         # Convert to grayscale for detection
-        gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+        gray = self._grayscale(frame)
         
         # Detect faces
-        faces = self.face_cascade.detectMultiScale(
-            gray,
-            scaleFactor=1.1,
-            minNeighbors=5,
-            minSize=(30, 30),  # Relaxed from 60x60
-            flags=cv2.CASCADE_SCALE_IMAGE
-        )
-        
+        faces = self._track_faces(gray) if self.tracking else self._detect_faces(gray)
+        return self._evaluate_faces(frame, gray, faces)
+    
+    def detect_speaker_faces(self, frames: List[np.ndarray]) -> List[Dict]:
+        """
+        detect_speaker_face for several frames, with one backend.detect_batch
+        call for all of them (one batched inference for YOLO). With tracking,
+        frames are handled one by one, since each depends on the previous.
+        """
+        if self.tracking:
+            return [self.detect_speaker_face(frame) for frame in frames]
+        
+        results: List[Optional[Dict]] = [None] * len(frames)
+        valid = []
+        for i, frame in enumerate(frames):
+            if frame is None or frame.size == 0:
+                results[i] = {'detected': False, 'reason': 'INVALID_FRAME'}
+            else:
+                valid.append(i)
+        
+        grays = [cv2.cvtColor(frames[i], cv2.COLOR_BGR2GRAY) for i in valid]
+        for i, gray, faces in zip(valid, grays, self._detect_faces_batch(grays)):
+            results[i] = self._evaluate_faces(frames[i], gray, faces)
+        return results
+    
+    def _evaluate_faces(self, frame: np.ndarray, gray: np.ndarray, faces) -> Dict:
+        """Validate detected boxes (size, blur) and crop + enhance the speaker."""
         if len(faces) == 0:
             return {
                 'detected': False,
@@ -129,7 +198,7 @@ class SpeakerFaceDetector:
             # Check blur score of the largest face (as proxy for focus)
             main_face = valid_faces[0]
             face_region = gray[main_face[1]:main_face[1]+main_face[3], main_face[0]:main_face[0]+main_face[2]]
-            blur_score = cv2.Laplacian(face_region, cv2.CV_64F).var()
+            blur_score = laplacian_variance(face_region)
             
             if blur_score < self.min_blur_score:
                  return {
@@ -145,7 +214,7 @@ class SpeakerFaceDetector:
             cropped = self._crop_with_padding(frame, x_min, y_min, group_w, group_h)
             self.padding_ratio = original_padding # Restore
             
-            enhanced = self.light_enhance(cropped)
+            enhanced = self.light_enhance(cropped, self.output_size)
             
             return {
                 'detected': True,
@@ -163,7 +232,7 @@ class SpeakerFaceDetector:
         
         # Check face clarity using Laplacian variance (blur detection)
         face_region = gray[y:y+h, x:x+w]
-        blur_score = cv2.Laplacian(face_region, cv2.CV_64F).var()
+        blur_score = laplacian_variance(face_region)
         
         if blur_score < self.min_blur_score:
             return {
@@ -176,7 +245,7 @@ class SpeakerFaceDetector:
         cropped = self._crop_with_padding(frame, x, y, w, h)
         
         # Apply LIGHT enhancement only
-        enhanced = self.light_enhance(cropped)
+        enhanced = self.light_enhance(cropped, self.output_size)
         
         # Calculate confidence based on blur score and face size
         confidence = min(1.0, (blur_score / 200) * 0.5 + (face_ratio / 0.1) * 0.5)
@@ -191,6 +260,128 @@ class SpeakerFaceDetector:
             'face_ratio': round(face_ratio, 4)
         }
     
+    def _grayscale(self, frame: np.ndarray) -> np.ndarray:
+        if not self.reuse_buffers:
+            return cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+        if self._gray is None or self._gray.shape != frame.shape[:2]:
+            self._gray = np.empty(frame.shape[:2], dtype=np.uint8)
+        return cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY, dst=self._gray)
+    
+    def _detect_faces(self, gray: np.ndarray) -> np.ndarray:
+        """
+        Run the backend, downscaled to detection_max_side when set.
+        Returns [x, y, w, h] boxes in full-resolution coordinates.
+        """
+        return self._detect_faces_batch([gray])[0]
+    
+    def _detect_faces_batch(self, grays: List[np.ndarray]) -> List[np.ndarray]:
+        inputs, scales = [], []
+        for gray in grays:
+            img_h, img_w = gray.shape[:2]
+            scale = 1.0
+            if self.detection_max_side and max(img_h, img_w) > self.detection_max_side:
+                scale = self.detection_max_side / max(img_h, img_w)
+                gray = cv2.resize(gray, None, fx=scale, fy=scale, interpolation=cv2.INTER_AREA)
+            inputs.append(gray)
+            scales.append(scale)
+        
+        min_sides = [max(1, int(round(30 * scale))) for scale in scales]  # Relaxed from 60x60
+        if len(set(min_sides)) <= 1:
+            batch = self.backend.detect_batch(inputs, min_sides[0] if min_sides else 30)
+        else:
+            # Frames of different sizes: the minimum face size differs per frame
+            batch = [self.backend.detect(img, min_side) for img, min_side in zip(inputs, min_sides)]
+        
+        return [
+            self._to_full_resolution(faces, scale, gray.shape)
+            for faces, scale, gray in zip(batch, scales, grays)
+        ]
+    
+    @staticmethod
+    def _to_full_resolution(faces, scale: float, shape) -> np.ndarray:
+        if scale == 1.0 or len(faces) == 0:
+            return faces
+        
+        img_h, img_w = shape[:2]
+        
+        # Map back to full resolution, clipped to the frame
+        boxes = np.round(np.asarray(faces, dtype=np.float64) / scale).astype(np.int32)
+        boxes[:, 0] = np.clip(boxes[:, 0], 0, img_w - 1)
+        boxes[:, 1] = np.clip(boxes[:, 1], 0, img_h - 1)
+        boxes[:, 2] = np.minimum(boxes[:, 2], img_w - boxes[:, 0])
+        boxes[:, 3] = np.minimum(boxes[:, 3], img_h - boxes[:, 1])
+        return boxes
+    
+    def config_fingerprint(self) -> str:
+        """Short hash of every setting that affects detect_speaker_face results."""
+        config = {
+            'version': self.RESULTS_VERSION,
+            'opencv': cv2.__version__,
+            'min_face_ratio': self.min_face_ratio,
+            'min_blur_score': self.min_blur_score,
+            'padding_ratio': self.padding_ratio,
+            'detection_max_side': self.detection_max_side,
+            'tracking': self.tracking,
+            'output_size': self.output_size
+        }
+        if self.backend.name != 'haar':
+            # Only non-default backends, so existing cached Haar results stay valid
+            config['backend'] = self.backend.name
+        return hashlib.sha1(json.dumps(config, sort_keys=True).encode('utf-8')).hexdigest()[:12]
+    
+    def reset_tracking(self) -> None:
+        """Forget the previous frame (call between videos or jobs)."""
+        self._last_thumb = None
+        self._last_faces = None
+        self.tracking_stats = {'reused': 0, 'roi': 0, 'full': 0}
+    
+    def _track_faces(self, gray: np.ndarray) -> np.ndarray:
+        """
+        Face boxes for this frame, reusing the previous detection when possible.
+        Returns [x, y, w, h] boxes in full-resolution coordinates.
+        """
+        img_h, img_w = gray.shape[:2]
+        thumb_w = min(self.track_thumb_width, img_w)
+        thumb = cv2.resize(
+            gray, (thumb_w, max(1, round(img_h * thumb_w / img_w))),
+            interpolation=cv2.INTER_AREA
+        )
+        
+        last_thumb, last_faces = self._last_thumb, self._last_faces
+        # Only positive detections are reused: smart seek tries neighbouring
+        # frames precisely because the cascade missed on this one
+        tracked = last_faces is not None and len(last_faces) > 0 and last_thumb.shape == thumb.shape
+        if tracked:
+            # Compared against the frame the cascade last ran on, so slow
+            # drift across many frames still triggers a new detection
+            diff = cv2.norm(thumb, last_thumb, cv2.NORM_L1) / thumb.size
+            if diff < self.reuse_diff_threshold:
+                self.tracking_stats['reused'] += 1
+                return last_faces
+        
+        faces = ()
+        if tracked:
+            # Search around the last known faces first
+            boxes = np.asarray(last_faces)
+            margin = int(self.roi_expand * max(boxes[:, 2].max(), boxes[:, 3].max()))
+            x1 = max(0, int(boxes[:, 0].min()) - margin)
+            y1 = max(0, int(boxes[:, 1].min()) - margin)
+            x2 = min(img_w, int((boxes[:, 0] + boxes[:, 2]).max()) + margin)
+            y2 = min(img_h, int((boxes[:, 1] + boxes[:, 3]).max()) + margin)
+            
+            roi_faces = self._detect_faces(gray[y1:y2, x1:x2])
+            if len(roi_faces) > 0:
+                faces = np.asarray(roi_faces, dtype=np.int32) + np.array([x1, y1, 0, 0], dtype=np.int32)
+                self.tracking_stats['roi'] += 1
+        
+        if len(faces) == 0:
+            faces = self._detect_faces(gray)
+            self.tracking_stats['full'] += 1
+        
+        self._last_thumb = thumb
+        self._last_faces = faces
+        return faces
+    
     def _crop_with_padding(
         self, 
         frame: np.ndarray, 
@@ -235,10 +426,15 @@ class SpeakerFaceDetector:
         # Final check to ensure we didn't just drift out of bounds
         return frame[y1:y2, x1:x2]
     
-    def light_enhance(self, image: np.ndarray) -> np.ndarray:
+    def light_enhance(self, image: np.ndarray, target_size: Optional[int] = None) -> np.ndarray:
         """
         Apply LIGHT enhancements only (as per strict rules).
         
+        target_size: longest side of the result. Larger images are downscaled
+        first and the filter radii scaled to match, so the result looks the
+        same as enhancing at full size and then resizing, at a fraction of
+        the cost.
+        
         ALLOWED:
         ✅ Slight sharpening
         ✅ Minor exposure correction (CLAHE)
@@ -255,25 +451,59 @@ class SpeakerFaceDetector:
         if image is None or image.size == 0:
             return image
         
+        start = time.perf_counter()
+        
+        # 0. Downscale to the output size (area interpolation also averages out noise)
+        scale = 1.0
+        img_h, img_w = image.shape[:2]
+        if target_size and max(img_h, img_w) > target_size:
+            scale = target_size / max(img_h, img_w)
+            image = cv2.resize(
+                image,
+                (max(1, round(img_w * scale)), max(1, round(img_h * scale))),
+                interpolation=cv2.INTER_AREA
+            )
+        
         # 1. Noise reduction (bilateral filter - edge-preserving)
-        denoised = cv2.bilateralFilter(image, 5, 50, 50)
+        diameter = 5 if scale == 1.0 else max(3, int(round(5 * scale)))
+        denoised = cv2.bilateralFilter(image, diameter, 50, 50)
         
         # 2. Slight sharpening (unsharp mask - very subtle)
-        gaussian = cv2.GaussianBlur(denoised, (0, 0), 2.0)
+        gaussian = cv2.GaussianBlur(denoised, (0, 0), max(0.5, 2.0 * scale))
         sharpened = cv2.addWeighted(denoised, 1.2, gaussian, -0.2, 0)
         
         # 3. Auto exposure correction using CLAHE
         lab = cv2.cvtColor(sharpened, cv2.COLOR_BGR2LAB)
         l_channel, a_channel, b_channel = cv2.split(lab)
         
-        clahe = cv2.createCLAHE(clipLimit=2.0, tileGridSize=(8, 8))
-        l_channel = clahe.apply(l_channel)
+        l_channel = self.clahe.apply(l_channel)
         
         enhanced_lab = cv2.merge([l_channel, a_channel, b_channel])
         enhanced = cv2.cvtColor(enhanced_lab, cv2.COLOR_LAB2BGR)
         
+        self.enhance_seconds += time.perf_counter() - start
         return enhanced
     
+    def prescreen_score(self, frame: np.ndarray, width: int = 320) -> float:
+        """
+        Cheap ranking score for picking which frames get full detection:
+        Laplacian variance of a downscaled grayscale copy, divided by 10
+        when the frame fails the brightness / contrast checks of
+        validate_frame_quality. Higher is better.
+        """
+        img_h, img_w = frame.shape[:2]
+        if img_w > width:
+            frame = cv2.resize(frame, (width, max(1, round(img_h * width / img_w))), interpolation=cv2.INTER_AREA)
+        gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY) if frame.ndim == 3 else frame
+
+        mean, std = cv2.meanStdDev(gray)
+        brightness, contrast = float(mean[0][0]), float(std[0][0])
+        sharpness = laplacian_variance(gray)
+
+        if brightness < 40 or brightness > 220 or contrast < 20:
+            return sharpness / 10
+        return sharpness
+
     def validate_frame_quality(self, frame: np.ndarray) -> Dict:
         """
         Check overall frame quality metrics.
@@ -295,7 +525,7 @@ class SpeakerFaceDetector:
         contrast = np.std(gray)
         
         # Sharpness (Laplacian variance)
-        sharpness = cv2.Laplacian(gray, cv2.CV_64F).var()
+        sharpness = laplacian_variance(gray)
         
         # Quality thresholds
         is_too_dark = brightness < 40
@@ -319,9 +549,19 @@ class SpeakerFaceDetector:
         }
 
 
-def format_timestamp(seconds: int) -> str:
+def laplacian_variance(gray: np.ndarray) -> float:
+    """
+    Variance of the Laplacian (the blur score). The 3x3 Laplacian of 8-bit
+    pixels fits in 16 bits, so it is computed as CV_16S (a quarter of a
+    CV_64F image) and reduced with meanStdDev without further copies.
+    """
+    _, std = cv2.meanStdDev(cv2.Laplacian(gray, cv2.CV_16S))
+    return float(std[0][0]) ** 2
+
+
+def format_timestamp(seconds: float) -> str:
     """Format seconds to MM:SS or HH:MM:SS"""
-    hrs = seconds // 3600
+    hrs = int(seconds // 3600)
     mins = int((seconds % 3600) // 60)
     secs = int(seconds % 60)
     
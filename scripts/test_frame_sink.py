@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+"""
+Checks for the frame encoder and frame sinks (no network, no AWS account).
+Usage: python scripts/test_frame_sink.py   (or: python -m pytest scripts/test_frame_sink.py)
+"""
+
+import sys
+import numpy as np
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from types import SimpleNamespace
+
+sys.path.insert(0, str(Path(__file__).parent))
+import frame_encoder
+import frame_sink
+
+# Leading bytes of each format's files
+SIGNATURES = {
+    "jpeg": lambda data: data[:3] == b"\xff\xd8\xff",
+    "webp": lambda data: data[:4] == b"RIFF" and data[8:12] == b"WEBP",
+    "avif": lambda data: data[4:8] == b"ftyp" and data[8:12] in (b"avif", b"avis"),
+}
+
+
+def sample_image() -> np.ndarray:
+    y, x = np.mgrid[0:96, 0:128]
+    return np.dstack([x * 2, y * 2, (x + y)]).astype(np.uint8)
+
+
+def test_content_type_for_every_encoder_format():
+    for fmt in frame_encoder.available_formats():
+        ext = frame_encoder.FORMATS[fmt][0]
+        data = frame_encoder.encode(sample_image(), fmt, 80)
+        assert SIGNATURES[fmt](data), f"{fmt}: unexpected file signature"
+        assert frame_sink.content_type("frame" + ext) == f"image/{fmt}", f"{fmt}: wrong content type"
+
+
+class StubS3Client:
+    """Records upload_fileobj calls; meta mirrors a boto3 client's."""
+
+    def __init__(self, region_name, endpoint_url):
+        self.meta = SimpleNamespace(region_name=region_name, endpoint_url=endpoint_url)
+        self.uploads = {}
+
+    def upload_fileobj(self, fileobj, bucket, key, ExtraArgs=None, Config=None):
+        self.uploads[(bucket, key)] = (fileobj.read(), ExtraArgs)
+
+
+def stub_upload(region_name, endpoint_url, filename="frame.webp", **sink_args):
+    """Upload one frame through S3FrameSink with a stub client; returns (client, path, url)."""
+    client = StubS3Client(region_name, endpoint_url)
+    shared_s3 = frame_sink._shared_s3
+    frame_sink._shared_s3 = lambda: (client, None, ThreadPoolExecutor(max_workers=1))
+    try:
+        sink = frame_sink.S3FrameSink(bucket="frames-bucket", prefix="frames/", **sink_args)
+        path, url = sink.put(filename, b"frame-bytes")
+        sink.flush()
+    finally:
+        frame_sink._shared_s3 = shared_s3
+    return client, path, url
+
+
+def test_s3_upload_key_and_content_type():
+    client, path, _ = stub_upload("eu-west-1", "https://s3.eu-west-1.amazonaws.com", filename="a.avif")
+    data, extra_args = client.uploads[("frames-bucket", "frames/a.avif")]
+    assert data == b"frame-bytes"
+    assert extra_args == {"ContentType": "image/avif"}
+    assert path == "s3://frames-bucket/frames/a.avif"
+
+
+def test_s3_url_for_region():
+    _, _, url = stub_upload("eu-west-1", "https://s3.eu-west-1.amazonaws.com")
+    assert url == "https://frames-bucket.s3.eu-west-1.amazonaws.com/frames/frame.webp", url
+
+
+def test_s3_url_without_region_uses_global_endpoint():
+    _, _, url = stub_upload(None, "https://s3.amazonaws.com")
+    assert url == "https://frames-bucket.s3.amazonaws.com/frames/frame.webp", url
+
+
+def test_s3_url_for_custom_endpoint():
+    _, _, url = stub_upload("us-east-1", "http://localhost:9000/")
+    assert url == "http://localhost:9000/frames-bucket/frames/frame.webp", url
+
+
+def test_s3_url_for_public_url():
+    _, _, url = stub_upload(None, "http://localhost:9000", public_url="https://cdn.example.com/")
+    assert url == "https://cdn.example.com/frames/frame.webp", url
+
+
+if __name__ == "__main__":
+    tests = [(name, fn) for name, fn in sorted(globals().items()) if name.startswith("test_") and callable(fn)]
+    for name, fn in tests:
+        fn()
+        print(f"✓ {name}")
+    print(f"\n✓ {len(tests)} checks passed (formats: {', '.join(frame_encoder.available_formats())})")
@@ -0,0 +1,214 @@
+#!/usr/bin/env python3
+"""
+Video Cache
+Content-addressed on-disk cache for downloaded videos.
+
+Entries are keyed by the normalized video ID plus the yt-dlp format selector,
+evicted least-recently-used once the cache exceeds its byte budget, and
+guarded by per-entry file locks so concurrent jobs for the same video wait on
+a single download instead of starting their own.
+
+Locking (per entry, on <key>.lock):
+- readers hold a shared lock while they use the file, so it is never
+  evicted from under them
+- the downloader upgrades to an exclusive lock; everyone else waiting on the
+  same video blocks until the file is in place
+- eviction only removes entries it can lock exclusively without waiting
+"""
+
+import os
+import re
+import sys
+import uuid
+import hashlib
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Callable, Iterator, List, Optional
+from urllib.parse import urlsplit, parse_qs, urlencode
+
+try:
+    import fcntl
+except ImportError:  # Windows: no cross-process locking, cache still works
+    fcntl = None
+
+LOCK_SH = fcntl.LOCK_SH if fcntl else 0
+LOCK_EX = fcntl.LOCK_EX if fcntl else 0
+LOCK_UN = fcntl.LOCK_UN if fcntl else 0
+
+
+# ===============================
+# CONFIG
+# ===============================
+VIDEO_CACHE_DIR = os.environ.get(
+    "FRAME_VIDEO_CACHE_DIR",
+    str(Path(__file__).parent.parent / ".cache" / "videos")
+)
+VIDEO_CACHE_MAX_BYTES = int(os.environ.get("FRAME_VIDEO_CACHE_MAX_BYTES", 20 * 1024 ** 3))
+VIDEO_CACHE_ENABLED = os.environ.get("FRAME_VIDEO_CACHE", "1") != "0"
+
+VIDEO_EXTENSIONS = [".mp4", ".webm", ".mkv"]
+
+_YOUTUBE_ID = re.compile(r"^[A-Za-z0-9_-]{11}$")
+_YOUTUBE_HOSTS = {"youtube.com", "www.youtube.com", "m.youtube.com", "music.youtube.com",
+                  "youtube-nocookie.com", "www.youtube-nocookie.com"}
+
+
+def normalize_video_id(video_url: str) -> str:
+    """
+    Stable ID for a video URL.
+    All YouTube URL shapes (watch, youtu.be, shorts, embed, live) map to
+    "yt-<id>"; anything else maps to a hash of the normalized URL.
+    """
+    parts = urlsplit(video_url.strip())
+    host = parts.netloc.lower().split("@")[-1].split(":")[0]
+    path_parts = [p for p in parts.path.split("/") if p]
+
+    candidate = None
+    if host in ("youtu.be", "www.youtu.be") and path_parts:
+        candidate = path_parts[0]
+    elif host in _YOUTUBE_HOSTS:
+        if path_parts[:1] == ["watch"]:
+            candidate = (parse_qs(parts.query).get("v") or [None])[0]
+        elif len(path_parts) >= 2 and path_parts[0] in ("shorts", "embed", "live", "v"):
+            candidate = path_parts[1]
+
+    if candidate and _YOUTUBE_ID.match(candidate):
+        return f"yt-{candidate}"
+
+    query = urlencode(sorted(parse_qs(parts.query).items()), doseq=True)
+    normalized = f"{parts.scheme.lower()}://{host}{parts.path.rstrip('/')}?{query}"
+    return "url-" + hashlib.sha1(normalized.encode("utf-8")).hexdigest()[:16]
+
+
+def is_cache_entry(path: str, root: str = VIDEO_CACHE_DIR) -> bool:
+    """Whether path is a video stored in the cache (evicted together with its sidecar files)."""
+    return Path(path).resolve().parent == Path(root).resolve()
+
+
+def cache_key(video_url: str, format_selector: str) -> str:
+    fmt_hash = hashlib.sha1(format_selector.encode("utf-8")).hexdigest()[:10]
+    return f"{normalize_video_id(video_url)}-{fmt_hash}"
+
+
+def _lock(fd: int, mode: int) -> None:
+    if fcntl:
+        fcntl.flock(fd, mode)
+
+
+def _try_lock_exclusive(fd: int) -> bool:
+    if not fcntl:
+        return True
+    try:
+        fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        return True
+    except OSError:
+        return False
+
+
+class VideoCache:
+    """Byte-bounded LRU cache of downloaded videos with single-flight downloads."""
+
+    def __init__(self, root: str = VIDEO_CACHE_DIR, max_bytes: int = VIDEO_CACHE_MAX_BYTES):
+        self.root = Path(root)
+        self.max_bytes = max_bytes
+        self.root.mkdir(parents=True, exist_ok=True)
+
+    def find(self, key: str) -> Optional[str]:
+        for ext in VIDEO_EXTENSIONS:
+            p = self.root / f"{key}{ext}"
+            if p.exists():
+                return str(p)
+        return None
+
+    @contextmanager
+    def open(
+        self,
+        video_url: str,
+        format_selector: str,
+        downloader: Callable[[str, str], str]
+    ) -> Iterator[str]:
+        """
+        Yield a local path for the video, downloading it at most once.
+
+        downloader(video_url, output_path) must return the path it wrote.
+        The entry is pinned (shared lock) until the context exits.
+        """
+        key = cache_key(video_url, format_selector)
+        fd = os.open(str(self.root / f"{key}.lock"), os.O_RDWR | os.O_CREAT, 0o644)
+        try:
+            _lock(fd, LOCK_SH)
+            path = self.find(key)
+
+            if path is None:
+                # Single flight: the first job downloads, the others block here
+                _lock(fd, LOCK_EX)
+                path = self.find(key)
+                if path is None:
+                    path = self._download(key, video_url, downloader)
+                else:
+                    print(f"[VideoCache] ✓ Downloaded by another job: {key}", file=sys.stderr)
+                _lock(fd, LOCK_SH)
+                self.evict(keep=key)
+            else:
+                print(f"[VideoCache] ✓ Hit: {key}", file=sys.stderr)
+
+            # Mark as recently used for LRU eviction
+            os.utime(path, None)
+            yield path
+        finally:
+            _lock(fd, LOCK_UN)
+            os.close(fd)
+
+    def _download(self, key: str, video_url: str, downloader: Callable[[str, str], str]) -> str:
+        # Leftovers from a crashed download of this entry
+        for stale in self.root.glob(f"{key}.part-*"):
+            stale.unlink(missing_ok=True)
+
+        print(f"[VideoCache] Miss: {key}", file=sys.stderr)
+        tmp_path = str(self.root / f"{key}.part-{uuid.uuid4().hex}.mp4")
+        try:
+            downloaded = downloader(video_url, tmp_path)
+            final = str(self.root / f"{key}{Path(downloaded).suffix}")
+            os.replace(downloaded, final)
+        finally:
+            for leftover in self.root.glob(f"{key}.part-*"):
+                leftover.unlink(missing_ok=True)
+        return final
+
+    def entries(self) -> List[Path]:
+        return [
+            p for p in self.root.iterdir()
+            if p.suffix in VIDEO_EXTENSIONS and ".part-" not in p.name
+        ]
+
+    def evict(self, keep: Optional[str] = None) -> None:
+        """Delete least-recently-used entries until the cache fits its budget."""
+        entries = []
+        for p in self.entries():
+            try:
+                st = p.stat()
+            except FileNotFoundError:
+                continue
+            entries.append((st.st_mtime, st.st_size, p))
+
+        total = sum(size for _, size, _ in entries)
+        for _, size, p in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            key = p.stem
+            if key == keep:
+                continue
+
+            fd = os.open(str(self.root / f"{key}.lock"), os.O_RDWR | os.O_CREAT, 0o644)
+            try:
+                # Entries in use by another job are skipped, not waited on
+                if not _try_lock_exclusive(fd):
+                    continue
+                for sibling in self.root.glob(f"{key}.*"):
+                    if sibling.suffix != ".lock":
+                        sibling.unlink(missing_ok=True)
+                total -= size
+                print(f"[VideoCache] Evicted {p.name} ({size / 1024 ** 2:.0f} MB)", file=sys.stderr)
+            finally:
+                _lock(fd, LOCK_UN)
+                os.close(fd)